@@ -0,0 +1,97 @@
+"""
+Compare tasks/send throughput of A2AClient against one connection per call.
+
+The naive mode opens a new httpx.AsyncClient for every request, as ad-hoc
+callers (and the google_a2a sample client) do, so each call pays for a
+TCP handshake. The pooled modes reuse keep-alive connections of one
+A2AClient, once with one task per request and once with JSON-RPC batches.
+
+Usage:
+uv run python benchmarks/bench_client.py --tasks 2000 --concurrency 32 --batch-size 16
+"""
+import asyncio
+import logging
+import time
+import uuid
+
+import click
+import httpx
+
+from my_project.client import A2AClient, RequestTiming
+from my_project.loadgen import free_port, percentile, send_payload, start_server
+
+
+def task_params(count: int) -> list[dict]:
+    return [
+        {"id": uuid.uuid4().hex, "message": {"role": "user", "parts": [{"type": "text", "text": "ping"}]}}
+        for _ in range(count)
+    ]
+
+
+async def run_naive(url: str, tasks: int, concurrency: int) -> list[float]:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(params: dict):
+        async with semaphore:
+            start = time.perf_counter()
+            async with httpx.AsyncClient(timeout=60) as client:
+                response = await client.post(url, json=send_payload("tasks/send", params["id"], "ping"))
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(send(params) for params in task_params(tasks)))
+    return latencies
+
+
+async def run_pooled(url: str, tasks: int, concurrency: int, batch_size: int) -> list[float]:
+    latencies = []
+
+    def record(timing: RequestTiming):
+        latencies.append(timing.seconds)
+
+    async with A2AClient(url, max_connections=concurrency, on_request=record) as client:
+        responses = await client.send_many(task_params(tasks), concurrency=concurrency, batch_size=batch_size)
+    errors = sum(response.error is not None for response in responses)
+    if errors:
+        raise click.ClickException(f"{errors} tasks failed")
+    return latencies
+
+
+@click.command()
+@click.option("--url", default=None, help="Benchmark a running server instead of starting one")
+@click.option("--tasks", default=2000, help="Tasks sent per mode")
+@click.option("--concurrency", default=32, help="HTTP requests in flight at once")
+@click.option("--batch-size", default=16, help="Tasks per JSON-RPC batch in the batched mode")
+def main(url, tasks, concurrency, batch_size):
+    logging.basicConfig(level=logging.WARNING, force=True)
+    server = None
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}/"
+        server = start_server(port, ())
+    try:
+        modes = {
+            "naive": lambda: run_naive(url, tasks, concurrency),
+            "pooled": lambda: run_pooled(url, tasks, concurrency, 1),
+            f"batch={batch_size}": lambda: run_pooled(url, tasks, concurrency, batch_size),
+        }
+        baseline = None
+        for name, run in modes.items():
+            start = time.perf_counter()
+            latencies = sorted(asyncio.run(run()))
+            throughput = tasks / (time.perf_counter() - start)
+            baseline = baseline or throughput
+            print(
+                f"{name:10} {throughput:9.0f} tasks/s  x{throughput / baseline:.2f}  "
+                f"request p50 {percentile(latencies, 50) * 1000:8.2f} ms  "
+                f"p99 {percentile(latencies, 99) * 1000:8.2f} ms"
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measure time-to-first-request of a freshly started my-project server.
+
+Every run starts `my-project` on a free port and polls it with tasks/get
+until the first JSON-RPC response arrives. Also prints the server's own
+startup report from --ready-file when the server writes one.
+
+Usage:
+uv run python benchmarks/bench_cold_start.py --runs 10
+uv run python benchmarks/bench_cold_start.py --runs 10 --server-arg=--no-push-auth
+"""
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+import httpx
+
+from my_project.loadgen import free_port
+
+
+def first_request_seconds(server_args: tuple[str, ...], ready_file: str) -> tuple[float, dict | None]:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [
+            sys.executable, "-c", "from my_project import main; main()",
+            "--host", "127.0.0.1", "--port", str(port), "--ready-file", ready_file, *server_args,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    payload = {"jsonrpc": "2.0", "id": 1, "method": "tasks/get", "params": {"id": "cold-start"}}
+    try:
+        with httpx.Client(timeout=1) as client:
+            while True:
+                if process.poll() is not None:
+                    raise click.ClickException(f"Server exited with status {process.returncode}")
+                try:
+                    client.post(f"http://127.0.0.1:{port}/", json=payload).raise_for_status()
+                    elapsed = time.perf_counter() - start
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.002)
+        report = None
+        if os.path.exists(ready_file):
+            with open(ready_file) as f:
+                report = json.load(f)
+        return elapsed, report
+    finally:
+        process.terminate()
+        process.wait()
+
+
+@click.command()
+@click.option("--runs", default=10, help="Server starts to measure")
+@click.option("--server-arg", "server_args", multiple=True, help="Extra option for the started server")
+def main(runs, server_args):
+    logging.basicConfig(level=logging.WARNING, force=True)
+    timings = []
+    report = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(runs):
+            ready_file = os.path.join(tmp, f"ready-{run}.json")
+            elapsed, report = first_request_seconds(server_args, ready_file)
+            timings.append(elapsed)
+    print(
+        f"time to first request over {runs} runs: median {statistics.median(timings) * 1000:.0f} ms  "
+        f"min {min(timings) * 1000:.0f} ms  max {max(timings) * 1000:.0f} ms"
+    )
+    if report:
+        print("last run's startup report:")
+        for step, seconds in report["steps"].items():
+            print(f"  {step:45} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
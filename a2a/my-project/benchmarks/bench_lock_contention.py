@@ -0,0 +1,78 @@
+"""
+Compare one global task lock, striped per-task locks and no lock at all.
+
+Each simulated request updates a task the way upsert_task and update_store
+do: inside the lock it awaits TaskStore.load, which with a shared
+SqliteTaskStore reads the task from disk on the reader thread, then
+appends a message and puts the task back. With a single stripe (the old
+InMemoryTaskManager.lock) every disk read waits for the previous one; with
+striping only updates of the same task wait for each other. Without a
+lock, an update that loads a task while the writer commits another
+update of it can put back a stale copy, which shows up as lost updates.
+
+Usage:
+uv run python benchmarks/bench_lock_contention.py --tasks 20 --updates 50 --concurrency 200
+"""
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+
+import click
+from google_a2a.common.types import Message, Task, TaskState, TaskStatus, TextPart
+
+from my_project.locks import StripedLock
+from my_project.sqlite_task_store import SqliteTaskStore
+
+
+async def run(stripes: int | None, tasks: int, updates: int, concurrency: int) -> tuple[float, dict, int]:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteTaskStore(os.path.join(tmp, "tasks.db"), shared=True, max_history=None)
+        for i in range(tasks):
+            store.put(Task(id=f"task-{i}", sessionId="s", status=TaskStatus(state=TaskState.WORKING), history=[]))
+        store.flush()
+        locks = StripedLock(stripes) if stripes is not None else None
+        semaphore = asyncio.Semaphore(concurrency)
+        message = Message(role="agent", parts=[TextPart(text="update")])
+
+        async def update(task_id: str):
+            async with semaphore:
+                async with locks.for_key(task_id) if locks is not None else contextlib.nullcontext():
+                    task = await store.load(task_id)
+                    task.history.append(message)
+                    store.put(task)
+
+        start = time.perf_counter()
+        # Updates of one task are interleaved with those of the others
+        await asyncio.gather(*(update(f"task-{i}") for _ in range(updates) for i in range(tasks)))
+        elapsed = time.perf_counter() - start
+        store.flush()
+        lost = 0
+        for i in range(tasks):
+            lost += updates - len((await store.load(f"task-{i}")).history)
+        store.close()
+    stats = locks.stats() if locks is not None else {}
+    return elapsed, stats, lost
+
+
+@click.command()
+@click.option("--tasks", default=20)
+@click.option("--updates", default=50, help="Updates of each task")
+@click.option("--concurrency", default=200)
+def main(tasks, updates, concurrency):
+    total = tasks * updates
+    for label, stripes in (("no lock", None), ("global lock", 1), ("striped x64", 64), ("striped x1024", 1024)):
+        elapsed, stats, lost = asyncio.run(run(stripes, tasks, updates, concurrency))
+        line = f"{label:14} {total / elapsed:9.0f} updates/s  lost {lost:5d}"
+        if stats:
+            acquisitions = stats["acquisitions"]
+            line += (
+                f"  contended {stats['contended'] / acquisitions:6.1%}"
+                f"  mean wait {stats['wait_seconds'] / acquisitions * 1e6:9.1f} us"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
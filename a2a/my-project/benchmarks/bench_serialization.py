@@ -0,0 +1,102 @@
+"""
+Check the fast response encoder against the default JSONResponse path and
+compare their speed. Strings and ints encode to identical bytes; some floats
+are written differently but parse to the same values, and inf/nan become
+null where json.dumps refuses them. Signed push notification bodies are
+encoded with json.dumps and checked against the receiver's hash.
+
+Usage:
+uv run python benchmarks/bench_serialization.py --repeat 2000
+"""
+import hashlib
+import json
+import math
+import timeit
+
+import click
+from google_a2a.common.types import (
+    Artifact,
+    Message,
+    SendTaskResponse,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from google_a2a.common.utils.push_notification_auth import PushNotificationAuth
+from starlette.responses import JSONResponse
+
+from my_project.push_notifications import _signed_body
+from my_project.server import _to_json
+
+
+def make_response(text: str, metadata: dict | None = None) -> SendTaskResponse:
+    parts = [TextPart(text=text)]
+    task = Task(
+        id="0f6b1a3c",
+        sessionId="5d2c9e7a",
+        status=TaskStatus(
+            state=TaskState.COMPLETED,
+            message=Message(role="agent", parts=parts),
+        ),
+        history=[Message(role="user", parts=[TextPart(text=text)])],
+        artifacts=[Artifact(parts=parts)],
+        metadata=metadata or {"score": 0.1 + 0.2, "count": 3, "tags": ["a", None]},
+    )
+    return SendTaskResponse(id=1, result=task)
+
+
+CASES = {
+    "small": ("on_send_task received: hello", None),
+    "non-ascii": ("上海天气如何，现在上海是几点钟？ emoji \U0001F600   é", None),
+    "control-chars": ("tab\tnewline\nquote\"backslash\\ \x00\x01\x1f\x7f", None),
+    "1 MiB": ("x" * (1 << 20), None),
+    "floats": ("hello", {"small": 1.5e-7, "large": 1e22, "negative zero": -0.0, "third": 1 / 3}),
+    "inf": ("hello", {"limit": math.inf}),
+}
+
+
+def compare(response: SendTaskResponse) -> str:
+    fast = _to_json(response)
+    try:
+        slow = JSONResponse(response.model_dump(exclude_none=True)).body
+    except ValueError:
+        # json.dumps refuses inf and nan; pydantic writes them as null
+        return "json.dumps rejects"
+    if slow == fast:
+        return "identical"
+    if json.loads(slow) == json.loads(fast):
+        return "equivalent"
+    raise SystemExit(f"encodings differ\n{slow[:200]!r}\n{fast[:200]!r}")
+
+
+def check_signed_body(response: SendTaskResponse) -> None:
+    # The receiver hashes json.dumps of the body it parsed
+    body = _signed_body(response.result)
+    received = PushNotificationAuth()._calculate_request_body_sha256(json.loads(body))
+    if hashlib.sha256(body).hexdigest() != received:
+        raise SystemExit(f"signed push body does not hash like the receiver\n{body[:200]!r}")
+
+
+@click.command()
+@click.option("--repeat", default=2000)
+def main(repeat):
+    for name, (text, metadata) in CASES.items():
+        response = make_response(text, metadata)
+        outcome = compare(response)
+        check_signed_body(response)
+
+        number = max(1, repeat // max(1, len(text) // 1024))
+        fast_time = timeit.timeit(lambda: _to_json(response), number=number)
+        if outcome == "json.dumps rejects":
+            print(f"encode {name:14} {outcome:18}                       fast {fast_time / number * 1e6:9.1f} us")
+            continue
+        slow_time = timeit.timeit(lambda: JSONResponse(response.model_dump(exclude_none=True)), number=number)
+        print(
+            f"encode {name:14} {outcome:18} json.dumps {slow_time / number * 1e6:9.1f} us  "
+            f"fast {fast_time / number * 1e6:9.1f} us  x{slow_time / fast_time:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
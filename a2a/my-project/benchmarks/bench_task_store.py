@@ -0,0 +1,83 @@
+"""
+Compare on_send_task latency with the in-memory and the SQLite task store.
+
+Usage:
+uv run python benchmarks/bench_task_store.py --tasks 20000 --concurrency 200
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import click
+from google_a2a.common.types import Message, SendTaskRequest, TaskSendParams, TextPart
+
+from my_project.sqlite_task_store import SqliteTaskStore
+from my_project.task_manager import MyAgentTaskManager
+from my_project.task_store import TaskStore
+
+
+async def run(store: TaskStore, tasks: int, concurrency: int, payload: int) -> dict:
+    task_manager = MyAgentTaskManager(task_store=store)
+    text = "x" * payload
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i: int):
+        request = SendTaskRequest(
+            id=i,
+            params=TaskSendParams(
+                id=f"task-{i}",
+                message=Message(role="user", parts=[TextPart(text=text)]),
+            ),
+        )
+        async with semaphore:
+            start = time.perf_counter()
+            await task_manager.on_send_task(request)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(tasks)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": tasks / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+@click.command()
+@click.option("--tasks", default=20_000)
+@click.option("--concurrency", default=200)
+@click.option("--payload", default=256, help="Characters of message text per task")
+def main(tasks, concurrency, payload):
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": lambda: TaskStore(max_tasks=tasks),
+            "sqlite": lambda: SqliteTaskStore(os.path.join(tmp, "group.db"), max_tasks=tasks),
+            # Commit as soon as the writer is idle instead of waiting for more writes
+            "sqlite-no-delay": lambda: SqliteTaskStore(
+                os.path.join(tmp, "single.db"), commit_interval=0, max_tasks=tasks
+            ),
+        }
+        for name, make_store in stores.items():
+            store = make_store()
+            result = asyncio.run(run(store, tasks, concurrency, payload))
+            flush_start = time.perf_counter()
+            if isinstance(store, SqliteTaskStore):
+                store.flush()
+            result["flush_ms"] = (time.perf_counter() - flush_start) * 1000
+            stats = store.stats()
+            store.close()
+            print(
+                f"{name:16} {result['throughput']:10.0f} tasks/s  "
+                f"p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms  "
+                f"drain {result['flush_ms']:.1f} ms  commits {stats.get('commits', 0)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measure tasks/send throughput of the agent with 1 to N worker processes.
+
+Each run starts `my-project --workers n --task-store sqlite` on a free port
+and drives it from several client processes, so the load generator is not
+the bottleneck.
+
+Usage:
+uv run python benchmarks/bench_workers.py --max-workers 4 --duration 10
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+
+import click
+import httpx
+
+from my_project.loadgen import free_port, start_server
+
+
+async def drive(url: str, concurrency: int, duration: float) -> int:
+    completed = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+
+        async def loop():
+            nonlocal completed
+            while time.monotonic() < deadline:
+                task_id = uuid.uuid4().hex
+                response = await client.post("/", json={
+                    "jsonrpc": "2.0",
+                    "id": task_id,
+                    "method": "tasks/send",
+                    "params": {
+                        "id": task_id,
+                        "message": {"role": "user", "parts": [{"type": "text", "text": "ping"}]},
+                    },
+                })
+                response.raise_for_status()
+                # Read the task back; with several workers this often hits another one
+                response = await client.post("/", json={
+                    "jsonrpc": "2.0",
+                    "id": task_id,
+                    "method": "tasks/get",
+                    "params": {"id": task_id},
+                })
+                if "error" in response.json():
+                    raise RuntimeError(f"Task {task_id} not visible: {response.text}")
+                completed += 1
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return completed
+
+
+def client_process(args: tuple[str, int, float]) -> int:
+    return asyncio.run(drive(*args))
+
+
+@click.command()
+@click.option("--max-workers", default=os.cpu_count() or 1)
+@click.option("--duration", default=10.0, help="Seconds of load per run")
+@click.option("--clients", default=4, help="Load generator processes")
+@click.option("--concurrency", default=32, help="Concurrent requests per client process")
+def main(max_workers, duration, clients, concurrency):
+    logging.basicConfig(level=logging.WARNING, force=True)
+    worker_counts = sorted({1, *[2 ** i for i in range(1, max_workers.bit_length())], max_workers})
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts:
+            port = free_port()
+            url = f"http://127.0.0.1:{port}/"
+            server = start_server(port, (
+                "--workers", str(workers),
+                "--task-store", "sqlite", "--task-db", os.path.join(tmp, f"tasks-{workers}.db"),
+            ))
+            try:
+                with multiprocessing.Pool(clients) as pool:
+                    completed = sum(pool.map(client_process, [(url, concurrency, duration)] * clients))
+            finally:
+                server.terminate()
+                server.wait()
+            throughput = completed / duration
+            baseline = baseline or throughput
+            print(f"workers={workers:<3} {throughput:10.0f} send+get/s  x{throughput / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Mock OpenAI-compatible chat completions endpoint for trying out and load
+testing the tool-calling skill without a real model.
+
+A user message naming cities gets a get_current_weather call per city,
+and one asking for the time a get_current_time call, one call per round
+unless the request sets parallel_tool_calls; once every call has its
+result it answers with them. --latency adds model think time to every
+completion, and the mock prints how many completions it served per second.
+
+Usage:
+uv run python benchmarks/mock_openai.py --port 10020 --latency 0.5
+uv run --extra llm my-project --llm-base-url http://localhost:10020/v1
+
+Then send tasks with "metadata": {"skillId": "my-project-tool-calling-skill"}.
+"""
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+
+import click
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+CITIES = ("北京", "上海", "天津", "重庆", "广州", "深圳", "杭州", "余杭区", "长沙")
+MUNICIPALITIES = ("北京", "上海", "天津", "重庆")
+
+
+def wanted_calls(text: str, tool_names: set[str]) -> list[tuple[str, str]]:
+    cities = MUNICIPALITIES if "直辖市" in text else [city for city in CITIES if city in text]
+    calls = []
+    if "get_current_weather" in tool_names:
+        calls += [("get_current_weather", f'{{"location": "{city}"}}') for city in cities]
+    if "get_current_time" in tool_names and ("几点" in text or "时间" in text):
+        calls.append(("get_current_time", "{}"))
+    return calls
+
+
+def reply(messages: list[dict], tool_names: set[str], parallel: bool) -> dict:
+    # Tools already called since the last user message are not asked for again
+    turn = max(i for i, message in enumerate(messages) if message["role"] == "user")
+    question = str(messages[turn].get("content") or "")
+    called = {
+        (call["function"]["name"], call["function"]["arguments"])
+        for message in messages[turn + 1:]
+        for call in message.get("tool_calls") or ()
+    }
+    calls = [call for call in wanted_calls(question, tool_names) if call not in called]
+    if calls:
+        if not parallel:
+            # Without parallel_tool_calls models ask for one tool per round
+            calls = calls[:1]
+        return {"role": "assistant", "content": "", "tool_calls": [
+            {"id": f"call_{uuid.uuid4().hex[:24]}", "type": "function", "function": {"name": name, "arguments": arguments}}
+            for name, arguments in calls
+        ]}
+    results = [message["content"] for message in messages[turn + 1:] if message["role"] == "tool"]
+    if results:
+        return {"role": "assistant", "content": "".join(results)}
+    return {"role": "assistant", "content": f"你好！你说的是：{question}"}
+
+
+def build_app(latency: float) -> Starlette:
+    served = 0
+
+    async def chat_completions(request: Request) -> Response:
+        nonlocal served
+        body = await request.json()
+        tool_names = {tool["function"]["name"] for tool in body.get("tools") or ()}
+        message = reply(body["messages"], tool_names, bool(body.get("parallel_tool_calls")))
+        if latency:
+            await asyncio.sleep(latency)
+        served += 1
+        return JSONResponse({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                "message": message,
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    async def report():
+        last = 0
+        while True:
+            await asyncio.sleep(1)
+            if served != last:
+                click.echo(f"{served - last:6d} completions/s  total {served}")
+                last = served
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        reporter = asyncio.create_task(report())
+        try:
+            yield
+        finally:
+            reporter.cancel()
+
+    app = Starlette(lifespan=lifespan)
+    app.add_route("/v1/chat/completions", chat_completions, methods=["POST"])
+    return app
+
+
+@click.command()
+@click.option("--host", default="localhost")
+@click.option("--port", default=10020)
+@click.option("--latency", default=0.0, help="Seconds every completion takes")
+def main(host, port, latency):
+    logging.basicConfig(level=logging.WARNING, force=True)
+    uvicorn.run(build_app(latency), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Stub push notification receiver for trying out and load testing push delivery.
+
+It answers the validationToken check, verifies the JWT of every
+notification against the agent's JWKS, can fail a share of requests to
+exercise retries, and prints per-second delivery figures.
+
+Usage:
+uv run python benchmarks/push_receiver.py --port 10010 --agent-url http://localhost:10002 --fail-rate 0.1
+
+Then send tasks with
+"pushNotification": {"url": "http://localhost:10010/notify", "token": "secret"}
+in tasks/send params.
+"""
+import asyncio
+import contextlib
+import logging
+import random
+from collections import Counter
+
+import click
+import uvicorn
+from google_a2a.common.utils.push_notification_auth import PushNotificationReceiverAuth
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+logger = logging.getLogger(__name__)
+
+
+def build_app(agent_url: str | None, token: str | None, fail_rate: float) -> Starlette:
+    auth = PushNotificationReceiverAuth() if agent_url else None
+    counts: Counter[str] = Counter()
+    states: dict[str, str] = {}
+
+    async def validate(request: Request) -> Response:
+        return PlainTextResponse(request.query_params.get("validationToken", ""))
+
+    async def notify(request: Request) -> Response:
+        if random.random() < fail_rate:
+            counts["injected_failures"] += 1
+            return Response(status_code=503)
+        if token is not None and request.headers.get("X-A2A-Notification-Token") != token:
+            counts["bad_token"] += 1
+            return Response(status_code=401)
+        if auth is not None:
+            try:
+                if not await auth.verify_push_notification(request):
+                    raise ValueError("missing bearer token")
+            except Exception as e:
+                logger.warning(f"Rejected notification: {e}")
+                counts["bad_signature"] += 1
+                return Response(status_code=401)
+        task = await request.json()
+        counts["received"] += 1
+        states[task["id"]] = task["status"]["state"]
+        return Response(status_code=204)
+
+    async def report():
+        last = 0
+        while True:
+            await asyncio.sleep(1)
+            if counts["received"] != last:
+                by_state = Counter(states.values())
+                click.echo(f"{counts['received'] - last:6d}/s  total {dict(counts)}  tasks by state {dict(by_state)}")
+                last = counts["received"]
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        if auth is not None:
+            await auth.load_jwks(f"{agent_url.rstrip('/')}/.well-known/jwks.json")
+        reporter = asyncio.create_task(report())
+        try:
+            yield
+        finally:
+            reporter.cancel()
+
+    app = Starlette(lifespan=lifespan)
+    app.add_route("/notify", validate, methods=["GET"])
+    app.add_route("/notify", notify, methods=["POST"])
+    return app
+
+
+@click.command()
+@click.option("--host", default="localhost")
+@click.option("--port", default=10010)
+@click.option("--agent-url", default=None, help="Agent base URL; enables JWT verification against its JWKS")
+@click.option("--token", default=None, help="Expected X-A2A-Notification-Token")
+@click.option("--fail-rate", default=0.0, help="Share of notifications answered with 503")
+def main(host, port, agent_url, token, fail_rate):
+    logging.basicConfig(level=logging.WARNING)
+    uvicorn.run(build_app(agent_url, token, fail_rate), host=host, port=port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
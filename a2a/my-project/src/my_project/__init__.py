@@ -1,11 +1,15 @@
 import logging
+import os
 
-import click
-from dotenv import load_dotenv
-import google_a2a
-from google_a2a.common.types import AgentSkill, AgentCapabilities, AgentCard
-from google_a2a.common.server import A2AServer
-from my_project.task_manager import MyAgentTaskManager
+from my_project.startup import StartupTimer, notify_ready
+
+# Started first so the startup report covers every import. Everything the
+# server needs is imported inside main(): importing my_project, e.g. for
+# its client, and printing --help stay fast.
+startup = StartupTimer()
+
+with startup.step("import click"):
+    import click
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -13,19 +17,105 @@ logger = logging.getLogger(__name__)
 @click.command()
 @click.option("--host", default="localhost")
 @click.option("--port", default=10002)
-def main(host, port):
+@click.option("--max-tasks", default=10_000, help="Tasks kept before finished ones are evicted")
+@click.option("--task-ttl", default=3600.0, help="Seconds a finished task is kept")
+@click.option("--max-history", default=32, help="Messages kept in each task's history")
+@click.option(
+    "--task-store",
+    type=click.Choice(["memory", "sqlite"]),
+    default="memory",
+    help="Where tasks are kept; sqlite survives restarts",
+)
+@click.option("--task-db", default="tasks.db", help="Database file for --task-store sqlite")
+@click.option(
+    "--sqlite-retention",
+    default=7 * 24 * 3600.0,
+    help="Seconds finished tasks stay in the --task-store sqlite database; 0 keeps them forever",
+)
+@click.option("--workers", default=1, help="Server processes sharing the port and the task store")
+@click.option("--batch-concurrency", default=16, help="Requests of one JSON-RPC batch run at the same time")
+@click.option("--max-batch-size", default=100, help="Requests a JSON-RPC batch may hold; larger batches are rejected")
+@click.option("--spool-dir", default="spool", help="Directory large file parts are written to")
+@click.option("--spool-threshold", default=256 * 1024, help="Base64 size from which file parts are spooled; 0 disables spooling")
+@click.option(
+    "--executor",
+    type=click.Choice(["thread", "process"]),
+    default="thread",
+    help="Pool skill handlers run in; process suits CPU-bound skills",
+)
+@click.option("--executor-workers", type=int, default=None, help="Size of the skill pool; defaults to the pool's own default")
+@click.option("--task-timeout", default=60.0, help="Seconds a skill may run before its task fails")
+@click.option("--session-memory", default=100_000, help="Sessions whose recent turns are kept for skills; 0 disables")
+@click.option("--session-turns", default=16, help="Turns kept per session")
+@click.option("--session-bytes", default=16 * 1024, help="Approximate bytes kept per session")
+@click.option("--max-in-flight", default=256, help="Tasks worked on at once per worker; 0 disables admission control")
+@click.option("--admission-queue", default=1024, help="Tasks that may wait for a slot before new ones are rejected")
+@click.option("--admission-timeout", default=1.0, help="Seconds a task may wait for a slot before it is rejected")
+@click.option("--dedup-ttl", default=300.0, help="Seconds a tasks/send response is replayed to retries; 0 disables")
+@click.option("--push-concurrency", default=4, help="Push notification requests in flight per receiving host")
+@click.option("--push-auth/--no-push-auth", default=True, help="Sign push notifications with a JWT published at /.well-known/jwks.json")
+@click.option("--llm-base-url", default=None, help="OpenAI-compatible endpoint of the tool-calling skill; the skill is off without it")
+@click.option("--llm-model", default="qwen-plus", help="Model the tool-calling skill asks")
+@click.option("--llm-api-key-env", default="ApiKeyAliyunDashscope", help="Environment variable holding the model API key")
+@click.option("--ready-file", default=None, help="Write the startup report as JSON here once the server accepts connections")
+def main(
+    host, port, max_tasks, task_ttl, max_history, task_store, task_db, sqlite_retention, workers, batch_concurrency,
+    max_batch_size, spool_dir, spool_threshold, executor, executor_workers, task_timeout,
+    session_memory, session_turns, session_bytes, max_in_flight, admission_queue, admission_timeout,
+    dedup_ttl, push_concurrency, push_auth, llm_base_url, llm_model, llm_api_key_env,
+    ready_file,
+):
+    if workers > 1 and task_store != "sqlite":
+        raise click.UsageError("--workers above 1 needs --task-store sqlite so workers share tasks")
+
+    with startup.step("import google_a2a.common.types"):
+        from google_a2a.common.types import AgentCapabilities, AgentCard, AgentSkill
+    with startup.step("import my_project.server"):
+        from my_project.server import MyA2AServer
+    with startup.step("import my_project.task_manager"):
+        from my_project.admission import AdmissionController
+        from my_project.agent import AgentExecutor, echo
+        from my_project.dedup import DedupCache
+        from my_project.push_notifications import PushNotificationDispatcher
+        from my_project.session_memory import SessionMemory
+        from my_project.spool import FileSpool
+        from my_project.task_manager import MyAgentTaskManager
+        from my_project.task_store import TaskStore
+
     skill = AgentSkill(
         id="my-project-echo-skill",
         name="Echo Tool",
         description="Echos the input given",
         tags=["echo", "repeater"],
         examples=["I will see this echoed back to me"],
-        inputModes=["text"],
+        inputModes=["text", "file"],
         outputModes=["text"],
     )
-    logging.info(skill)
+    agent_skills = [skill]
+    skill_handlers = {skill.id: echo}
 
-    capabilities = AgentCapabilities()
+    if llm_base_url:
+        with startup.step("import my_project.tool_calling"):
+            from my_project.tool_calling import TOOL_CALLING_SKILL_ID, ToolCallingSkill
+        try:
+            skill_handlers[TOOL_CALLING_SKILL_ID] = ToolCallingSkill(
+                base_url=llm_base_url,
+                api_key=os.environ.get(llm_api_key_env) or "none",
+                model=llm_model,
+            )
+        except ImportError as e:
+            raise click.UsageError(str(e))
+        agent_skills.append(AgentSkill(
+            id=TOOL_CALLING_SKILL_ID,
+            name="Tool Calling",
+            description="Answers with a model that can look up the time and the weather, streaming every round",
+            tags=["function-calling", "weather", "time"],
+            examples=["上海天气如何，现在上海是几点钟？"],
+            inputModes=["text"],
+            outputModes=["text"],
+        ))
+
+    capabilities = AgentCapabilities(streaming=True, pushNotifications=True)
     agent_card = AgentCard(
         name="Echo Agent",
         description="This agent echos the input given",
@@ -34,18 +124,87 @@ def main(host, port):
         defaultInputModes=["text"],
         defaultOutputModes=["text"],
         capabilities=capabilities,
-        skills=[skill]
-    )
-    logging.info(agent_card)
-
-    task_manager = MyAgentTaskManager()
-    server = A2AServer(
-        agent_card=agent_card,
-        task_manager=task_manager,
-        host=host,
-        port=port,
+        skills=agent_skills
     )
-    server.start()
+    logger.info(f"{agent_card.name} at {agent_card.url} with skills {', '.join(s.id for s in agent_skills)}")
+
+    push_notification_auth = None
+    create_push_auth = None
+    if push_auth and workers > 1:
+        # Generated before forking so every worker signs with the key it publishes
+        with startup.step("push notification key"):
+            push_notification_auth = _create_push_auth()
+    elif push_auth:
+        # Imported and generated in a thread while the server starts listening
+        create_push_auth = _create_push_auth
+
+    def build_server():
+        store_options = dict(max_tasks=max_tasks, ttl=task_ttl, max_history=max_history)
+        if task_store == "sqlite":
+            from my_project.sqlite_task_store import SqliteTaskStore
+
+            store = SqliteTaskStore(
+                task_db, retention=sqlite_retention or None, shared=workers > 1, **store_options,
+            )
+        else:
+            store = TaskStore(**store_options)
+        spool = None
+        if spool_threshold > 0:
+            spool = FileSpool(spool_dir, spool_threshold, max_age=task_ttl, base_url=f"{agent_card.url}spool/")
+        push_sender = PushNotificationDispatcher(
+            push_notification_auth, per_endpoint_limit=push_concurrency, auth_factory=create_push_auth,
+        )
+        admission = None
+        if max_in_flight > 0:
+            admission = AdmissionController(max_in_flight, admission_queue, admission_timeout)
+        dedup = DedupCache(dedup_ttl) if dedup_ttl > 0 else None
+        memory = None
+        if session_memory > 0:
+            memory = SessionMemory(session_memory, session_turns, session_bytes)
+        skill_executor = AgentExecutor(
+            skill_handlers, mode=executor, max_workers=executor_workers, timeout=task_timeout,
+        )
+        task_manager = MyAgentTaskManager(
+            task_store=store,
+            spool=spool,
+            push_sender=push_sender,
+            admission=admission,
+            dedup=dedup,
+            executor=skill_executor,
+            session_memory=memory,
+        )
+        return MyA2AServer(
+            agent_card=agent_card,
+            task_manager=task_manager,
+            host=host,
+            port=port,
+            batch_concurrency=batch_concurrency,
+            max_batch_size=max_batch_size,
+        )
+
+    def on_ready():
+        logger.info(startup.summary())
+        notify_ready(ready_file, startup.report())
+
+    if workers > 1:
+        from my_project.workers import run_workers
+
+        run_workers(build_server, host, port, workers, on_ready)
+    else:
+        with startup.step("build server"):
+            server = build_server()
+        with startup.step("import uvicorn"):
+            # start() imports it again; imported here to show in the report
+            import uvicorn  # noqa: F401
+        server.start(on_ready=on_ready)
+
+
+def _create_push_auth():
+    from google_a2a.common.utils.push_notification_auth import PushNotificationSenderAuth
+
+    auth = PushNotificationSenderAuth()
+    auth.generate_jwk()
+    return auth
 
 if __name__ == "__main__":
   main()
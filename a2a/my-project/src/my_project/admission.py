@@ -0,0 +1,108 @@
+import asyncio
+import collections
+import contextlib
+import time
+from typing import Any, AsyncIterator
+
+from google_a2a.common.types import JSONRPCError
+
+
+class ServerBusyError(JSONRPCError):
+    code: int = -32050
+    message: str = "Server is busy, retry later"
+    data: Any | None = None
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Task rejected: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Caps the number of tasks being worked on at the same time.
+
+    Up to ``max_in_flight`` tasks run at once. Further tasks wait in a FIFO
+    queue of at most ``max_queue`` entries for no longer than
+    ``queue_timeout`` seconds; beyond that they are rejected right away
+    with a retry hint, so latency stays bounded instead of growing with
+    the backlog.
+    """
+
+    def __init__(self, max_in_flight: int = 256, max_queue: int = 1024, queue_timeout: float = 1.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: collections.deque[asyncio.Future] = collections.deque()
+        # Moving average of how long a task holds its slot, for retry hints
+        self._hold_seconds = 0.01
+        self.admitted = 0
+        self.rejected = collections.Counter()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        start = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(start)
+
+    async def acquire(self) -> float:
+        """Wait for a slot and return the time it was granted, for ``release``."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return time.monotonic()
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self.release(None)
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject("queue_timeout")
+        self.admitted += 1
+        return time.monotonic()
+
+    def release(self, start: float | None) -> None:
+        if start is not None:
+            self._hold_seconds += 0.1 * (time.monotonic() - start - self._hold_seconds)
+        # Hand the slot straight to the oldest waiter so it cannot be taken
+        # by a newcomer that skips the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def retry_after(self) -> float:
+        # Time for the current backlog to drain at the observed service rate
+        backlog = self.in_flight + len(self._waiters)
+        return round(min(30.0, max(0.1, self._hold_seconds * backlog / self.max_in_flight)), 3)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "admitted": self.admitted,
+        }
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(reason, self.retry_after())
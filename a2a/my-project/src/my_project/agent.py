@@ -0,0 +1,331 @@
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Protocol
+
+from google_a2a.common.types import FileContent
+
+logger = logging.getLogger(__name__)
+
+# Prefix of every echo reply
+ECHO_PREFIX = "on_send_task received: "
+
+
+class SkillCancelled(Exception):
+    pass
+
+
+class SkillContext:
+    """Handed to a skill handler, in whichever thread or process it runs.
+
+    ``history`` holds the recent (role, text) turns of the task's session,
+    oldest first, and ``files`` the file parts of the message as
+    FileContent; a spooled file carries the file URI of its local copy. ``report_progress`` sends a progress message to streaming
+    clients and ``cancelled`` tells a long-running handler that it should
+    stop: the task was canceled or ran out of time and its result will be
+    discarded.
+    """
+
+    def __init__(
+        self,
+        task_id: str,
+        cancel_event,
+        progress_queue,
+        history: list[tuple[str, str]] | None = None,
+        files: list[FileContent] | None = None,
+    ):
+        self.task_id = task_id
+        self.history = history or []
+        self.files = files or []
+        self._cancel_event = cancel_event
+        self._progress_queue = progress_queue
+
+    def report_progress(self, text: str) -> None:
+        self._progress_queue.put((self.task_id, text))
+
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+
+class SkillHandler(Protocol):
+    def __call__(self, text: str, context: SkillContext) -> str | list[str]: ...
+
+
+class AsyncSkillHandler(Protocol):
+    async def __call__(self, text: str, context: SkillContext) -> str | list[str]: ...
+
+
+def echo(text: str, context: SkillContext) -> list[str]:
+    # One text part at every size; the status message and the artifact
+    # share this string, which the task store accounts for once. Files are
+    # echoed by name, one part each
+    return [ECHO_PREFIX + text] + [ECHO_PREFIX + (file.name or file.uri or "file") for file in context.files]
+
+
+def _call_skill(handler: SkillHandler, text: str, context: SkillContext) -> list[str]:
+    result = handler(text, context)
+    return [result] if isinstance(result, str) else list(result)
+
+
+async def _call_async_skill(handler: AsyncSkillHandler, text: str, context: SkillContext) -> list[str]:
+    result = await handler(text, context)
+    return [result] if isinstance(result, str) else list(result)
+
+
+def _is_async_skill(handler) -> bool:
+    # Handlers may be instances with an async __call__
+    return inspect.iscoroutinefunction(handler) or inspect.iscoroutinefunction(getattr(handler, "__call__", None))
+
+
+class _LoopProgressQueue:
+    # Thread pool counterpart of a multiprocessing queue: puts go straight
+    # to the event loop
+    def __init__(self, loop: asyncio.AbstractEventLoop, dispatch: Callable[[str, str], None]):
+        self._loop = loop
+        self._dispatch = dispatch
+
+    def put(self, item: tuple[str, str]) -> None:
+        self._loop.call_soon_threadsafe(self._dispatch, *item)
+
+
+class _SharedCancelFlag:
+    # Process pool counterpart of threading.Event. All flags live in one
+    # manager dict, so starting a run costs no round trip to the manager;
+    # setting a flag does, and is handed to ``submit`` so that the round
+    # trip happens off the event loop
+    def __init__(self, key: str, flags, submit: Callable):
+        self._key = key
+        self._flags = flags
+        self._submit = submit
+        self._set = False
+
+    def set(self) -> None:
+        if not self._set:
+            self._set = True
+            self._submit(self._flags.__setitem__, self._key, time.monotonic())
+
+    def is_set(self) -> bool:
+        return self._set or self._key in self._flags
+
+    def __getstate__(self) -> dict:
+        # The handler's process only reads the flag
+        return {**self.__dict__, "_submit": None}
+
+
+class _Run:
+    __slots__ = ("cancel_event", "progress", "future")
+
+    def __init__(self, cancel_event, progress: asyncio.Queue, future: asyncio.Future):
+        self.cancel_event = cancel_event
+        self.progress = progress
+        self.future = future
+
+
+class AgentExecutor:
+    """Runs skill handlers off the event loop.
+
+    Handlers are plain functions that run in a thread pool, or with
+    ``mode="process"`` in a process pool, where they must be importable
+    module-level functions and their input and output are pickled. The
+    event loop only waits for their results. Handlers defined with
+    ``async def``, such as ones waiting on a remote model, run on the event
+    loop itself, so one process serves many of them at once.
+
+    A run can be canceled with ``cancel`` or end after ``timeout``
+    seconds. Either way the caller stops waiting at once; a handler that is
+    already running is told through ``SkillContext.cancelled`` and its
+    result is dropped. Progress messages are delivered to the
+    ``on_progress`` callback of the run, in order and ahead of its result.
+    """
+
+    def __init__(
+        self,
+        skills: dict[str, SkillHandler | AsyncSkillHandler] | None = None,
+        default_skill: str = "my-project-echo-skill",
+        mode: str = "thread",
+        max_workers: int | None = None,
+        timeout: float | None = 60.0,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown executor mode {mode}")
+        self.skills = skills if skills is not None else {default_skill: echo}
+        self.default_skill = default_skill
+        self.mode = mode
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool: concurrent.futures.Executor | None = None
+        self._manager = None
+        self._progress_queue = None
+        self._loop_progress_queue: _LoopProgressQueue | None = None
+        self._progress_thread: threading.Thread | None = None
+        self._cancel_flags = None
+        # Talks to the manager process, one call after another
+        self._flag_thread: concurrent.futures.ThreadPoolExecutor | None = None
+        self._running: dict[str, _Run] = {}
+        self._cancelled: set[str] = set()
+        self.outcomes: Counter[str] = Counter()
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    async def run(
+        self,
+        task_id: str,
+        text: str,
+        skill_id: str | None = None,
+        on_progress: Callable[[str], Awaitable[None]] | None = None,
+        history: list[tuple[str, str]] | None = None,
+        files: list[FileContent] | None = None,
+    ) -> list[str]:
+        """Run a skill on ``text`` and return the text pieces of its answer.
+
+        Raises SkillCancelled when the task is canceled, TimeoutError when it
+        runs out of time and whatever the handler raised when it fails.
+        """
+        handler = self.skills.get(skill_id or self.default_skill)
+        if handler is None:
+            raise ValueError(f"Unknown skill {skill_id}")
+        if task_id in self._running:
+            raise ValueError(f"Task {task_id} is already running")
+        loop = asyncio.get_running_loop()
+        self._ensure_started(loop)
+
+        progress: asyncio.Queue = asyncio.Queue()
+        if _is_async_skill(handler):
+            cancel_event = threading.Event()
+            context = SkillContext(task_id, cancel_event, self._loop_progress_queue, history, files)
+            future = asyncio.ensure_future(_call_async_skill(handler, text, context))
+        else:
+            if self._cancel_flags is not None:
+                cancel_event = _SharedCancelFlag(uuid.uuid4().hex, self._cancel_flags, self._flag_thread.submit)
+            else:
+                cancel_event = threading.Event()
+            context = SkillContext(task_id, cancel_event, self._progress_queue, history, files)
+            future = loop.run_in_executor(self._pool, _call_skill, handler, text, context)
+        self._running[task_id] = _Run(cancel_event, progress, future)
+        pump = asyncio.create_task(self._pump_progress(progress, on_progress)) if on_progress else None
+        try:
+            result = await asyncio.wait_for(future, self.timeout)
+            self.outcomes["completed"] += 1
+            return result
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            self._expire_cancel_flags()
+            self.outcomes["timeout"] += 1
+            raise
+        except asyncio.CancelledError:
+            cancel_event.set()
+            if task_id in self._cancelled:
+                self.outcomes["canceled"] += 1
+                raise SkillCancelled(task_id) from None
+            raise
+        except Exception:
+            self.outcomes["failed"] += 1
+            raise
+        finally:
+            self._running.pop(task_id, None)
+            self._cancelled.discard(task_id)
+            if pump is not None:
+                # Deliver what was reported before the result, then stop
+                progress.put_nowait(None)
+                await asyncio.shield(pump)
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a run of this process; returns False if there is none."""
+        run = self._running.get(task_id)
+        if run is None or run.future.done():
+            # Not running here, or its result is already in
+            return False
+        run.cancel_event.set()
+        self._cancelled.add(task_id)
+        self._expire_cancel_flags()
+        # Wakes up run(); a handler that has not started yet never will
+        run.future.cancel()
+        return True
+
+    def _expire_cancel_flags(self) -> None:
+        if self._cancel_flags is not None:
+            self._flag_thread.submit(self._drop_expired_cancel_flags, self._cancel_flags)
+
+    def _drop_expired_cancel_flags(self, flags) -> None:
+        # Runs in the flag thread. A handler checks its flag until it
+        # returns, so flags are kept well past the timeout rather than
+        # removed when the run ends
+        cutoff = time.monotonic() - 10 * (self.timeout or 60.0)
+        try:
+            for key, set_at in list(flags.items()):
+                if set_at < cutoff:
+                    flags.pop(key, None)
+        except Exception as e:
+            logger.error(f"Could not expire cancel flags: {e}")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._progress_thread is not None:
+            self._progress_queue.put(None)
+            self._progress_thread.join(timeout=1)
+            self._progress_thread = None
+        if self._flag_thread is not None:
+            # Flags still being set are written before the manager goes away
+            self._flag_thread.shutdown(wait=True)
+            self._flag_thread = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._cancel_flags = None
+
+    def stats(self) -> dict[str, int]:
+        return {"running": self.running, **self.outcomes}
+
+    def _ensure_started(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._pool is not None:
+            return
+        self._loop_progress_queue = _LoopProgressQueue(loop, self._dispatch_progress)
+        if self.mode == "thread":
+            self._pool = concurrent.futures.ThreadPoolExecutor(self.max_workers, thread_name_prefix="skill")
+            self._progress_queue = self._loop_progress_queue
+            return
+        # spawn rather than fork: the server process runs threads
+        mp_context = multiprocessing.get_context("spawn")
+        self._pool = concurrent.futures.ProcessPoolExecutor(self.max_workers, mp_context=mp_context)
+        self._manager = mp_context.Manager()
+        self._progress_queue = self._manager.Queue()
+        self._cancel_flags = self._manager.dict()
+        self._flag_thread = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="skill-flags")
+        self._progress_thread = threading.Thread(
+            target=self._forward_progress, args=(loop,), name="skill-progress", daemon=True
+        )
+        self._progress_thread.start()
+
+    def _forward_progress(self, loop: asyncio.AbstractEventLoop) -> None:
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                return
+            loop.call_soon_threadsafe(self._dispatch_progress, *item)
+
+    def _dispatch_progress(self, task_id: str, text: str) -> None:
+        run = self._running.get(task_id)
+        # Progress of a run that has already ended is dropped
+        if run is not None:
+            run.progress.put_nowait(text)
+
+    @staticmethod
+    async def _pump_progress(progress: asyncio.Queue, on_progress: Callable[[str], Awaitable[None]]) -> None:
+        while True:
+            text = await progress.get()
+            if text is None:
+                return
+            try:
+                await on_progress(text)
+            except Exception as e:
+                logger.error(f"Progress callback failed: {e}")
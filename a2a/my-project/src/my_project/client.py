@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Callable, NamedTuple, TypeVar
+
+import httpx
+from google_a2a.common.types import (
+    A2AClientHTTPError,
+    A2AClientJSONError,
+    AgentCard,
+    CancelTaskRequest,
+    CancelTaskResponse,
+    GetTaskRequest,
+    GetTaskResponse,
+    JSONRPCRequest,
+    JSONRPCResponse,
+    SendTaskRequest,
+    SendTaskResponse,
+    SendTaskStreamingRequest,
+    SendTaskStreamingResponse,
+    TaskIdParams,
+    TaskQueryParams,
+    TaskResubscriptionRequest,
+    TaskSendParams,
+    TaskStatusUpdateEvent,
+)
+from pydantic import TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_SSE_HEADERS = {"Content-Type": "application/json", "Accept": "text/event-stream"}
+
+_SEND_BATCH = TypeAdapter(list[SendTaskResponse])
+
+ResponseT = TypeVar("ResponseT", bound=JSONRPCResponse)
+
+
+class RequestTiming(NamedTuple):
+    """Handed to the timing hooks of an A2AClient once a request has ended."""
+
+    # JSON-RPC method, or "batch" for a batch of tasks/send requests
+    method: str
+    # JSON-RPC requests carried by the HTTP request
+    requests: int
+    # HTTP status, None if no response arrived
+    status: int | None
+    # Until the whole response was read, or the stream ended
+    seconds: float
+    # Until the first server-sent event arrived; streams only
+    first_event_seconds: float | None = None
+
+
+TimingHook = Callable[[RequestTiming], None]
+
+
+async def iter_sse_data(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Yield the data of each server-sent event as soon as its last line arrives."""
+    data: list[str] = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            value = line[len("data:"):]
+            data.append(value[1:] if value.startswith(" ") else value)
+        # Comments (keep-alives), event names and ids carry no payload
+    if data:
+        yield "\n".join(data)
+
+
+def _send_params(params: TaskSendParams | dict) -> TaskSendParams:
+    return params if isinstance(params, TaskSendParams) else TaskSendParams.model_validate(params)
+
+
+def _encode(request: JSONRPCRequest) -> bytes:
+    return request.__pydantic_serializer__.to_json(request, exclude_none=True)
+
+
+def _decode_event(data: str | bytes) -> SendTaskStreamingResponse:
+    try:
+        return SendTaskStreamingResponse.model_validate_json(data)
+    except ValidationError as e:
+        raise A2AClientJSONError(str(e)) from e
+
+
+def _response_error(response: httpx.Response, error: ValidationError) -> Exception:
+    # A body that is not a JSON-RPC response is blamed on the HTTP status
+    # when there is one to blame
+    if response.status_code >= 400:
+        return A2AClientHTTPError(response.status_code, response.text)
+    return A2AClientJSONError(str(error))
+
+
+class A2AClient:
+    """Async client of an A2A agent that shares pooled keep-alive connections.
+
+    Unlike opening a client per call, every request goes over one of up to
+    ``max_connections`` connections kept open to the agent, so calls pay
+    for the TCP handshake once. Use it as an async context manager, or call
+    ``aclose`` when done.
+
+    JSON-RPC errors come back in the ``error`` field of the response, also
+    when the agent sends them with an HTTP error status; other HTTP errors
+    raise A2AClientHTTPError and malformed responses A2AClientJSONError.
+    Every request is reported to the ``timing_hooks``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 100,
+        timeout: float = 60.0,
+        keepalive_expiry: float = 30.0,
+        on_request: TimingHook | None = None,
+        headers: dict[str, str] | None = None,
+    ):
+        self.url = url
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._client = httpx.AsyncClient(limits=limits, timeout=timeout, headers=headers)
+        self.timing_hooks: list[TimingHook] = [on_request] if on_request else []
+        self._agent_card: AgentCard | None = None
+        self._agent_card_etag: str | None = None
+
+    async def __aenter__(self) -> "A2AClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def get_agent_card(self) -> AgentCard:
+        """Fetch the agent card, revalidating a card fetched before by its ETag."""
+        headers = {"If-None-Match": self._agent_card_etag} if self._agent_card_etag else None
+        url = httpx.URL(self.url).join("/.well-known/agent.json")
+        response = await self._request("agent_card", 1, self._client.get(url, headers=headers))
+        if response.status_code == 304 and self._agent_card is not None:
+            return self._agent_card
+        if response.status_code >= 400:
+            raise A2AClientHTTPError(response.status_code, response.text)
+        try:
+            self._agent_card = AgentCard.model_validate_json(response.content)
+        except ValidationError as e:
+            raise A2AClientJSONError(str(e)) from e
+        self._agent_card_etag = response.headers.get("ETag")
+        return self._agent_card
+
+    async def send_task(self, params: TaskSendParams | dict) -> SendTaskResponse:
+        return await self._call(SendTaskRequest(params=_send_params(params)), SendTaskResponse)
+
+    async def get_task(self, task_id: str, history_length: int | None = None) -> GetTaskResponse:
+        params = TaskQueryParams(id=task_id, historyLength=history_length)
+        return await self._call(GetTaskRequest(params=params), GetTaskResponse)
+
+    async def cancel_task(self, task_id: str) -> CancelTaskResponse:
+        return await self._call(CancelTaskRequest(params=TaskIdParams(id=task_id)), CancelTaskResponse)
+
+    async def send_many(
+        self,
+        params_list: list[TaskSendParams | dict],
+        concurrency: int = 16,
+        batch_size: int = 1,
+    ) -> list[SendTaskResponse]:
+        """Send many tasks with at most ``concurrency`` HTTP requests in flight.
+
+        With ``batch_size`` above 1, up to that many tasks travel in one
+        JSON-RPC batch, which the agent runs concurrently. Responses are
+        returned in the order of ``params_list``.
+        """
+        requests = [SendTaskRequest(params=_send_params(params)) for params in params_list]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(chunk: list[SendTaskRequest]) -> list[SendTaskResponse]:
+            async with semaphore:
+                if len(chunk) == 1:
+                    return [await self._call(chunk[0], SendTaskResponse)]
+                return await self._send_batch(chunk)
+
+        batch_size = max(1, batch_size)
+        chunks = [requests[i:i + batch_size] for i in range(0, len(requests), batch_size)]
+        results = await asyncio.gather(*(send(chunk) for chunk in chunks))
+        return [response for chunk in results for response in chunk]
+
+    def send_task_streaming(self, params: TaskSendParams | dict) -> AsyncIterator[SendTaskStreamingResponse]:
+        """Send a task and yield its status and artifact events as they arrive.
+
+        The stream ends after the final status event or an error. To stop
+        reading earlier, iterate inside ``contextlib.aclosing`` so the
+        connection goes back to the pool right away.
+        """
+        return self._stream(SendTaskStreamingRequest(params=_send_params(params)))
+
+    def resubscribe(self, task_id: str) -> AsyncIterator[SendTaskStreamingResponse]:
+        """Follow the events of a task that is already running."""
+        return self._stream(TaskResubscriptionRequest(params=TaskIdParams(id=task_id)))
+
+    async def _call(self, request: JSONRPCRequest, response_type: type[ResponseT]) -> ResponseT:
+        response = await self._request(request.method, 1, self._post(_encode(request)))
+        try:
+            return response_type.model_validate_json(response.content)
+        except ValidationError as e:
+            raise _response_error(response, e) from e
+
+    async def _send_batch(self, requests: list[SendTaskRequest]) -> list[SendTaskResponse]:
+        body = b"[" + b",".join(_encode(request) for request in requests) + b"]"
+        response = await self._request("batch", len(requests), self._post(body))
+        try:
+            by_id = {item.id: item for item in _SEND_BATCH.validate_json(response.content)}
+        except ValidationError as e:
+            # A batch rejected as a whole, e.g. for its size, is answered by
+            # a single error response, which then applies to every request
+            try:
+                rejected = JSONRPCResponse.model_validate_json(response.content)
+            except ValidationError:
+                raise _response_error(response, e) from e
+            if rejected.error is None:
+                raise _response_error(response, e) from e
+            return [SendTaskResponse(id=request.id, error=rejected.error) for request in requests]
+        try:
+            return [by_id[request.id] for request in requests]
+        except KeyError as e:
+            raise A2AClientJSONError(f"Batch response lacks request {e}") from e
+
+    def _post(self, body: bytes):
+        return self._client.post(self.url, content=body, headers=_JSON_HEADERS)
+
+    async def _request(self, method: str, count: int, sending) -> httpx.Response:
+        start = time.perf_counter()
+        status = None
+        try:
+            response = await sending
+            status = response.status_code
+            # Not raise_for_status: the agent answers some JSON-RPC errors with
+            # a 4xx or 5xx status, and a 304 answers a revalidated agent card.
+            # Callers parse the body first and raise on the status only if it
+            # is not a JSON-RPC response
+            return response
+        finally:
+            self._record(RequestTiming(method, count, status, time.perf_counter() - start))
+
+    async def _stream(self, request: JSONRPCRequest) -> AsyncIterator[SendTaskStreamingResponse]:
+        start = time.perf_counter()
+        status = None
+        first_event = None
+        try:
+            async with self._client.stream("POST", self.url, content=_encode(request), headers=_SSE_HEADERS) as response:
+                status = response.status_code
+                if not response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                    # Errors, such as a busy server, come back as plain JSON-RPC
+                    await response.aread()
+                    try:
+                        event = SendTaskStreamingResponse.model_validate_json(response.content)
+                    except ValidationError as e:
+                        raise _response_error(response, e) from e
+                    yield event
+                    return
+                async for data in iter_sse_data(response.aiter_lines()):
+                    if first_event is None:
+                        first_event = time.perf_counter() - start
+                    event = _decode_event(data)
+                    yield event
+                    if event.error is not None or (
+                        isinstance(event.result, TaskStatusUpdateEvent) and event.result.final
+                    ):
+                        return
+        finally:
+            self._record(RequestTiming(request.method, 1, status, time.perf_counter() - start, first_event))
+
+    def _record(self, timing: RequestTiming) -> None:
+        for hook in self.timing_hooks:
+            try:
+                hook(timing)
+            except Exception as e:
+                logger.error(f"Timing hook failed: {e}")
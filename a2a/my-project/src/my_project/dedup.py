@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from google_a2a.common.types import SendTaskRequest, SendTaskResponse, TaskState
+
+DedupKey = tuple[str, str | None, bytes]
+
+
+def dedup_key(request: SendTaskRequest) -> DedupKey:
+    params = request.params
+    message = params.message
+    digest = hashlib.blake2b(message.__pydantic_serializer__.to_json(message), digest_size=16).digest()
+    # A sessionId the client left out is generated anew for every request,
+    # so it would make each retry look different
+    session_id = params.sessionId if "sessionId" in params.model_fields_set else None
+    return (params.id, session_id, digest)
+
+
+class _Entry:
+    __slots__ = ("future", "expires_at")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.expires_at = math.inf
+
+
+class DedupCache:
+    """Answers retried tasks/send requests without doing the work again.
+
+    Requests are keyed by task id, sessionId and a hash of the message.
+    A replay of a request that completed within ``ttl`` seconds gets the
+    stored response, and a duplicate of a request that is still running
+    waits for it instead of starting a second execution. Only completed
+    tasks are kept; retries of failed, canceled or rejected requests run
+    again.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[DedupKey, _Entry] = OrderedDict()
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+
+    async def run(
+        self,
+        request: SendTaskRequest,
+        handler: Callable[[SendTaskRequest], Awaitable[SendTaskResponse]],
+    ) -> SendTaskResponse:
+        key = dedup_key(request)
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                break
+            if entry.future.done():
+                self.hits += 1
+            else:
+                self.joined += 1
+            # shield: a retry that gives up must not cancel the original
+            response = await asyncio.shield(entry.future)
+            if response is not None:
+                # Same task, answered under the retry's JSON-RPC id
+                return response.model_copy(update={"id": request.id})
+            # The original failed and was not kept; run this one ourselves
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        entry = self._entries[key] = _Entry(future)
+        self._evict()
+        response = None
+        try:
+            response = await handler(request)
+            return response
+        finally:
+            completed = response is not None and response.error is None
+            if completed and response.result.status.state == TaskState.COMPLETED:
+                # Keep a snapshot: the stored task goes on changing in place,
+                # appending to its history and artifacts lists
+                task = response.result
+                snapshot = task.model_copy(update={
+                    "history": list(task.history or ()),
+                    "artifacts": list(task.artifacts) if task.artifacts is not None else None,
+                })
+                future.set_result(response.model_copy(update={"result": snapshot}))
+                entry.expires_at = time.monotonic() + self.ttl
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            else:
+                future.set_result(None)
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "joined": self.joined, "misses": self.misses}
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and entry.expires_at >= now:
+                break
+            del self._entries[key]
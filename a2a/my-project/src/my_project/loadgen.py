@@ -0,0 +1,283 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import click
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ("send", "get", "subscribe")
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def read_rss_bytes(pid: int) -> int:
+    """Resident memory of a process and its direct children (Linux only)."""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    total = 0
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def send_payload(method: str, task_id: str, text: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": task_id,
+        "method": method,
+        "params": {
+            "id": task_id,
+            "message": {"role": "user", "parts": [{"type": "text", "text": text}]},
+        },
+    }
+
+
+class LoadGenerator:
+    """Drives one scenario against an A2A server and records request latencies."""
+
+    def __init__(self, client: httpx.AsyncClient, concurrency: int, duration: float, payload: int):
+        self.client = client
+        self.concurrency = concurrency
+        self.duration = duration
+        self.text = "x" * payload
+        self.latencies: list[float] = []
+        self.first_event_latencies: list[float] = []
+        self.errors = 0
+        self._task_ids: list[str] = []
+
+    async def run(self, scenario: str) -> dict:
+        if scenario == "get":
+            # tasks/get needs existing tasks to read
+            await asyncio.gather(*(self._send() for _ in range(self.concurrency * 4)))
+            self.latencies.clear()
+        request = getattr(self, f"_{scenario}")
+        deadline = time.monotonic() + self.duration
+
+        async def worker():
+            while time.monotonic() < deadline:
+                try:
+                    await request()
+                except (httpx.HTTPError, ValueError) as e:
+                    logger.debug(f"{scenario} request failed: {e}")
+                    self.errors += 1
+
+        start = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        elapsed = time.monotonic() - start
+        return self._summary(scenario, elapsed)
+
+    async def _send(self) -> None:
+        task_id = uuid.uuid4().hex
+        start = time.perf_counter()
+        response = await self.client.post("/", json=send_payload("tasks/send", task_id, self.text))
+        self._check(response.json())
+        self.latencies.append(time.perf_counter() - start)
+        self._task_ids.append(task_id)
+
+    async def _get(self) -> None:
+        task_id = random.choice(self._task_ids)
+        start = time.perf_counter()
+        response = await self.client.post("/", json={
+            "jsonrpc": "2.0",
+            "id": task_id,
+            "method": "tasks/get",
+            "params": {"id": task_id},
+        })
+        self._check(response.json())
+        self.latencies.append(time.perf_counter() - start)
+
+    async def _subscribe(self) -> None:
+        task_id = uuid.uuid4().hex
+        start = time.perf_counter()
+        first_event = None
+        payload = send_payload("tasks/sendSubscribe", task_id, self.text)
+        async with self.client.stream("POST", "/", json=payload) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                event = json.loads(line[len("data:"):])
+                self._check(event)
+                if event["result"].get("final"):
+                    break
+        if first_event is None:
+            raise ValueError("Stream ended without events")
+        self.latencies.append(time.perf_counter() - start)
+        self.first_event_latencies.append(first_event)
+
+    @staticmethod
+    def _check(response: dict) -> None:
+        if "error" in response:
+            raise ValueError(f"JSON-RPC error: {response['error']}")
+
+    def _summary(self, scenario: str, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        summary = {
+            "scenario": scenario,
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                f"p{pct}": percentile(latencies, pct) * 1000 for pct in (50, 95, 99)
+            },
+        }
+        if self.first_event_latencies:
+            first = sorted(self.first_event_latencies)
+            summary["first_event_ms"] = {
+                f"p{pct}": percentile(first, pct) * 1000 for pct in (50, 95, 99)
+            }
+        return summary
+
+
+async def sample_rss(pid: int, interval: float, samples: list, start: float) -> None:
+    while True:
+        samples.append({"t": round(time.monotonic() - start, 3), "rss_bytes": read_rss_bytes(pid)})
+        await asyncio.sleep(interval)
+
+
+async def run_benchmark(url: str, server_pid: int | None, scenarios, concurrency, payloads, duration, rss_interval) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    rss_samples: list[dict] = []
+    results = []
+    start = time.monotonic()
+    sampler = None
+    if server_pid is not None:
+        sampler = asyncio.create_task(sample_rss(server_pid, rss_interval, rss_samples, start))
+    try:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            for payload in payloads:
+                for scenario in scenarios:
+                    generator = LoadGenerator(client, concurrency, duration, payload)
+                    result = await generator.run(scenario)
+                    result["payload_bytes"] = payload
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    click.echo(
+                        f"{scenario:10} payload={payload:<8} {result['throughput']:9.0f} req/s  "
+                        f"p50 {latency['p50']:8.2f} ms  p95 {latency['p95']:8.2f} ms  "
+                        f"p99 {latency['p99']:8.2f} ms  errors {result['errors']}"
+                    )
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+    return {"results": results, "rss": rss_samples}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, server_args: tuple[str, ...]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [
+            sys.executable, "-c", "from my_project import main; main()",
+            "--host", "127.0.0.1", "--port", str(port), *server_args,
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise click.ClickException(f"Server exited with status {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise click.ClickException("Server did not start listening within 30 s")
+
+
+@click.command()
+@click.option("--url", default=None, help="Benchmark a running server instead of starting one")
+@click.option(
+    "--scenario",
+    "scenarios",
+    type=click.Choice(SCENARIOS),
+    multiple=True,
+    default=SCENARIOS,
+    help="Methods to drive; repeat the option for several",
+)
+@click.option("--concurrency", default=32, help="Requests in flight at once")
+@click.option("--payload", "payloads", type=int, multiple=True, default=(64,), help="Message text size in bytes; repeatable")
+@click.option("--duration", default=10.0, help="Seconds per scenario and payload")
+@click.option("--rss-interval", default=0.5, help="Seconds between server RSS samples")
+@click.option("--server-arg", "server_args", multiple=True, help="Extra option for the started server, e.g. --server-arg=--workers=2")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write results as JSON to this file")
+def main(url, scenarios, concurrency, payloads, duration, rss_interval, server_args, output):
+    """Load test the my-project A2A agent over tasks/send, tasks/get and tasks/sendSubscribe."""
+    # my_project configures INFO logging on import; keep per-request logs out of the report
+    logging.basicConfig(level=logging.WARNING, force=True)
+    server = None
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}/"
+        server = start_server(port, server_args)
+    try:
+        report = asyncio.run(run_benchmark(
+            url, server.pid if server else None, scenarios, concurrency, payloads, duration, rss_interval,
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report.update({
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "url": url,
+        "concurrency": concurrency,
+        "duration": duration,
+        "server_args": list(server_args),
+        "cpu_count": os.cpu_count(),
+    })
+    if report["rss"]:
+        click.echo(f"server RSS peak {max(s['rss_bytes'] for s in report['rss']) / 2**20:.1f} MiB")
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
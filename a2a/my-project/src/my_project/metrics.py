@@ -0,0 +1,173 @@
+import asyncio
+import bisect
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond echo replies to slow skills
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(label: str | None, value, extra: str = "") -> str:
+    parts = []
+    if label is not None:
+        parts.append(f'{label}="{_escape(str(value))}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative histogram with at most one label, in Prometheus terms."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label: str | None = None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        # label value -> [per-bucket counts..., +Inf count, sum]
+        self._series: dict[str, list] = {}
+
+    def observe(self, value: float, label_value: str | None = None) -> None:
+        series = self._series.get(label_value)
+        if series is None:
+            series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0]
+        # Counts are stored per bucket and only made cumulative when rendered
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = []
+        for label_value, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label, label_value, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label, label_value)} {series[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label, label_value)} {cumulative}")
+        return lines
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label: str | None = None):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values: dict[str | None, float] = {}
+
+    def inc(self, amount: float = 1, label_value: str | None = None) -> None:
+        self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_labels(self.label, k)} {v}" for k, v in self._values.items()]
+
+
+class Gauge:
+    """Gauge that is either set directly or read from ``callback`` at scrape time.
+
+    A callback returns a number, or a dict of label value to number when the
+    gauge has a label. ``kind`` may be set to "counter" for monotonic values
+    that are owned elsewhere, such as eviction totals.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label: str | None = None,
+        callback: Callable[[], float | dict] | None = None,
+        kind: str = "gauge",
+    ):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.callback = callback
+        self.kind = kind
+        self._values: dict[str | None, float] = {}
+
+    def set(self, value: float, label_value: str | None = None) -> None:
+        self._values[label_value] = value
+
+    def inc(self, amount: float = 1, label_value: str | None = None) -> None:
+        self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def dec(self, amount: float = 1, label_value: str | None = None) -> None:
+        self._values[label_value] = self._values.get(label_value, 0) - amount
+
+    def render(self) -> list[str]:
+        values = self._values
+        if self.callback is not None:
+            value = self.callback()
+            values = value if isinstance(value, dict) else {None: value}
+        return [f"{self.name}{_labels(self.label, k)} {v}" for k, v in values.items()]
+
+
+class MetricsRegistry:
+    """Collects metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, Histogram | Counter | Gauge] = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name: str, help: str, label: str | None = None, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, label, buckets))
+
+    def counter(self, name: str, help: str, label: str | None = None) -> Counter:
+        return self._register(Counter(name, help, label))
+
+    def gauge(self, name: str, help: str, label: str | None = None, callback=None, kind: str = "gauge") -> Gauge:
+        return self._register(Gauge(name, help, label, callback, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.render()
+            except Exception as e:
+                # One broken callback should not take the whole endpoint down
+                logger.error(f"Failed to collect metric {metric.name}: {e}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed-interval sleep."""
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 0.5):
+        self.interval = interval
+        self._histogram = registry.histogram(
+            "a2a_event_loop_lag_seconds", "Delay of event loop wake-ups beyond the requested sleep"
+        )
+        self._last = registry.gauge("a2a_event_loop_lag_last_seconds", "Most recently measured event loop lag")
+        self._task: asyncio.Task | None = None
+
+    def ensure_started(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self._histogram.observe(lag)
+            self._last.set(lag)
@@ -0,0 +1,299 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import urlsplit
+
+from google_a2a.common.types import PushNotificationConfig, Task
+
+# httpx, jwt and the sender auth pull in cryptography and take a good part
+# of the server's start-up time; they are imported once the first
+# notification goes out
+if TYPE_CHECKING:
+    import httpx
+    from google_a2a.common.utils.push_notification_auth import PushNotificationSenderAuth
+
+logger = logging.getLogger(__name__)
+
+
+def _signed_body(task: Task) -> bytes:
+    # PushNotificationReceiverAuth parses the body and hashes it again with
+    # json.dumps, which writes some floats differently from pydantic's
+    # encoder (1.5e-07 rather than 1.5e-7). Signed bodies are encoded the
+    # same way, so the hash of the bytes sent is the hash receivers compute
+    data = task.model_dump(mode="json", exclude_none=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class _EndpointLimit:
+    __slots__ = ("semaphore", "users")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        # Deliveries holding on to this entry; it is dropped when none do
+        self.users = 0
+
+
+class PushNotificationDispatcher:
+    """Delivers task updates to push notification URLs in the background.
+
+    ``notify`` only records the task and returns; delivery workers post the
+    task to its URL over a shared pool of keep-alive connections. Updates
+    to a task that arrive while an earlier one is still queued or being
+    delivered are coalesced, so the receiver gets the latest state, and
+    deliveries for one task never overlap or arrive out of order.
+
+    At most ``per_endpoint_limit`` requests go to one host at a time.
+    Connection errors, 429 and 5xx responses are retried up to
+    ``max_attempts`` times with full-jitter exponential backoff. When the
+    queue is full new tasks are dropped rather than slowing down callers.
+
+    Nothing is sent to a URL that has not answered the validation-token
+    handshake of ``verify_url``; successful checks are remembered for
+    ``verify_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        auth: "PushNotificationSenderAuth | None" = None,
+        queue_size: int = 1024,
+        delivery_workers: int = 8,
+        per_endpoint_limit: int = 4,
+        max_connections: int = 64,
+        timeout: float = 5.0,
+        max_attempts: int = 5,
+        backoff_base: float = 0.2,
+        backoff_max: float = 10.0,
+        auth_factory: "Callable[[], PushNotificationSenderAuth] | None" = None,
+        verify_ttl: float = 3600.0,
+        max_verified: int = 1024,
+    ):
+        self.auth = auth
+        # Creates ``auth`` in a thread on first use, keeping key generation
+        # off the startup path
+        self.auth_factory = auth_factory
+        self._auth_loading: asyncio.Future | None = None
+        self.queue_size = queue_size
+        self.delivery_workers = delivery_workers
+        self.per_endpoint_limit = per_endpoint_limit
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.verify_ttl = verify_ttl
+        self.max_verified = max_verified
+        # Verified URL -> when its check expires, least recently used first
+        self._verified: OrderedDict[str, float] = OrderedDict()
+        # One handshake per URL at a time; concurrent callers share it
+        self._verifying: dict[str, asyncio.Task] = {}
+        # Latest undelivered update of each task; the queue only carries task ids
+        self._pending: dict[str, tuple[Task, PushNotificationConfig]] = {}
+        self._in_flight: set[str] = set()
+        # Only hosts with a delivery in progress have an entry, so there are
+        # never more than delivery_workers of them
+        self._endpoint_limits: dict[str, _EndpointLimit] = {}
+        self._queue: asyncio.Queue[str] | None = None
+        self._client: "httpx.AsyncClient | None" = None
+        self._workers: list[asyncio.Task] = []
+        self.queued = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.retries = 0
+        self.rejected_urls = 0
+
+    def notify(self, task: Task, config: PushNotificationConfig) -> None:
+        """Schedule delivery of the current state of ``task``; never blocks."""
+        self._ensure_started()
+        task_id = task.id
+        already_pending = task_id in self._pending
+        self._pending[task_id] = (task, config)
+        if already_pending:
+            self.coalesced += 1
+        elif task_id not in self._in_flight:
+            # A task being delivered is queued again once that delivery ends
+            self._enqueue(task_id)
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        """Give queued notifications ``timeout`` seconds to go out, then stop."""
+        if self._queue is None:
+            return
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._pending or self._in_flight:
+            logger.warning(f"Discarding {len(self._pending) + len(self._in_flight)} undelivered push notifications")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await self._client.aclose()
+        self._workers = []
+        self._queue = None
+        self._client = None
+
+    @property
+    def signs(self) -> bool:
+        return self.auth is not None or self.auth_factory is not None
+
+    def load_auth(self) -> None:
+        """Start creating the signing key in the background, if not done yet."""
+        if self.auth is None and self.auth_factory is not None and self._auth_loading is None:
+            self._auth_loading = asyncio.ensure_future(asyncio.to_thread(self.auth_factory))
+
+    async def wait_auth(self) -> "PushNotificationSenderAuth | None":
+        if self.auth is None and self.auth_factory is not None:
+            self.load_auth()
+            self.auth = await asyncio.shield(self._auth_loading)
+        return self.auth
+
+    async def verify_url(self, url: str) -> bool:
+        """Whether ``url`` echoed a validation token, as the A2A sample receivers do."""
+        expires_at = self._verified.get(url)
+        if expires_at is not None:
+            if expires_at > time.monotonic():
+                self._verified.move_to_end(url)
+                return True
+            del self._verified[url]
+        check = self._verifying.get(url)
+        if check is None:
+            from google_a2a.common.utils.push_notification_auth import PushNotificationSenderAuth
+
+            check = self._verifying[url] = asyncio.ensure_future(
+                PushNotificationSenderAuth.verify_push_notification_url(url)
+            )
+            check.add_done_callback(lambda _: self._verifying.pop(url, None))
+        # shield: a caller that gives up must not cancel the check for the others
+        verified = await asyncio.shield(check)
+        if not verified:
+            self.rejected_urls += 1
+            logger.warning(f"Push notification URL {url} failed verification")
+            return False
+        self._verified[url] = time.monotonic() + self.verify_ttl
+        self._verified.move_to_end(url)
+        while len(self._verified) > self.max_verified:
+            self._verified.popitem(last=False)
+        return True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rejected_urls": self.rejected_urls,
+        }
+
+    def _ensure_started(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        import httpx
+
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.delivery_workers)]
+
+    def _enqueue(self, task_id: str) -> None:
+        try:
+            self._queue.put_nowait(task_id)
+            self.queued += 1
+        except asyncio.QueueFull:
+            self._pending.pop(task_id, None)
+            self.dropped += 1
+            logger.warning(f"Push notification queue is full, dropping update of task {task_id}")
+
+    async def _work(self) -> None:
+        while True:
+            task_id = await self._queue.get()
+            entry = self._pending.pop(task_id, None)
+            if entry is None:
+                continue
+            self._in_flight.add(task_id)
+            try:
+                await self._deliver(*entry)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Push notification for task {task_id} failed: {e}")
+            finally:
+                self._in_flight.discard(task_id)
+                if task_id in self._pending:
+                    self._enqueue(task_id)
+
+    async def _deliver(self, task: Task, config: PushNotificationConfig) -> None:
+        # Checked again here: the URL may have been registered by another
+        # worker, or its earlier check may have expired
+        if not await self.verify_url(config.url):
+            self.failed += 1
+            return
+
+        # Serialized at delivery time, so coalesced updates send the latest state
+        headers = {"Content-Type": "application/json"}
+        if config.token:
+            headers["X-A2A-Notification-Token"] = config.token
+        if self.signs:
+            body = _signed_body(task)
+            await self.wait_auth()
+            headers["Authorization"] = f"Bearer {self._sign(body)}"
+        else:
+            body = task.__pydantic_serializer__.to_json(task, exclude_none=True)
+
+        host = urlsplit(config.url).netloc
+        limit = self._endpoint_limits.get(host)
+        if limit is None:
+            limit = self._endpoint_limits[host] = _EndpointLimit(self.per_endpoint_limit)
+        limit.users += 1
+        try:
+            await self._post(task, config, body, headers, limit.semaphore)
+        finally:
+            limit.users -= 1
+            if not limit.users:
+                del self._endpoint_limits[host]
+
+    async def _post(
+        self, task: Task, config: PushNotificationConfig, body: bytes, headers: dict[str, str], limit: asyncio.Semaphore,
+    ) -> None:
+        import httpx
+
+        for attempt in range(1, self.max_attempts + 1):
+            async with limit:
+                try:
+                    response = await self._client.post(config.url, content=body, headers=headers)
+                    error = f"HTTP {response.status_code}"
+                    retryable = response.status_code == 429 or response.status_code >= 500
+                    if response.is_success:
+                        self.delivered += 1
+                        return
+                except httpx.HTTPError as e:
+                    error = repr(e)
+                    retryable = True
+            if not retryable or attempt == self.max_attempts:
+                break
+            self.retries += 1
+            await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))))
+            if task.id in self._pending:
+                # A newer update supersedes this one and is delivered next
+                return
+        self.failed += 1
+        logger.warning(f"Giving up push notification for task {task.id} to {config.url}: {error}")
+
+    def _sign(self, body: bytes) -> str:
+        # Same claims as PushNotificationSenderAuth, over the exact bytes
+        # that are sent
+        key = self.auth.private_key_jwk
+        import jwt
+
+        return jwt.encode(
+            {"iat": int(time.time()), "request_body_sha256": hashlib.sha256(body).hexdigest()},
+            key=key,
+            headers={"kid": key.key_id},
+            algorithm="RS256",
+        )
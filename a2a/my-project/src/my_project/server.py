@@ -0,0 +1,327 @@
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import socket
+import time
+from typing import Any, Callable, NamedTuple
+
+from google_a2a.common.server import A2AServer
+from google_a2a.common.types import (
+    A2ARequest,
+    AgentCard,
+    CancelTaskRequest,
+    GetTaskPushNotificationRequest,
+    GetTaskRequest,
+    InternalError,
+    InvalidRequestError,
+    JSONRPCResponse,
+    SendTaskRequest,
+    SetTaskPushNotificationRequest,
+)
+from pydantic import ValidationError
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+
+from my_project.admission import ServerBusyError
+from my_project.metrics import EventLoopLagMonitor, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def _to_json(response: JSONRPCResponse) -> bytes:
+    # Compact, with non-ASCII characters left unescaped, like
+    # JSONResponse(response.model_dump(exclude_none=True)), and parses to the
+    # same values, but the bytes can differ: floats such as 1.5e-7 are not
+    # written as 1.5e-07, and inf and nan become null where json.dumps
+    # raises. Nothing here hashes these bytes; signed push notifications
+    # are encoded with json.dumps instead (see push_notifications)
+    return response.__pydantic_serializer__.to_json(response, exclude_none=True)
+
+
+# Method label values are bounded to these so that clients cannot create
+# arbitrarily many time series
+_METHODS = frozenset({
+    "tasks/send",
+    "tasks/sendSubscribe",
+    "tasks/get",
+    "tasks/cancel",
+    "tasks/pushNotification/set",
+    "tasks/pushNotification/get",
+    "tasks/resubscribe",
+})
+
+
+class _EncodedAgentCard(NamedTuple):
+    body: bytes
+    gzip_body: bytes | None
+    etag: str
+    gzip_etag: str
+
+
+def _encode_agent_card(agent_card: AgentCard) -> _EncodedAgentCard:
+    body = _to_json(agent_card)
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    # mtime=0 keeps the compressed bytes, and so every worker's copy, identical
+    gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+    # Each content coding is a different representation with its own strong ETag
+    return _EncodedAgentCard(
+        body=body,
+        gzip_body=gzip_body if len(gzip_body) < len(body) else None,
+        etag=f'"{digest}"',
+        gzip_etag=f'"{digest}-gzip"',
+    )
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def _method_label(body: Any) -> str:
+    method = body.get("method") if isinstance(body, dict) else None
+    return method if method in _METHODS else "unknown"
+
+
+class MyA2AServer(A2AServer):
+    """A2AServer with JSON-RPC batches, inherited sockets and task manager shutdown.
+
+    It also serves a precomputed agent card, /metrics, spooled files and
+    the push notification JWKS.
+    """
+
+    def __init__(
+        self,
+        *args,
+        batch_concurrency: int = 16,
+        max_batch_size: int = 100,
+        fast_json: bool = True,
+        agent_card_max_age: int = 300,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        # Upper bound on the requests of one batch that run at the same time
+        self.batch_concurrency = batch_concurrency
+        # Larger batches are rejected as a whole before any of their
+        # requests is parsed or scheduled
+        self.max_batch_size = max_batch_size
+        # Encode responses with pydantic-core's serializer straight to bytes
+        # instead of building a dict and passing it through json.dumps
+        self.fast_json = fast_json
+        # The agent card is encoded once and served from these buffers;
+        # reload_agent_card swaps them for new ones in a single assignment
+        self.agent_card_max_age = agent_card_max_age
+        self._encoded_agent_card = _encode_agent_card(self.agent_card) if self.agent_card is not None else None
+        # Share the task manager's registry so one scrape covers both
+        self.metrics = getattr(self.task_manager, "metrics", None) or MetricsRegistry()
+        self._request_seconds = self.metrics.histogram(
+            "a2a_request_seconds",
+            "JSON-RPC request latency by method; streaming methods are timed until the stream starts",
+            label="method",
+        )
+        self._loop_lag = EventLoopLagMonitor(self.metrics)
+        self.app.router.lifespan_context = self._lifespan
+        self.app.add_route("/metrics", self._get_metrics, methods=["GET"])
+        push_sender = getattr(self.task_manager, "push_sender", None)
+        if push_sender is not None and push_sender.signs:
+            # Receivers fetch the public keys here to verify notification JWTs
+            self.app.add_route("/.well-known/jwks.json", self._get_jwks, methods=["GET"])
+        if getattr(self.task_manager, "spool", None) is not None:
+            self.app.add_route("/spool/{name}", self._get_spooled_file, methods=["GET"])
+
+    def start(self, sock: socket.socket | None = None, on_ready: Callable[[], None] | None = None):
+        """Serve until stopped; ``on_ready`` is called once the socket accepts connections."""
+        if self.agent_card is None:
+            raise ValueError("agent_card is not defined")
+        if self.task_manager is None:
+            raise ValueError("request_handler is not defined")
+
+        import uvicorn
+
+        class Server(uvicorn.Server):
+            async def startup(self, sockets=None):
+                await super().startup(sockets=sockets)
+                # Lifespan startup has run and the socket is bound or inherited
+                if self.started and on_ready is not None:
+                    on_ready()
+
+        config = uvicorn.Config(self.app, host=self.host, port=self.port)
+        try:
+            Server(config).run(sockets=[sock] if sock is not None else None)
+        finally:
+            self.task_manager.close()
+
+    def reload_agent_card(self, agent_card: AgentCard | None = None) -> None:
+        """Serve ``agent_card`` from now on, e.g. after its skills changed.
+
+        Without an argument the current card is encoded again, for changes
+        made to it in place. The body, its gzip copy and their ETags are
+        replaced together, so a request sees either the old card or the new
+        one. This only affects the process it is called in: with pre-forked
+        workers every worker holds its own copy and has to be reloaded, or
+        restarted, on its own.
+        """
+        agent_card = agent_card if agent_card is not None else self.agent_card
+        encoded = _encode_agent_card(agent_card)
+        self.agent_card = agent_card
+        self._encoded_agent_card = encoded
+
+    async def _get_agent_card(self, request: Request) -> Response:
+        # A coroutine, so Starlette serves it on the event loop instead of
+        # handing every request to its thread pool
+        card = self._encoded_agent_card
+        if card is None:
+            # Assigned to agent_card after construction; encode it on first use
+            card = self._encoded_agent_card = _encode_agent_card(self.agent_card)
+        use_gzip = card.gzip_body is not None and _accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = card.gzip_etag if use_gzip else card.etag
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.agent_card_max_age}",
+            "Vary": "Accept-Encoding",
+        }
+        # Only the representation about to be sent can be unchanged; a
+        # client holding the gzip copy that now asks for identity gets a body
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(card.gzip_body, media_type="application/json", headers=headers)
+        return Response(card.body, media_type="application/json", headers=headers)
+
+    @contextlib.asynccontextmanager
+    async def _lifespan(self, app):
+        self._loop_lag.ensure_started()
+        push_sender = getattr(self.task_manager, "push_sender", None)
+        if push_sender is not None:
+            push_sender.load_auth()
+        try:
+            yield
+        finally:
+            if hasattr(self.task_manager, "aclose"):
+                await self.task_manager.aclose()
+
+    async def _get_jwks(self, request: Request) -> Response:
+        # Waits for a signing key that is still being generated
+        auth = await self.task_manager.push_sender.wait_auth()
+        return auth.handle_jwks_endpoint(request)
+
+    async def _get_metrics(self, request: Request) -> Response:
+        return PlainTextResponse(self.metrics.render(), media_type="text/plain; version=0.0.4")
+
+    async def _get_spooled_file(self, request: Request) -> Response:
+        path = self.task_manager.spool.path(request.path_params["name"])
+        if path is None or not os.path.exists(path):
+            return Response(status_code=404)
+        # Streamed from disk in chunks, so large files are never held in memory
+        return FileResponse(path, media_type="application/octet-stream")
+
+    async def _process_request(self, request: Request):
+        start = time.perf_counter()
+        try:
+            body = await request.json()
+        except Exception as e:
+            return self._handle_exception(e)
+        if not isinstance(body, list):
+            # Starlette caches the parsed body, so the base class can read it again
+            response = await super()._process_request(request)
+            self._request_seconds.observe(time.perf_counter() - start, _method_label(body))
+            return response
+        if not body:
+            response = JSONRPCResponse(id=None, error=InvalidRequestError(message="Empty batch"))
+            return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
+        if len(body) > self.max_batch_size:
+            response = JSONRPCResponse(
+                id=None,
+                error=InvalidRequestError(message=f"Batch of {len(body)} requests exceeds the limit of {self.max_batch_size}"),
+            )
+            return JSONResponse(response.model_dump(exclude_none=True), status_code=400)
+
+        # A fixed set of workers takes the requests in turn, so a batch never
+        # has more than batch_concurrency coroutines, and responses are
+        # stored in request order
+        responses: list[JSONRPCResponse | None] = [None] * len(body)
+        pending = iter(enumerate(body))
+
+        async def work() -> None:
+            for i, item in pending:
+                responses[i] = await self._process_batch_item(item)
+
+        await asyncio.gather(*(work() for _ in range(min(self.batch_concurrency, len(body)))))
+        self._request_seconds.observe(time.perf_counter() - start, "batch")
+        # Notifications, requests without an id, are run but get no response;
+        # a batch of nothing else gets no body at all
+        responses = [
+            response for item, response in zip(body, responses) if not (isinstance(item, dict) and "id" not in item)
+        ]
+        if not responses:
+            return Response(status_code=204)
+        if self.fast_json:
+            body = b"[" + b",".join(_to_json(response) for response in responses) + b"]"
+            return Response(body, media_type="application/json")
+        return JSONResponse([response.model_dump(exclude_none=True) for response in responses])
+
+    def _create_response(self, result: Any) -> Response:
+        if self.fast_json and isinstance(result, JSONRPCResponse):
+            response = Response(_to_json(result), media_type="application/json")
+        else:
+            response = super()._create_response(result)
+        if isinstance(result, JSONRPCResponse) and isinstance(result.error, ServerBusyError):
+            # Also tell HTTP clients and proxies when to come back
+            response.headers["Retry-After"] = str(math.ceil(result.error.data["retryAfter"]))
+        return response
+
+    async def _process_batch_item(self, item: Any) -> JSONRPCResponse:
+        start = time.perf_counter()
+        try:
+            return await self._dispatch_batch_item(item)
+        finally:
+            self._request_seconds.observe(time.perf_counter() - start, _method_label(item))
+
+    async def _dispatch_batch_item(self, item: Any) -> JSONRPCResponse:
+        request_id = item.get("id") if isinstance(item, dict) else None
+        try:
+            json_rpc_request = A2ARequest.validate_python(item)
+        except ValidationError as e:
+            return JSONRPCResponse(id=request_id, error=InvalidRequestError(data=json.loads(e.json())))
+
+        try:
+            if isinstance(json_rpc_request, SendTaskRequest):
+                return await self.task_manager.on_send_task(json_rpc_request)
+            elif isinstance(json_rpc_request, GetTaskRequest):
+                return await self.task_manager.on_get_task(json_rpc_request)
+            elif isinstance(json_rpc_request, CancelTaskRequest):
+                return await self.task_manager.on_cancel_task(json_rpc_request)
+            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
+                return await self.task_manager.on_set_task_push_notification(json_rpc_request)
+            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
+                return await self.task_manager.on_get_task_push_notification(json_rpc_request)
+            # Streaming responses cannot be embedded in a batch response
+            return JSONRPCResponse(
+                id=request_id,
+                error=InvalidRequestError(message=f"{json_rpc_request.method} cannot be batched"),
+            )
+        except Exception as e:
+            logger.error(f"Unhandled exception in batch item {request_id}: {e}")
+            return JSONRPCResponse(id=request_id, error=InternalError())
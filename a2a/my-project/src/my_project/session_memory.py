@@ -0,0 +1,141 @@
+import sys
+from collections import OrderedDict
+
+# A turn is the role that spoke ("user" or "agent") and what it said
+Turn = tuple[str, str]
+
+# Rough memory held by an empty session: its ring, slot list and LRU entry
+_SESSION_OVERHEAD_BYTES = 256
+
+
+class _SessionRing:
+    """Fixed-capacity ring buffer of the most recent turns of one session."""
+
+    __slots__ = ("turns", "start", "size", "bytes")
+
+    def __init__(self):
+        # Slots are added as the ring fills up and reused once it is full
+        self.turns: list[Turn | None] = []
+        self.start = 0
+        self.size = 0
+        self.bytes = 0
+
+    def append(self, turn: Turn, turn_bytes: int, capacity: int) -> int:
+        """Add a turn, overwriting the oldest one when full; returns the bytes freed."""
+        freed = 0
+        if self.size < capacity:
+            index = (self.start + self.size) % capacity
+            if index == len(self.turns):
+                self.turns.append(turn)
+            else:
+                self.turns[index] = turn
+            self.size += 1
+        else:
+            freed = sys.getsizeof(self.turns[self.start][1])
+            self.turns[self.start] = turn
+            self.start = (self.start + 1) % capacity
+        self.bytes += turn_bytes - freed
+        return freed
+
+    def pop_oldest(self, capacity: int) -> int:
+        turn = self.turns[self.start]
+        self.turns[self.start] = None
+        self.start = (self.start + 1) % capacity
+        self.size -= 1
+        freed = sys.getsizeof(turn[1])
+        self.bytes -= freed
+        return freed
+
+    def recent(self, count: int, capacity: int) -> list[Turn]:
+        count = min(count, self.size)
+        first = self.start + self.size - count
+        return [self.turns[i % capacity] for i in range(first, first + count)]
+
+
+class SessionMemory:
+    """Recent conversation turns of each sessionId, within fixed memory bounds.
+
+    Every session keeps at most ``max_turns`` turns in a ring buffer, and
+    drops its oldest turns once they hold more than ``max_session_bytes``;
+    a single turn larger than that is cut short. Sessions are evicted in
+    least recently used order beyond ``max_sessions`` sessions or
+    ``max_total_bytes`` in total, so memory use stays bounded no matter
+    how many sessions clients open. Appending and reading recent turns
+    cost O(1) per turn.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 100_000,
+        max_turns: int = 16,
+        max_session_bytes: int = 16 * 1024,
+        max_total_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self._sessions: OrderedDict[str, _SessionRing] = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+
+    def append(self, session_id: str, role: str, text: str | list[str]) -> None:
+        """Record a turn; ``text`` may be a list of pieces, as skills return."""
+        text = self._clip(text)
+        turn_bytes = sys.getsizeof(text)
+        ring = self._sessions.get(session_id)
+        if ring is None:
+            ring = self._sessions[session_id] = _SessionRing()
+            self.total_bytes += _SESSION_OVERHEAD_BYTES
+        else:
+            self._sessions.move_to_end(session_id)
+        self.total_bytes += turn_bytes - ring.append((role, text), turn_bytes, self.max_turns)
+        while ring.bytes > self.max_session_bytes and ring.size > 1:
+            self.total_bytes -= ring.pop_oldest(self.max_turns)
+        self._evict()
+
+    def recent(self, session_id: str, count: int | None = None) -> list[Turn]:
+        """Up to ``count`` most recent turns of a session, oldest first."""
+        ring = self._sessions.get(session_id)
+        if ring is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        return ring.recent(self.max_turns if count is None else count, self.max_turns)
+
+    def forget(self, session_id: str) -> None:
+        ring = self._sessions.pop(session_id, None)
+        if ring is not None:
+            self.total_bytes -= ring.bytes + _SESSION_OVERHEAD_BYTES
+
+    def stats(self) -> dict[str, int]:
+        return {"sessions": len(self._sessions), "bytes": self.total_bytes, "evictions": self.evictions}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _clip(self, text: str | list[str]) -> str:
+        # Only as many characters as the session budget can hold are kept,
+        # so a multi-megabyte turn is never joined or copied in full
+        limit = self.max_session_bytes - sys.getsizeof("")
+        pieces = [text] if isinstance(text, str) else text
+        kept = []
+        length = 0
+        for piece in pieces:
+            if length + len(piece) > limit:
+                kept.append(piece[:limit - length])
+                break
+            kept.append(piece)
+            length += len(piece)
+        text = kept[0] if len(kept) == 1 else "".join(kept)
+        # Non-ASCII text takes up to four bytes per character
+        while sys.getsizeof(text) > self.max_session_bytes and text:
+            text = text[:len(text) // 2]
+        return text
+
+    def _evict(self) -> None:
+        while self._sessions and (
+            len(self._sessions) > self.max_sessions or self.total_bytes > self.max_total_bytes
+        ):
+            _, ring = self._sessions.popitem(last=False)
+            self.total_bytes -= ring.bytes + _SESSION_OVERHEAD_BYTES
+            self.evictions += 1
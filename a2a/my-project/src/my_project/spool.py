@@ -0,0 +1,113 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import pathlib
+import re
+import tempfile
+import time
+
+from google_a2a.common.types import FileContent, FilePart, Message
+
+logger = logging.getLogger(__name__)
+
+# Spooled files are named by the SHA-256 of their content
+SPOOL_NAME = re.compile(r"^[0-9a-f]{64}$")
+
+
+class FileSpool:
+    """Moves large inline file parts out of memory into a spool directory.
+
+    A file part whose base64 ``bytes`` are at least ``threshold`` characters
+    long is decoded to a file and replaced by a part that only carries a
+    ``uri`` under ``base_url``, which the server maps back to the file. Files
+    are content addressed, so the same upload is stored once, and are
+    removed ``max_age`` seconds after they were last written.
+    """
+
+    def __init__(self, directory: str, threshold: int = 256 * 1024, max_age: float = 3600.0, base_url: str = ""):
+        self.directory = directory
+        self.threshold = threshold
+        self.max_age = max_age
+        self.base_url = base_url
+        self.spooled_files = 0
+        self.spooled_bytes = 0
+        self._last_purge = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name: str) -> str | None:
+        """Path of a spooled file, or None for names that cannot be spool entries."""
+        if not SPOOL_NAME.match(name):
+            return None
+        return os.path.join(self.directory, name)
+
+    def local_file(self, file: FileContent) -> FileContent:
+        """``file`` with a spool ``uri`` replaced by the file URI of the spooled file.
+
+        Skills run on this host, so they read spooled files from disk
+        instead of fetching them back over HTTP. Other files are returned
+        unchanged.
+        """
+        if file.uri is None or not file.uri.startswith(self.base_url):
+            return file
+        path = self.path(file.uri[len(self.base_url):])
+        if path is None:
+            return file
+        return file.model_copy(update={"uri": pathlib.Path(path).resolve().as_uri()})
+
+    async def spool_message(self, message: Message) -> None:
+        """Replace the large inline file parts of ``message`` in place."""
+        for i, part in enumerate(message.parts):
+            if part.type != "file" or part.file.bytes is None or len(part.file.bytes) < self.threshold:
+                continue
+            # Decoding, hashing and writing megabytes would stall the event loop
+            name = await asyncio.to_thread(self._write, part.file.bytes)
+            if name is None:
+                continue
+            message.parts[i] = FilePart(
+                file=FileContent(name=part.file.name, mimeType=part.file.mimeType, uri=self.base_url + name),
+                metadata=part.metadata,
+            )
+
+    def _write(self, data: str) -> str | None:
+        try:
+            content = base64.b64decode(data, validate=True)
+        except binascii.Error:
+            # Leave parts we cannot decode untouched rather than rejecting the message
+            logger.warning("Not spooling a file part with invalid base64 content")
+            return None
+        name = hashlib.sha256(content).hexdigest()
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path):
+            # Refresh the age of an already spooled copy
+            os.utime(path)
+        else:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self.spooled_files += 1
+            self.spooled_bytes += len(content)
+        if time.monotonic() - self._last_purge > self.max_age / 10:
+            self.purge()
+        return name
+
+    def purge(self) -> int:
+        """Delete spooled files that are older than ``max_age``."""
+        self._last_purge = time.monotonic()
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+            except FileNotFoundError:
+                # Another worker sharing the directory got there first
+                pass
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        return {"spooled_files": self.spooled_files, "spooled_bytes": self.spooled_bytes}
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from google_a2a.common.types import Task
+from my_project.task_store import TERMINAL_STATES, TaskStore
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    body TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+_UPSERT = """
+INSERT INTO tasks (id, state, body, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    state = excluded.state,
+    body = excluded.body,
+    updated_at = excluded.updated_at
+"""
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class SqliteTaskStore(TaskStore):
+    """TaskStore that persists tasks to a SQLite database in WAL mode.
+
+    The in-memory store acts as a bounded cache in front of the database; a
+    task that is not cached is loaded from disk by ``load`` on a reader
+    thread, and concurrent loads of one task share a single read. ``put``
+    and ``pop`` only record the task as dirty or deleted. A background
+    thread coalesces them and writes them in one transaction per
+    ``commit_interval`` (group commit), so the event loop never waits for
+    the disk. ``get`` reads synchronously and is meant for code off the
+    request path.
+
+    Finished tasks are removed from the database ``retention`` seconds after
+    their last update, checked every ``purge_interval`` seconds; ``None``
+    keeps them forever.
+
+    With ``shared=True`` several server processes can use the same database:
+    reads bypass the cache, and ``wait_durable`` blocks until the commit
+    carrying a task has finished, so a response is only sent once every
+    other process can see the task.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        commit_interval: float = 0.005,
+        retention: float | None = None,
+        purge_interval: float = 60.0,
+        shared: bool = False,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.path = path
+        self.commit_interval = commit_interval
+        self.retention = retention
+        self.purge_interval = purge_interval
+        self.shared = shared
+        self.commits = 0
+        self.written_tasks = 0
+        # Dirty tasks waiting for the writer, and the batch it is committing
+        self._pending: dict[str, Task] = {}
+        self._flushing: dict[str, Task] = {}
+        # Popped tasks whose rows the writer has yet to delete; until it has,
+        # reads treat them as missing
+        self._pending_deletes: set[str] = set()
+        self._flushing_deletes: set[str] = set()
+        # Futures resolved once the pending or flushing batch is committed
+        self._pending_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._flushing_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        # Cache misses are read on this thread, the only user of _reader
+        self._read_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-task-store-reader")
+        self._reader = self._connect()
+        self._loading: dict[str, asyncio.Future] = {}
+        self._writer = threading.Thread(
+            target=self._write_loop, name="sqlite-task-store-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only syncs at checkpoints and is still crash safe
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Other processes sharing the database may hold the write lock
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute(_SCHEMA)
+        return conn
+
+    def get(self, task_id: str, default: Task | None = None) -> Task | None:
+        task = self._local(task_id)
+        if task is None:
+            if self._is_deleted(task_id):
+                return default
+            task = self._read_thread.submit(self._read, task_id).result()
+            if task is None:
+                return default
+        # Cache it without scheduling a write back
+        return TaskStore.put(self, task)
+
+    async def load(self, task_id: str, default: Task | None = None) -> Task | None:
+        task = self._local(task_id)
+        if task is not None:
+            return TaskStore.put(self, task)
+        if self._is_deleted(task_id):
+            return default
+        loading = self._loading.get(task_id)
+        if loading is None:
+            loading = self._loading[task_id] = asyncio.wrap_future(self._read_thread.submit(self._read, task_id))
+            loading.add_done_callback(lambda _: self._loading.pop(task_id, None))
+        # shield: a caller that gives up must not cancel the read for the others
+        task = await asyncio.shield(loading)
+        # A put or pop made while the row was being read is newer
+        local = self._local(task_id)
+        if local is not None:
+            task = local
+        elif task is None or self._is_deleted(task_id):
+            return default
+        return TaskStore.put(self, task)
+
+    def put(self, task: Task) -> Task:
+        super().put(task)
+        with self._cond:
+            self._pending[task.id] = task
+            self._pending_deletes.discard(task.id)
+            self._cond.notify()
+        return task
+
+    def pop(self, task_id: str, default: Task | None = None) -> Task | None:
+        """Remove a task without reading it from disk.
+
+        The task is returned only if it is held in memory; its row is
+        deleted by the writer either way.
+        """
+        task = self._local(task_id)
+        super().pop(task_id)
+        with self._cond:
+            self._pending.pop(task_id, None)
+            self._pending_deletes.add(task_id)
+            self._cond.notify()
+        return task if task is not None else default
+
+    def _local(self, task_id: str) -> Task | None:
+        # Another process may have changed the task since it was cached
+        if not self.shared:
+            task = super().get(task_id)
+            if task is not None:
+                return task
+        # Local writes that have not reached the disk yet are the newest
+        return self._pending.get(task_id) or self._flushing.get(task_id)
+
+    def _is_deleted(self, task_id: str) -> bool:
+        return task_id in self._pending_deletes or task_id in self._flushing_deletes
+
+    def _read(self, task_id: str) -> Task | None:
+        # Runs on the reader thread, parsing included
+        row = self._reader.execute("SELECT body FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return Task.model_validate_json(row[0]) if row is not None else None
+
+    async def wait_durable(self, task_id: str) -> None:
+        if not self.shared:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            if task_id in self._pending:
+                self._pending_waiters.append((loop, future))
+            elif task_id in self._flushing:
+                self._flushing_waiters.append((loop, future))
+            else:
+                return
+        await future
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every task put so far has been committed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._flushing or self._pending_deletes or self._flushing_deletes:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._read_thread.shutdown()
+        self._reader.close()
+
+    def stats(self) -> dict[str, int]:
+        stats = super().stats()
+        stats["pending_writes"] = len(self._pending)
+        stats["commits"] = self.commits
+        stats["written_tasks"] = self.written_tasks
+        return stats
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        last_purge = time.monotonic()
+        try:
+            while True:
+                with self._cond:
+                    while not self._pending and not self._pending_deletes and not self._closed:
+                        self._cond.wait()
+                    if not self._pending and not self._pending_deletes and self._closed:
+                        return
+                    closed = self._closed
+                if not closed:
+                    # Let writes from other requests join this commit
+                    time.sleep(self.commit_interval)
+                with self._cond:
+                    self._flushing, self._pending = self._pending, {}
+                    self._flushing_deletes, self._pending_deletes = self._pending_deletes, set()
+                    self._flushing_waiters, self._pending_waiters = self._pending_waiters, []
+                try:
+                    self._commit(conn, self._flushing, self._flushing_deletes)
+                except Exception as e:
+                    logger.error(f"Failed to persist {len(self._flushing)} tasks: {e}")
+                    with self._cond:
+                        # Newer versions queued meanwhile take precedence
+                        for task_id, task in self._flushing.items():
+                            if task_id not in self._pending_deletes:
+                                self._pending.setdefault(task_id, task)
+                        for task_id in self._flushing_deletes:
+                            if task_id not in self._pending:
+                                self._pending_deletes.add(task_id)
+                        self._pending_waiters.extend(self._flushing_waiters)
+                        self._flushing_waiters = []
+                    time.sleep(1.0)
+                with self._cond:
+                    self._flushing = {}
+                    self._flushing_deletes = set()
+                    waiters, self._flushing_waiters = self._flushing_waiters, []
+                    self._cond.notify_all()
+                for loop, future in waiters:
+                    loop.call_soon_threadsafe(_resolve, future)
+
+                if self.retention is not None and time.monotonic() - last_purge > self.purge_interval:
+                    last_purge = time.monotonic()
+                    self._purge(conn)
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, tasks: dict[str, Task], deletes: set[str]) -> None:
+        now = time.time()
+        rows = [
+            (task_id, task.status.state.value, task.model_dump_json(exclude_none=True), now)
+            for task_id, task in tasks.items()
+        ]
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(_UPSERT, rows)
+            # After the upserts: a task popped after it was put stays deleted
+            conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in deletes])
+        self.commits += 1
+        self.written_tasks += len(rows)
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        states = [state.value for state in TERMINAL_STATES]
+        placeholders = ", ".join("?" * len(states))
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute(
+                f"DELETE FROM tasks WHERE state IN ({placeholders}) AND updated_at < ?",
+                (*states, time.time() - self.retention),
+            )
@@ -0,0 +1,80 @@
+import contextlib
+import json
+import logging
+import os
+import socket
+import time
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+def _process_age() -> float | None:
+    """Seconds since this process started (Linux only)."""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces; fields resume after it
+            fields = f.read().rpartition(")")[2].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupTimer:
+    """Times the steps of starting the server, for the startup report.
+
+    Time spent before the timer was created, mostly interpreter start-up,
+    shows up as the "interpreter" step where /proc tells process age.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps: dict[str, float] = {}
+        age = _process_age()
+        if age is not None:
+            self.steps["interpreter"] = age
+
+    @contextlib.contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0.0) + time.perf_counter() - start
+
+    def elapsed(self) -> float:
+        return self.steps.get("interpreter", 0.0) + time.perf_counter() - self.started
+
+    def report(self) -> dict:
+        return {"pid": os.getpid(), "ready_seconds": round(self.elapsed(), 4), "steps": {
+            name: round(seconds, 4) for name, seconds in self.steps.items()
+        }}
+
+    def summary(self) -> str:
+        steps = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.steps.items())
+        return f"Ready in {self.elapsed() * 1000:.0f} ms ({steps})"
+
+
+def notify_ready(ready_file: str | None, report: dict) -> None:
+    """Tell supervisors the server accepts connections.
+
+    Writes ``report`` as JSON to ``ready_file``, atomically so pollers never
+    read half a file, and sends READY=1 to systemd when NOTIFY_SOCKET is set.
+    """
+    if ready_file:
+        tmp = f"{ready_file}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(report, f)
+        os.replace(tmp, ready_file)
+    notify_socket = os.environ.get("NOTIFY_SOCKET")
+    if notify_socket:
+        # A leading @ names a socket in the abstract namespace
+        address = "\0" + notify_socket[1:] if notify_socket.startswith("@") else notify_socket
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+                sock.connect(address)
+                sock.sendall(b"READY=1")
+        except OSError as e:
+            logger.warning(f"Could not notify {notify_socket}: {e}")
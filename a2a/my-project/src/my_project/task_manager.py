@@ -1,38 +1,311 @@
-from typing import AsyncIterable
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterable, Iterator
 
 import google_a2a
 from google_a2a.common.server.task_manager import InMemoryTaskManager
 from google_a2a.common.types import (
   Artifact,
+  CancelTaskRequest,
+  CancelTaskResponse,
+  ContentTypeNotSupportedError,
+  FileContent,
+  GetTaskRequest,
+  GetTaskResponse,
+  InternalError,
+  InvalidParamsError,
+  JSONRPCError,
   JSONRPCResponse,
   Message,
+  Part,
+  PushNotificationConfig,
   SendTaskRequest,
   SendTaskResponse,
   SendTaskStreamingRequest,
   SendTaskStreamingResponse,
+  SetTaskPushNotificationRequest,
+  SetTaskPushNotificationResponse,
   Task,
+  TaskArtifactUpdateEvent,
+  TaskNotCancelableError,
+  TaskNotFoundError,
+  TaskResubscriptionRequest,
+  TaskSendParams,
   TaskState,
   TaskStatus,
   TaskStatusUpdateEvent,
+  TextPart,
 )
+from my_project.agent import AgentExecutor, SkillCancelled
+from my_project.admission import AdmissionController, AdmissionRejected, ServerBusyError
+from my_project.dedup import DedupCache
+from my_project.locks import StripedLock
+from my_project.metrics import MetricsRegistry
+from my_project.push_notifications import PushNotificationDispatcher
+from my_project.session_memory import SessionMemory
+from my_project.spool import FileSpool
+from my_project.task_store import TERMINAL_STATES, TaskStore
+
+logger = logging.getLogger(__name__)
+
+
+class TaskAlreadyRunningError(JSONRPCError):
+  code: int = -32051
+  message: str = "Task is already running"
+  data: Any | None = None
+
+
+class PushNotificationURLRejected(ValueError):
+  """Raised by upsert_task when the task's push notification URL fails verification."""
+
+
+def _invalid_push_url_error() -> InvalidParamsError:
+  return InvalidParamsError(message="Push notification URL is invalid")
+
+
+def _message_error(message: Message) -> JSONRPCError | None:
+  # Checked before the task is stored, so a message no skill can take
+  # never leaves a task behind
+  if not message.parts:
+    return InvalidParamsError(message="Message has no parts")
+  if not any(part.type in ("text", "file") for part in message.parts):
+    return ContentTypeNotSupportedError()
+  return None
+
+
+def _skill_input(message: Message, spool: FileSpool | None) -> tuple[str, list[FileContent]]:
+  # Skills take the text of the message and its files; spooled files are
+  # handed over by their local path rather than read back into memory
+  texts = [part.text for part in message.parts if part.type == "text"]
+  files = [part.file for part in message.parts if part.type == "file"]
+  if spool is not None:
+    files = [spool.local_file(file) for file in files]
+  return texts[0] if len(texts) == 1 else "\n".join(texts), files
+
+# Task store statistics that only ever grow
+_STORE_COUNTERS = {"evictions", "expirations", "commits", "written_tasks"}
 
 class MyAgentTaskManager(InMemoryTaskManager):
-  def __init__(self):
+  def __init__(
+    self,
+    sse_queue_size: int = 64,
+    sse_put_timeout: float = 0.5,
+    artifact_chunk_size: int = 4096,
+    task_store: TaskStore | None = None,
+    resubscribe_poll_interval: float = 0.1,
+    lock_stripes: int = 64,
+    metrics: MetricsRegistry | None = None,
+    spool: FileSpool | None = None,
+    push_sender: PushNotificationDispatcher | None = None,
+    admission: AdmissionController | None = None,
+    dedup: DedupCache | None = None,
+    executor: AgentExecutor | None = None,
+    session_memory: SessionMemory | None = None,
+  ):
     super().__init__()
+    # Replace the unbounded dict kept by InMemoryTaskManager
+    self.tasks = task_store if task_store is not None else TaskStore()
+    # Writers to a task serialize on that task's stripe instead of the
+    # single InMemoryTaskManager.lock; reads take no lock at all. Writers
+    # await TaskStore.load inside the lock, which with SQLite reads from
+    # disk on another thread: two unlocked updates of one task could both
+    # load it while the writer commits, and the second put would drop the
+    # first update (see benchmarks/bench_lock_contention.py)
+    self.task_locks = StripedLock(lock_stripes)
+    # Every SSE subscriber gets its own bounded queue. The producer waits
+    # for full queues all at once, for at most sse_put_timeout per event;
+    # subscribers still full by then are dropped instead of letting their
+    # backlog grow without limit
+    self.sse_queue_size = sse_queue_size
+    self.sse_put_timeout = sse_put_timeout
+    self.artifact_chunk_size = artifact_chunk_size
+    self.resubscribe_poll_interval = resubscribe_poll_interval
+    # Large inline file parts are moved to disk before they reach the store
+    self.spool = spool
+    # Skill handlers run in its thread or process pool, never on the event loop
+    self.executor = executor if executor is not None else AgentExecutor()
+    # Recent turns of each session, handed to skills as context
+    self.session_memory = session_memory
+    # Task state changes are handed to the dispatcher, which delivers them
+    # to the configured URLs without holding up the request
+    self.push_sender = push_sender
+    # Bounds the tasks that are worked on at once; tasks/send and
+    # tasks/sendSubscribe over the limit queue briefly and are then rejected
+    self.admission = admission
+    # Retried tasks/send requests are answered from here rather than run again
+    self.dedup = dedup
+    # push_notification_infos is pruned of tasks that left the store
+    # whenever it grows past this size
+    self._push_prune_at = 1024
+    # Tasks a tasks/send or tasks/sendSubscribe of this process is working
+    # on; another request for one of them is rejected
+    self._active_tasks: set[str] = set()
+    # Strong references to running stream producers so they are not
+    # garbage collected before they finish
+    self._background_tasks: set[asyncio.Task] = set()
+    self.metrics = metrics if metrics is not None else MetricsRegistry()
+    self._register_metrics()
+
+  def _register_metrics(self) -> None:
+    # The request path only pays for two histogram observations; everything
+    # else is read from existing state when /metrics is scraped
+    metrics = self.metrics
+    self._send_task_seconds = metrics.histogram(
+      "a2a_send_task_seconds", "Time spent in on_send_task, including the durable write"
+    )
+    self._update_task_seconds = metrics.histogram(
+      "a2a_update_task_seconds", "Time spent applying a task update, including the lock wait"
+    )
+    metrics.gauge(
+      "a2a_tasks", "Resident tasks by state", label="state",
+      callback=lambda: {state.value: count for state, count in self.tasks.count_by_state().items()},
+    )
+    # Whatever the store reports, so durable backends add their own figures
+    for name in self.tasks.stats():
+      is_counter = name in _STORE_COUNTERS
+      metrics.gauge(
+        f"a2a_task_store_{name}" + ("_total" if is_counter else ""),
+        f"Task store {name.replace('_', ' ')}",
+        callback=lambda name=name: self.tasks.stats()[name],
+        kind="counter" if is_counter else "gauge",
+      )
+    if self.spool is not None:
+      for name, help in (
+        ("spooled_files", "File parts moved to the spool directory"),
+        ("spooled_bytes", "Decoded bytes written to the spool directory"),
+      ):
+        metrics.gauge(
+          f"a2a_{name}_total", help,
+          callback=lambda name=name: self.spool.stats()[name], kind="counter",
+        )
+    if self.push_sender is not None:
+      for name in self.push_sender.stats():
+        is_gauge = name == "queue_depth"
+        metrics.gauge(
+          f"a2a_push_notifications_{name}" + ("" if is_gauge else "_total"),
+          f"Push notifications {name.replace('_', ' ')}",
+          callback=lambda name=name: self.push_sender.stats()[name],
+          kind="gauge" if is_gauge else "counter",
+        )
+    if self.admission is not None:
+      metrics.gauge(
+        "a2a_admission_in_flight", "Tasks holding an admission slot",
+        callback=lambda: self.admission.in_flight,
+      )
+      metrics.gauge(
+        "a2a_admission_queue_depth", "Tasks waiting for an admission slot",
+        callback=lambda: self.admission.queue_depth,
+      )
+      metrics.gauge(
+        "a2a_admission_admitted_total", "Tasks admitted", callback=lambda: self.admission.admitted, kind="counter",
+      )
+      metrics.gauge(
+        "a2a_admission_rejected_total", "Tasks rejected by admission control", label="reason",
+        callback=lambda: dict(self.admission.rejected), kind="counter",
+      )
+    if self.dedup is not None:
+      metrics.gauge(
+        "a2a_dedup_entries", "Responses kept for retried tasks/send requests",
+        callback=lambda: self.dedup.stats()["entries"],
+      )
+      metrics.gauge(
+        "a2a_dedup_requests_total", "tasks/send requests by deduplication outcome", label="outcome",
+        callback=lambda: {name: value for name, value in self.dedup.stats().items() if name != "entries"},
+        kind="counter",
+      )
+    metrics.gauge(
+      "a2a_executor_running", "Skill runs in progress",
+      callback=lambda: self.executor.running,
+    )
+    metrics.gauge(
+      "a2a_executor_runs_total", "Finished skill runs by outcome", label="outcome",
+      callback=lambda: dict(self.executor.outcomes), kind="counter",
+    )
+    if self.session_memory is not None:
+      metrics.gauge(
+        "a2a_session_memory_sessions", "Sessions with remembered turns",
+        callback=lambda: len(self.session_memory),
+      )
+      metrics.gauge(
+        "a2a_session_memory_bytes", "Estimated memory held by session turns",
+        callback=lambda: self.session_memory.total_bytes,
+      )
+      metrics.gauge(
+        "a2a_session_memory_evictions_total", "Sessions evicted to stay within bounds",
+        callback=lambda: self.session_memory.evictions, kind="counter",
+      )
+    metrics.gauge(
+      "a2a_sse_streams", "Tasks with at least one SSE subscriber",
+      callback=lambda: len(self.task_sse_subscribers),
+    )
+    metrics.gauge(
+      "a2a_sse_subscribers", "Open SSE subscriber queues",
+      callback=lambda: sum(len(queues) for queues in self.task_sse_subscribers.values()),
+    )
+    metrics.gauge(
+      "a2a_sse_queued_events", "Events waiting in SSE subscriber queues",
+      callback=lambda: sum(q.qsize() for queues in self.task_sse_subscribers.values() for q in queues),
+    )
+    for name, help in (
+      ("acquisitions", "Task lock acquisitions"),
+      ("contended", "Task lock acquisitions that had to wait"),
+      ("wait_seconds", "Time spent waiting for contended task locks"),
+    ):
+      metrics.gauge(
+        f"a2a_task_lock_{name}_total", help,
+        callback=lambda name=name: self.task_locks.stats()[name], kind="counter",
+      )
 
   async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
-    # Upsert a task stored by InMemoryTaskManager
-    await self.upsert_task(request.params)
+    # Deduplicate first, so that retries take no admission slot
+    if self.dedup is not None:
+      return await self.dedup.run(request, self._admit_send_task)
+    return await self._admit_send_task(request)
 
+  async def _admit_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
     task_id = request.params.id
-    # Our custom logic that simply marks the task as complete
-    # and returns the echo text
-    received_text = request.params.message.parts[0].text
-    task = await self._update_task(
-      task_id=task_id,
-      task_state=TaskState.COMPLETED,
-      response_text=f"on_send_task received: {received_text}"
-    )
+    error = _message_error(request.params.message)
+    if error is not None:
+      return SendTaskResponse(id=request.id, error=error)
+    if not self._claim_task(task_id):
+      return SendTaskResponse(id=request.id, error=TaskAlreadyRunningError())
+    try:
+      if self.admission is None:
+        return await self._send_task(request)
+      try:
+        async with self.admission.slot():
+          return await self._send_task(request)
+      except AdmissionRejected as e:
+        return SendTaskResponse(id=request.id, error=self._busy_error(e))
+    finally:
+      self._active_tasks.discard(task_id)
+
+  def _claim_task(self, task_id: str) -> bool:
+    # Checked and claimed with no await in between, so of two requests for
+    # the same task only one gets through; the other is rejected before it
+    # touches the task
+    if task_id in self._active_tasks:
+      return False
+    self._active_tasks.add(task_id)
+    return True
+
+  @staticmethod
+  def _busy_error(rejection: AdmissionRejected) -> ServerBusyError:
+    return ServerBusyError(data={"reason": rejection.reason, "retryAfter": rejection.retry_after})
+
+  async def _send_task(self, request: SendTaskRequest) -> SendTaskResponse:
+    start = time.perf_counter()
+    # Upsert a task stored by InMemoryTaskManager
+    try:
+      task = await self.upsert_task(request.params)
+    except PushNotificationURLRejected:
+      return SendTaskResponse(id=request.id, error=_invalid_push_url_error())
+
+    task, _ = await self._run_skill(task, request.params)
+    # With a shared store, another worker may serve the next request for this task
+    await self.tasks.wait_durable(task.id)
+    self._send_task_seconds.observe(time.perf_counter() - start)
 
     # Send the response
     return SendTaskResponse(id=request.id, result=task)
@@ -41,31 +314,427 @@ class MyAgentTaskManager(InMemoryTaskManager):
     self,
     request: SendTaskStreamingRequest
   ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
-    pass
+    task_id = request.params.id
+    error = _message_error(request.params.message)
+    if error is not None:
+      return JSONRPCResponse(id=request.id, error=error)
+    # To follow a running task, clients resubscribe instead
+    if not self._claim_task(task_id):
+      return JSONRPCResponse(id=request.id, error=TaskAlreadyRunningError())
+    admitted_at = None
+    try:
+      if self.admission is not None:
+        try:
+          admitted_at = await self.admission.acquire()
+        except AdmissionRejected as e:
+          self._active_tasks.discard(task_id)
+          return JSONRPCResponse(id=request.id, error=self._busy_error(e))
+      task = await self.upsert_task(request.params)
+    except PushNotificationURLRejected:
+      if admitted_at is not None:
+        self.admission.release(admitted_at)
+      self._active_tasks.discard(task_id)
+      return JSONRPCResponse(id=request.id, error=_invalid_push_url_error())
+    except BaseException:
+      if admitted_at is not None:
+        self.admission.release(admitted_at)
+      self._active_tasks.discard(task_id)
+      raise
 
-  async def _update_task(
+    # Register the subscriber before the producer starts so that no
+    # event can be published ahead of it
+    sse_event_queue = await self.setup_sse_consumer(task_id)
+    # The producer holds the admission slot until the stream is complete
+    producer = asyncio.create_task(self._run_streaming_echo(task, request.params, admitted_at))
+    self._background_tasks.add(producer)
+    producer.add_done_callback(self._background_tasks.discard)
+
+    # Return the event stream right away; events are pushed as they are produced
+    return self.dequeue_events_for_sse(request.id, task_id, sse_event_queue)
+
+  async def on_resubscribe_to_task(
+    self,
+    request: TaskResubscriptionRequest
+  ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+    task_id = request.params.id
+    if await self.tasks.load(task_id) is None:
+      return JSONRPCResponse(id=request.id, error=TaskNotFoundError())
+
+    # Attach to the live stream when this process is producing it
+    if task_id in self.task_sse_subscribers:
+      try:
+        sse_event_queue = await self.setup_sse_consumer(task_id, is_resubscribe=True)
+        return self.dequeue_events_for_sse(request.id, task_id, sse_event_queue)
+      except ValueError:
+        # The stream ended in the meantime
+        pass
+    # Otherwise the task is followed through the store, which is shared
+    # when several workers serve the same agent
+    return self._follow_task_in_store(request.id, task_id)
+
+  async def _follow_task_in_store(self, request_id, task_id: str) -> AsyncIterable[SendTaskStreamingResponse]:
+    last_status = None
+    while True:
+      task = await self.tasks.load(task_id)
+      if task is None:
+        yield SendTaskStreamingResponse(id=request_id, error=TaskNotFoundError())
+        return
+      final = task.status.state in TERMINAL_STATES
+      if final:
+        for artifact in task.artifacts or ():
+          yield SendTaskStreamingResponse(
+            id=request_id,
+            result=TaskArtifactUpdateEvent(id=task_id, artifact=artifact),
+          )
+      if final or task.status != last_status:
+        last_status = task.status
+        yield SendTaskStreamingResponse(
+          id=request_id,
+          result=TaskStatusUpdateEvent(id=task_id, status=task.status, final=final),
+        )
+      if final:
+        return
+      await asyncio.sleep(self.resubscribe_poll_interval)
+
+  async def _run_streaming_echo(
+    self,
+    task: Task,
+    task_send_params: TaskSendParams,
+    admitted_at: float | None = None,
+  ) -> None:
+    task_id = task.id
+    try:
+      await self.enqueue_events_for_sse(
+        task_id,
+        TaskStatusUpdateEvent(id=task_id, status=TaskStatus(state=TaskState.WORKING)),
+      )
+
+      async def on_progress(text: str) -> None:
+        await self.enqueue_events_for_sse(
+          task_id,
+          TaskStatusUpdateEvent(
+            id=task_id,
+            status=TaskStatus(state=TaskState.WORKING, message=Message(role="agent", parts=[TextPart(text=text)])),
+          ),
+        )
+
+      task, response_parts = await self._run_skill(task, task_send_params, on_progress)
+      # The task is only complete once its artifacts have gone out, but
+      # _run_skill has already stored the final state; send them first
+      for artifact in self._artifact_chunks(response_parts or ()):
+        await self.enqueue_events_for_sse(
+          task_id,
+          TaskArtifactUpdateEvent(id=task_id, artifact=artifact),
+        )
+      await self.enqueue_events_for_sse(
+        task_id,
+        TaskStatusUpdateEvent(id=task_id, status=task.status, final=True),
+      )
+    except Exception as e:
+      logger.error(f"An error occurred while streaming task {task_id}: {e}")
+      await self.enqueue_events_for_sse(
+        task_id,
+        InternalError(message=f"An error occurred while streaming the response: {e}"),
+      )
+    finally:
+      if self.admission is not None:
+        self.admission.release(admitted_at)
+      self._active_tasks.discard(task_id)
+
+  async def _run_skill(
+    self,
+    task: Task,
+    task_send_params: TaskSendParams,
+    on_progress=None,
+  ) -> tuple[Task, list[TextPart] | None]:
+    # Runs the skill in the executor and stores the outcome; returns the
+    # updated task and, when it completed, the response parts. Once the
+    # task is WORKING every error ends it, so none is left running forever
+    received_text, files = _skill_input(task_send_params.message, self.spool)
+    skill_id = (task_send_params.metadata or {}).get("skillId")
+    memory = self.session_memory
+    history = memory.recent(task.sessionId) if memory is not None else None
+    try:
+      task = await self._update_task(task=task, task_state=TaskState.WORKING)
+      pieces = await self.executor.run(task.id, received_text, skill_id, on_progress, history, files)
+      if memory is not None:
+        memory.append(task.sessionId, "user", received_text)
+        memory.append(task.sessionId, "agent", pieces)
+      response_parts = [TextPart(text=piece) for piece in pieces]
+      task = await self._update_task(task=task, task_state=TaskState.COMPLETED, response_parts=response_parts)
+    except SkillCancelled:
+      # on_cancel_task stores the same state, whichever of the two runs first
+      return await self._cancel_task(task), None
+    except TimeoutError:
+      message = f"Task timed out after {self.executor.timeout} s"
+      return await self._fail_task(task, message), None
+    except Exception as e:
+      logger.error(f"Skill failed for task {task.id}: {e}")
+      return await self._fail_task(task, f"Skill failed: {e}"), None
+    return task, response_parts
+
+  async def _cancel_task(self, task: Task) -> Task:
+    return await self._update_task(
+      task=task,
+      task_state=TaskState.CANCELED,
+      response_parts=[TextPart(text="Task was canceled")],
+      with_artifact=False,
+    )
+
+  async def _fail_task(self, task: Task, message: str) -> Task:
+    return await self._update_task(
+      task=task,
+      task_state=TaskState.FAILED,
+      response_parts=[TextPart(text=message)],
+      with_artifact=False,
+    )
+
+  def _artifact_chunks(self, parts: list[TextPart]) -> Iterator[Artifact]:
+    # Split the response into artifact chunks so clients can start
+    # rendering before the whole text has been sent. Parts are chunked
+    # one after another, without joining them into one string first
+    size = self.artifact_chunk_size
+    first = True
+    for i, part in enumerate(parts):
+      text = part.text
+      last_part = i == len(parts) - 1
+      start = 0
+      while True:
+        end = start + size
+        part_done = end >= len(text)
+        yield Artifact(
+          parts=[TextPart(text=text[start:end])],
+          index=0,
+          append=not first,
+          lastChunk=last_part and part_done,
+        )
+        first = False
+        if part_done:
+          break
+        start = end
+
+  async def setup_sse_consumer(self, task_id: str, is_resubscribe: bool = False) -> asyncio.Queue:
+    async with self.subscriber_lock:
+      if task_id not in self.task_sse_subscribers:
+        if is_resubscribe:
+          raise ValueError("Task not found for resubscription")
+        self.task_sse_subscribers[task_id] = []
+      sse_event_queue = asyncio.Queue(maxsize=self.sse_queue_size)
+      self.task_sse_subscribers[task_id].append(sse_event_queue)
+      return sse_event_queue
+
+  async def enqueue_events_for_sse(self, task_id: str, task_update_event) -> None:
+    # The same event object is handed to every subscriber, so fan-out
+    # costs one queue slot per subscriber rather than a copy of the payload
+    async with self.subscriber_lock:
+      subscribers = list(self.task_sse_subscribers.get(task_id, ()))
+    full = []
+    for sse_event_queue in subscribers:
+      try:
+        sse_event_queue.put_nowait(task_update_event)
+      except asyncio.QueueFull:
+        full.append(sse_event_queue)
+    if not full:
+      return
+    # Wait for room in every full queue concurrently, so the producer and
+    # the other subscribers are held up by one timeout at most, not one
+    # per slow subscriber
+    puts = {asyncio.ensure_future(sse_event_queue.put(task_update_event)): sse_event_queue for sse_event_queue in full}
+    _, pending = await asyncio.wait(puts, timeout=self.sse_put_timeout)
+    if not pending:
+      return
+    for put in pending:
+      put.cancel()
+    logger.warning(f"Dropping {len(pending)} slow SSE subscriber(s) for task {task_id}")
+    async with self.subscriber_lock:
+      current_subscribers = self.task_sse_subscribers.get(task_id)
+      for put in pending:
+        sse_event_queue = puts[put]
+        if current_subscribers is not None and sse_event_queue in current_subscribers:
+          current_subscribers.remove(sse_event_queue)
+        self._drop_sse_consumer(sse_event_queue)
+
+  @staticmethod
+  def _drop_sse_consumer(sse_event_queue: asyncio.Queue) -> None:
+    # Discard the backlog and leave a single error behind, which ends
+    # the subscriber's stream the next time it reads
+    while not sse_event_queue.empty():
+      sse_event_queue.get_nowait()
+    sse_event_queue.put_nowait(
+      InternalError(message="Subscriber could not keep up with the event stream")
+    )
+
+  async def dequeue_events_for_sse(
+    self,
+    request_id,
+    task_id: str,
+    sse_event_queue: asyncio.Queue,
+  ) -> AsyncIterable[SendTaskStreamingResponse]:
+    try:
+      while True:
+        event = await sse_event_queue.get()
+        if isinstance(event, JSONRPCError):
+          yield SendTaskStreamingResponse(id=request_id, error=event)
+          break
+        yield SendTaskStreamingResponse(id=request_id, result=event)
+        if isinstance(event, TaskStatusUpdateEvent) and event.final:
+          break
+    finally:
+      async with self.subscriber_lock:
+        subscribers = self.task_sse_subscribers.get(task_id)
+        if subscribers is not None:
+          # A dropped subscriber has already been removed
+          if sse_event_queue in subscribers:
+            subscribers.remove(sse_event_queue)
+          if not subscribers:
+            del self.task_sse_subscribers[task_id]
+
+  def close(self) -> None:
+    self.tasks.close()
+
+  async def aclose(self) -> None:
+    # Runs on the event loop at shutdown, before close()
+    if self.push_sender is not None:
+      await self.push_sender.aclose()
+    self.executor.shutdown()
+
+  def _notify_push(self, task: Task) -> None:
+    if self.push_sender is None:
+      return
+    config = self.push_notification_infos.get(task.id)
+    if config is not None:
+      self.push_sender.notify(task, config)
+
+  async def _prune_push_notification_infos(self) -> None:
+    for task_id in list(self.push_notification_infos):
+      if await self.tasks.load(task_id) is None:
+        del self.push_notification_infos[task_id]
+    self._push_prune_at = max(1024, 2 * len(self.push_notification_infos))
+
+  async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
+    # Updates change a task without awaiting once they hold it, and the
+    # copy is made without awaiting after the load, so it cannot observe a
+    # half-applied update and needs no lock
+    task_query_params = request.params
+    task = await self.tasks.load(task_query_params.id)
+    if task is None:
+      return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+    task_result = self.append_task_history(task, task_query_params.historyLength)
+    return GetTaskResponse(id=request.id, result=task_result)
+
+  async def on_cancel_task(self, request: CancelTaskRequest) -> CancelTaskResponse:
+    task = await self.tasks.load(request.params.id)
+    if task is None:
+      return CancelTaskResponse(id=request.id, error=TaskNotFoundError())
+    # Only a skill running in this process can be stopped
+    if not self.executor.cancel(task.id):
+      return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+    task = await self._cancel_task(task)
+    await self.tasks.wait_durable(task.id)
+    return CancelTaskResponse(id=request.id, result=task)
+
+  async def on_set_task_push_notification(
+    self,
+    request: SetTaskPushNotificationRequest,
+  ) -> SetTaskPushNotificationResponse:
+    # Only URLs that answer the validation-token handshake are stored, so
+    # the server cannot be pointed at arbitrary internal addresses
+    url = request.params.pushNotificationConfig.url
+    if self.push_sender is not None and not await self.push_sender.verify_url(url):
+      return SetTaskPushNotificationResponse(id=request.id, error=_invalid_push_url_error())
+    return await super().on_set_task_push_notification(request)
+
+  async def set_push_notification_info(self, task_id: str, notification_config: PushNotificationConfig):
+    async with self.task_locks.for_key(task_id):
+      if await self.tasks.load(task_id) is None:
+        raise ValueError(f"Task not found for {task_id}")
+      self.push_notification_infos[task_id] = notification_config
+    if len(self.push_notification_infos) > self._push_prune_at:
+      await self._prune_push_notification_infos()
+
+  async def get_push_notification_info(self, task_id: str) -> PushNotificationConfig:
+    if await self.tasks.load(task_id) is None:
+      raise ValueError(f"Task not found for {task_id}")
+    return self.push_notification_infos[task_id]
+
+  async def has_push_notification_info(self, task_id: str) -> bool:
+    return task_id in self.push_notification_infos
+
+  async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
+    push_notification = task_send_params.pushNotification
+    if (
+      push_notification is not None
+      and self.push_sender is not None
+      and not await self.push_sender.verify_url(push_notification.url)
+    ):
+      raise PushNotificationURLRejected(push_notification.url)
+    if self.spool is not None:
+      await self.spool.spool_message(task_send_params.message)
+    async with self.task_locks.for_key(task_send_params.id):
+      task = await self.tasks.load(task_send_params.id)
+      if task is None:
+        task = Task(
+          id=task_send_params.id,
+          sessionId=task_send_params.sessionId,
+          status=TaskStatus(state=TaskState.SUBMITTED),
+          history=[task_send_params.message],
+        )
+      else:
+        task.history.append(task_send_params.message)
+      if task_send_params.pushNotification is not None:
+        # Registered with the task itself, so this works with several workers
+        self.push_notification_infos[task.id] = task_send_params.pushNotification
+      # Hand the task (back) to the store to trim and re-account it
+      task = self.tasks.put(task)
+    if len(self.push_notification_infos) > self._push_prune_at:
+      await self._prune_push_notification_infos()
+    return task
+
+  async def update_store(
     self,
     task_id: str,
+    status: TaskStatus,
+    artifacts: list[Artifact] | None,
+  ) -> Task:
+    async with self.task_locks.for_key(task_id):
+      task = await self.tasks.load(task_id)
+      if task is None:
+        logger.error(f"Task {task_id} not found for updating the task")
+        raise ValueError(f"Task {task_id} not found")
+      task.status = status
+      if status.message is not None:
+        task.history.append(status.message)
+      if artifacts is not None:
+        if task.artifacts is None:
+          task.artifacts = []
+        task.artifacts.extend(artifacts)
+      task = self.tasks.put(task)
+    self._notify_push(task)
+    return task
+
+  async def _update_task(
+    self,
+    task: Task,
     task_state: TaskState,
-    response_text: str,
+    response_parts: list[Part] | None = None,
+    with_artifact: bool = True,
   ) -> Task:
-    task = self.tasks[task_id]
-    agent_response_parts = [
-      {
-        "type": "text",
-        "text": response_text,
-      }
-    ]
-    task.status = TaskStatus(
-      state=task_state,
-      message=Message(
-        role="agent",
-        parts=agent_response_parts,
-      )
-    )
-    task.artifacts = [
-      Artifact(
-        parts=agent_response_parts,
-      )
-    ]
+    start = time.perf_counter()
+    # Share the validated parts between the status message and the
+    # artifact; pydantic accepts existing model instances without
+    # validating or copying them again, unlike plain dicts
+    message = Message(role="agent", parts=response_parts) if response_parts is not None else None
+    status = TaskStatus(state=task_state, message=message)
+    artifacts = [Artifact(parts=response_parts)] if response_parts is not None and with_artifact else None
+    # The caller holds the task itself, so a concurrent eviction of its
+    # store entry cannot make this update fail. Nothing here awaits, but
+    # the lock makes this wait for an update that is between its load and
+    # its put, which would otherwise overwrite this one
+    async with self.task_locks.for_key(task.id):
+      task.status = status
+      if artifacts is not None:
+        task.artifacts = artifacts
+      task = self.tasks.put(task)
+    self._notify_push(task)
+    self._update_task_seconds.observe(time.perf_counter() - start)
     return task
@@ -0,0 +1,210 @@
+import itertools
+import logging
+import sys
+import time
+from collections import Counter, OrderedDict
+from typing import Iterator
+
+from google_a2a.common.types import Part, Task, TaskState
+
+logger = logging.getLogger(__name__)
+
+# Tasks in these states will not change any more and may be evicted
+TERMINAL_STATES = frozenset({TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELED})
+
+# Rough per-object overhead of a Task and its pydantic sub-models
+_TASK_OVERHEAD_BYTES = 512
+_PART_OVERHEAD_BYTES = 128
+
+
+def _parts_bytes(parts: list[Part], seen: set[int]) -> int:
+    size = 0
+    for part in parts:
+        size += _PART_OVERHEAD_BYTES
+        if part.type == "text":
+            value = part.text
+        elif part.type == "file":
+            value = part.file.bytes if part.file.bytes is not None else part.file.uri
+        else:
+            continue
+        # Status messages and artifacts may share strings with the history;
+        # count each string object once
+        if value is not None and id(value) not in seen:
+            seen.add(id(value))
+            size += sys.getsizeof(value)
+    return size
+
+
+def estimate_task_bytes(task: Task) -> int:
+    """Cheap estimate of the memory held by a task, dominated by its parts."""
+    size = _TASK_OVERHEAD_BYTES
+    seen: set[int] = set()
+    for message in task.history or ():
+        size += _parts_bytes(message.parts, seen)
+    if task.status.message is not None:
+        size += _parts_bytes(task.status.message.parts, seen)
+    for artifact in task.artifacts or ():
+        size += _parts_bytes(artifact.parts, seen)
+    return size
+
+
+class TaskStore:
+    """Bounded replacement for the ``InMemoryTaskManager.tasks`` dict.
+
+    Tasks are kept in LRU order. Once a task reaches a terminal state it
+    becomes evictable: it is dropped after ``ttl`` seconds, or earlier when
+    the store holds more than ``max_tasks`` tasks. Active tasks are never
+    evicted. Each task's history is trimmed to ``max_history`` messages.
+
+    The dict-style methods used by ``InMemoryTaskManager`` are supported, so
+    the store can be assigned to ``self.tasks`` directly. Code that mutates
+    a task in place should call ``put`` afterwards so that history trimming,
+    size accounting, eviction and persistence see the change.
+
+    This class is also the interface for durable backends, which subclass
+    it and use the in-memory part as a cache (see ``SqliteTaskStore``).
+    """
+
+    def __init__(self, max_tasks: int = 10_000, ttl: float = 3600.0, max_history: int = 32):
+        self.max_tasks = max_tasks
+        self.ttl = ttl
+        self.max_history = max_history
+        self._tasks: OrderedDict[str, Task] = OrderedDict()
+        self._task_bytes: dict[str, int] = {}
+        # Terminal tasks in the order they finished, with the time they did
+        self._finished_at: OrderedDict[str, float] = OrderedDict()
+        # The same tasks least recently used first, so eviction never walks
+        # past active tasks
+        self._finished_lru: OrderedDict[str, None] = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+        self.resident_bytes = 0
+
+    def get(self, task_id: str, default: Task | None = None) -> Task | None:
+        task = self._tasks.get(task_id)
+        if task is None:
+            return default
+        finished_at = self._finished_at.get(task_id)
+        if finished_at is not None and time.monotonic() - finished_at > self.ttl:
+            self._remove(task_id)
+            self.expirations += 1
+            return default
+        self._tasks.move_to_end(task_id)
+        if finished_at is not None:
+            self._finished_lru.move_to_end(task_id)
+        return task
+
+    async def load(self, task_id: str, default: Task | None = None) -> Task | None:
+        """Like ``get``, for the event loop: backends read without blocking it."""
+        return self.get(task_id, default)
+
+    def put(self, task: Task) -> Task:
+        """Insert a task, or refresh it after it was changed in place."""
+        task_id = task.id
+        if self.max_history is not None and task.history and len(task.history) > self.max_history:
+            del task.history[:-self.max_history]
+
+        self._tasks[task_id] = task
+        self._tasks.move_to_end(task_id)
+
+        size = estimate_task_bytes(task)
+        self.resident_bytes += size - self._task_bytes.get(task_id, 0)
+        self._task_bytes[task_id] = size
+
+        if task.status.state in TERMINAL_STATES:
+            if task_id not in self._finished_at:
+                self._finished_at[task_id] = time.monotonic()
+            self._finished_lru[task_id] = None
+            self._finished_lru.move_to_end(task_id)
+        else:
+            # A finished task that is resumed becomes active again
+            self._finished_at.pop(task_id, None)
+            self._finished_lru.pop(task_id, None)
+
+        self._evict()
+        return task
+
+    def pop(self, task_id: str, default: Task | None = None) -> Task | None:
+        if task_id not in self._tasks:
+            return default
+        return self._remove(task_id)
+
+    async def wait_durable(self, task_id: str) -> None:
+        """Wait until the latest ``put`` of a task is visible to other processes."""
+
+    def close(self) -> None:
+        """Release any resources held by the store."""
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "tasks": len(self._tasks),
+            "finished_tasks": len(self._finished_at),
+            "resident_bytes": self.resident_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def count_by_state(self) -> dict[TaskState, int]:
+        """Number of resident tasks in each state.
+
+        This walks every task, so it is meant for metrics scrapes rather
+        than the request path.
+        """
+        return dict(Counter(task.status.state for task in self._tasks.values()))
+
+    def _remove(self, task_id: str) -> Task:
+        task = self._tasks.pop(task_id)
+        self.resident_bytes -= self._task_bytes.pop(task_id, 0)
+        self._finished_at.pop(task_id, None)
+        self._finished_lru.pop(task_id, None)
+        return task
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        # _finished_at is ordered by finish time, so expired tasks are at its head
+        while self._finished_at:
+            task_id, finished_at = next(iter(self._finished_at.items()))
+            if now - finished_at <= self.ttl:
+                break
+            self._remove(task_id)
+            self.expirations += 1
+
+        overflow = len(self._tasks) - self.max_tasks
+        if overflow <= 0:
+            return
+        # Evict the least recently used finished tasks; with only active
+        # tasks above the limit this costs nothing
+        victims = list(itertools.islice(self._finished_lru, overflow))
+        for task_id in victims:
+            self._remove(task_id)
+            self.evictions += 1
+        if len(victims) < overflow:
+            logger.debug(
+                f"Task store holds {len(self._tasks)} tasks, above its limit of "
+                f"{self.max_tasks}, because the rest are still active"
+            )
+
+    def __getitem__(self, task_id: str) -> Task:
+        task = self.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+
+    def __setitem__(self, task_id: str, task: Task) -> None:
+        if task_id != task.id:
+            raise ValueError(f"Task id {task.id} does not match key {task_id}")
+        self.put(task)
+
+    def __delitem__(self, task_id: str) -> None:
+        if task_id not in self._tasks:
+            raise KeyError(task_id)
+        self._remove(task_id)
+
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._tasks))
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+import random
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from my_project.agent import SkillContext
+
+logger = logging.getLogger(__name__)
+
+TOOL_CALLING_SKILL_ID = "my-project-tool-calling-skill"
+
+SYSTEM_PROMPT = """你是一个很有帮助的助手。如果用户提问关于天气的问题，请调用 ‘get_current_weather’ 函数;
+如果用户提问关于时间的问题，请调用‘get_current_time’函数。
+请以友好的语气回答问题。"""
+
+ToolFunction = Callable[[dict], str | Awaitable[str]]
+
+
+# 模拟天气查询工具。返回结果示例：“北京今天是雨天。”
+def get_current_weather(arguments: dict) -> str:
+    weather_conditions = ["晴天", "多云", "雨天"]
+    return f"{arguments['location']}今天是{random.choice(weather_conditions)}。"
+
+
+# 查询当前时间的工具。返回结果示例：“当前时间：2024-04-15 17:15:18。“
+def get_current_time(arguments: dict) -> str:
+    return f"当前时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}。"
+
+
+# Same tools as function-calling/fc-aliyun-aliyunbailian-2.py
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_current_time",
+            "description": "当你想知道现在的时间时非常有用。",
+            "parameters": {},
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_current_weather",
+            "description": "当你想查询指定城市的天气时非常有用。",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "城市或县区，比如北京市、杭州市、余杭区等。",
+                    }
+                },
+                "required": ["location"],
+            },
+        },
+    },
+]
+
+TOOL_FUNCTIONS: dict[str, ToolFunction] = {
+    "get_current_weather": get_current_weather,
+    "get_current_time": get_current_time,
+}
+
+
+class ToolCallingSkill:
+    """Answers with an OpenAI-compatible model that may call tools.
+
+    The model is called through ``openai.AsyncOpenAI``, so while one task
+    waits for the model or a tool, the event loop serves others. Each
+    model round that asks for tools and each tool result is reported as
+    progress, which streaming clients receive as WORKING status updates.
+    The tool calls of one round run concurrently. Tool functions may be
+    plain or ``async def``; plain ones run in a thread. A tool that fails
+    or exceeds ``tool_timeout`` seconds answers the model with an error
+    text instead of failing the task.
+
+    Needs the ``llm`` extra (``pip install "my-project[llm]"``), which
+    installs openai, unless a ``client`` is given.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        model: str = "qwen-plus",
+        tools: list[dict] | None = None,
+        functions: dict[str, ToolFunction] | None = None,
+        system_prompt: str | None = SYSTEM_PROMPT,
+        max_rounds: int = 8,
+        tool_timeout: float = 10.0,
+        client: Any = None,
+    ):
+        if client is None:
+            try:
+                from openai import AsyncOpenAI
+            except ImportError as e:
+                raise ImportError(
+                    "The tool-calling skill needs the llm extra: pip install \"my-project[llm]\" or uv sync --extra llm"
+                ) from e
+            client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+        self.client = client
+        self.model = model
+        self.tools = tools if tools is not None else TOOLS
+        self.functions = functions if functions is not None else TOOL_FUNCTIONS
+        self.system_prompt = system_prompt
+        self.max_rounds = max_rounds
+        self.tool_timeout = tool_timeout
+
+    async def __call__(self, text: str, context: SkillContext) -> str:
+        messages = self._messages(text, context.history)
+        for round_num in range(1, self.max_rounds + 1):
+            completion = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                tools=self.tools,
+                # All tools a question needs come back in one round
+                parallel_tool_calls=True,
+            )
+            message = completion.choices[0].message
+            if not message.tool_calls:
+                return message.content or ""
+
+            assistant = message.model_dump(exclude_none=True)
+            # Some compatible endpoints reject an assistant message without content
+            assistant.setdefault("content", "")
+            messages.append(assistant)
+            calls = ", ".join(f"{call.function.name}({call.function.arguments})" for call in message.tool_calls)
+            if message.content:
+                context.report_progress(message.content)
+            context.report_progress(f"Round {round_num}: calling {calls}")
+            # The round takes as long as its slowest tool, not the sum of all
+            outputs = await asyncio.gather(*(
+                self._call_tool(call.function.name, call.function.arguments) for call in message.tool_calls
+            ))
+            for call, output in zip(message.tool_calls, outputs):
+                context.report_progress(f"{call.function.name}: {output}")
+                messages.append({"role": "tool", "tool_call_id": call.id, "content": output})
+        raise RuntimeError(f"No answer after {self.max_rounds} model rounds")
+
+    def _messages(self, text: str, history: list[tuple[str, str]]) -> list[dict]:
+        messages = [{"role": "system", "content": self.system_prompt}] if self.system_prompt else []
+        for role, said in history:
+            messages.append({"role": "user" if role == "user" else "assistant", "content": said})
+        messages.append({"role": "user", "content": text})
+        return messages
+
+    async def _call_tool(self, name: str, arguments: str) -> str:
+        function = self.functions.get(name)
+        if function is None:
+            return f"Unknown tool {name}"
+        try:
+            parsed = json.loads(arguments) if arguments else {}
+            if asyncio.iscoroutinefunction(function):
+                output = await asyncio.wait_for(function(parsed), self.tool_timeout)
+            else:
+                output = await asyncio.wait_for(asyncio.to_thread(function, parsed), self.tool_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {name} timed out after {self.tool_timeout} s")
+            return f"Tool {name} timed out"
+        except Exception as e:
+            logger.warning(f"Tool {name} failed: {e}")
+            return f"Tool {name} failed: {e}"
+        return output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
@@ -0,0 +1,127 @@
+import logging
+import os
+import select
+import signal
+import socket
+import struct
+import time
+from typing import Callable
+
+from my_project.server import MyA2AServer
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is treated as broken
+# rather than restarted, to avoid a fork loop
+_MIN_WORKER_LIFETIME = 1.0
+# Workers report readiness by writing their PID to a pipe; writes this
+# small are atomic, so reports from several workers never interleave
+_READY = struct.Struct("i")
+
+
+def _report_ready(ready_write: int) -> None:
+    try:
+        os.write(ready_write, _READY.pack(os.getpid()))
+    except OSError:
+        # The master stopped listening once all workers were ready; a
+        # restarted worker has nobody to report to
+        pass
+
+
+def run_workers(
+    build_server: Callable[[], MyA2AServer],
+    host: str,
+    port: int,
+    workers: int,
+    on_ready: Callable[[], None] | None = None,
+) -> None:
+    """Serve one A2A agent from ``workers`` forked processes (pre-fork model).
+
+    The master binds the listening socket and forks the workers, which all
+    accept from it. Each worker calls ``build_server`` after the fork, so
+    event loops, threads and database connections are never shared between
+    processes; state shared between workers has to live in the task store.
+    Workers that exit unexpectedly are restarted. ``on_ready`` is called
+    once, in the master, when every worker accepts connections.
+    """
+    sock = socket.create_server((host, port), backlog=2048)
+    sock.set_inheritable(True)
+    ready_read, ready_write = os.pipe()
+
+    children: dict[int, float] = {}
+    # PIDs of workers that accept connections, until all of them do
+    ready: set[int] | None = set()
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            if ready is not None:
+                os.close(ready_read)
+            exit_code = 0
+            try:
+                build_server().start(sock=sock, on_ready=lambda: _report_ready(ready_write))
+            except BaseException:
+                logger.exception(f"Worker {os.getpid()} failed")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def stop(signum, _frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    def wait_child() -> tuple[int, int]:
+        nonlocal ready
+        if ready is None:
+            return os.wait()
+        # Until every worker has reported, also read the reports
+        while True:
+            readable, _, _ = select.select([ready_read], [], [], 0.1)
+            if readable:
+                data = os.read(ready_read, _READY.size * 64)
+                ready.update(pid for (pid,) in _READY.iter_unpack(data))
+                if len(ready & children.keys()) >= workers and not stopping:
+                    ready = None
+                    os.close(ready_read)
+                    if on_ready is not None:
+                        on_ready()
+                    return os.wait()
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                return pid, status
+
+    for _ in range(workers):
+        spawn()
+    try:
+        while children:
+            try:
+                pid, status = wait_child()
+            except ChildProcessError:
+                break
+            started_at = children.pop(pid, None)
+            if stopping or started_at is None:
+                continue
+            logger.warning(f"Worker {pid} exited with status {status}")
+            if time.monotonic() - started_at < _MIN_WORKER_LIFETIME:
+                logger.error("Worker exited right after starting, shutting down")
+                stop(signal.SIGTERM, None)
+                continue
+            spawn()
+    finally:
+        sock.close()
+        if ready is not None:
+            os.close(ready_read)
+        os.close(ready_write)
@@ -0,0 +1,20 @@
+import time
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # The modules under test all read time.monotonic through the time
+    # module, so this one patch stops the clock for each of them
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
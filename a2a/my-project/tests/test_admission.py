@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from my_project.admission import AdmissionController, AdmissionRejected
+
+
+def test_admits_up_to_max_in_flight_and_releases_slots():
+    async def main():
+        admission = AdmissionController(max_in_flight=2, max_queue=0)
+        first = await admission.acquire()
+        await admission.acquire()
+        assert admission.in_flight == 2
+
+        admission.release(first)
+        assert admission.in_flight == 1
+        await admission.acquire()
+        assert admission.admitted == 3
+
+    asyncio.run(main())
+
+
+def test_rejects_when_queue_is_full():
+    async def main():
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        await admission.acquire()
+        waiting = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 1
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire()
+        assert rejected.value.reason == "queue_full"
+        assert rejected.value.retry_after > 0
+        assert admission.rejected["queue_full"] == 1
+        waiting.cancel()
+
+    asyncio.run(main())
+
+
+def test_rejects_after_queue_timeout_and_leaves_the_queue():
+    async def main():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=0.01)
+        await admission.acquire()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire()
+        assert rejected.value.reason == "queue_timeout"
+        assert admission.queue_depth == 0
+        assert admission.in_flight == 1
+
+    asyncio.run(main())
+
+
+def test_release_hands_the_slot_to_the_oldest_waiter():
+    async def main():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        start = await admission.acquire()
+        order = []
+
+        async def wait(name):
+            await admission.acquire()
+            order.append(name)
+
+        waiters = [asyncio.ensure_future(wait(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        admission.release(start)
+        await asyncio.sleep(0.01)
+        assert order == ["first"]
+        # The slot went straight to the waiter; none was freed in between
+        assert admission.in_flight == 1
+        admission.release(None)
+        await asyncio.gather(*waiters)
+        assert order == ["first", "second"]
+
+    asyncio.run(main())
+
+
+def test_slot_is_released_when_the_task_fails():
+    async def main():
+        admission = AdmissionController(max_in_flight=1, max_queue=0)
+        with pytest.raises(RuntimeError):
+            async with admission.slot():
+                raise RuntimeError("skill failed")
+        assert admission.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def main():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        start = await admission.acquire()
+        waiter = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert admission.queue_depth == 0
+
+        admission.release(start)
+        assert admission.in_flight == 0
+
+    asyncio.run(main())
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from my_project.agent import AgentExecutor, SkillCancelled, SkillContext, _SharedCancelFlag
+
+
+def shout(text: str, context: SkillContext) -> str:
+    # Module level, so that a process pool can import it
+    return text.upper()
+
+
+def wait_for_cancel(text: str, context: SkillContext) -> str:
+    deadline = time.monotonic() + 5
+    while not context.cancelled() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return "cancelled" if context.cancelled() else "not cancelled"
+
+
+def test_thread_mode_runs_handlers_off_the_event_loop():
+    async def main():
+        loop_thread = threading.current_thread()
+        seen = []
+
+        def handler(text: str, context: SkillContext) -> list[str]:
+            seen.append(threading.current_thread())
+            return [text, str(len(context.history))]
+
+        executor = AgentExecutor({"skill": handler}, default_skill="skill")
+        assert await executor.run("t1", "hello", history=[("user", "hi")]) == ["hello", "1"]
+        assert seen[0] is not loop_thread
+        assert executor.stats() == {"running": 0, "completed": 1}
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_timeout_tells_the_handler_to_stop():
+    async def main():
+        stopped = threading.Event()
+
+        def slow(text: str, context: SkillContext) -> str:
+            while not context.cancelled():
+                time.sleep(0.005)
+            stopped.set()
+            return "late"
+
+        executor = AgentExecutor({"slow": slow}, default_skill="slow", timeout=0.05)
+        with pytest.raises(TimeoutError):
+            await executor.run("t1", "hello")
+        assert await asyncio.to_thread(stopped.wait, 5)
+        assert executor.outcomes["timeout"] == 1
+        assert executor.running == 0
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_cancel_ends_the_run_at_once():
+    async def main():
+        started = threading.Event()
+        stopped = threading.Event()
+
+        def slow(text: str, context: SkillContext) -> str:
+            started.set()
+            while not context.cancelled():
+                time.sleep(0.005)
+            stopped.set()
+            return "late"
+
+        executor = AgentExecutor({"slow": slow}, default_skill="slow")
+        run = asyncio.create_task(executor.run("t1", "hello"))
+        assert await asyncio.to_thread(started.wait, 5)
+
+        assert executor.cancel("t1")
+        with pytest.raises(SkillCancelled):
+            await run
+        assert await asyncio.to_thread(stopped.wait, 5)
+        # Nothing left to cancel
+        assert not executor.cancel("t1")
+        assert executor.outcomes["canceled"] == 1
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_progress_is_delivered_in_order_before_the_result():
+    async def main():
+        def counting(text: str, context: SkillContext) -> str:
+            for i in range(20):
+                context.report_progress(f"step {i}")
+            return "done"
+
+        events = []
+
+        async def on_progress(text: str) -> None:
+            # A slow consumer must still see every message, in order
+            await asyncio.sleep(0.001)
+            events.append(text)
+
+        executor = AgentExecutor({"counting": counting}, default_skill="counting")
+        result = await executor.run("t1", "hello", on_progress=on_progress)
+        events.append(result)
+
+        assert events == [f"step {i}" for i in range(20)] + [["done"]]
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_async_handlers_run_concurrently_on_the_event_loop():
+    async def main():
+        loop_thread = threading.current_thread()
+
+        async def remote(text: str, context: SkillContext) -> list[str]:
+            assert threading.current_thread() is loop_thread
+            context.report_progress("asking")
+            await asyncio.sleep(0.05)
+            return [text, "answered"]
+
+        progress = []
+
+        async def on_progress(text: str) -> None:
+            progress.append(text)
+
+        # One pool thread would run sync handlers one at a time
+        executor = AgentExecutor({"remote": remote}, default_skill="remote", max_workers=1)
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(executor.run(f"t{i}", str(i), on_progress=on_progress) for i in range(10))
+        )
+
+        assert results == [[str(i), "answered"] for i in range(10)]
+        assert time.monotonic() - started < 0.4
+        assert progress == ["asking"] * 10
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_unknown_skill_and_duplicate_run_are_rejected():
+    async def main():
+        executor = AgentExecutor({"wait": wait_for_cancel}, default_skill="wait")
+        with pytest.raises(ValueError):
+            await executor.run("t1", "hello", skill_id="missing")
+
+        run = asyncio.create_task(executor.run("t1", "hello"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ValueError):
+            await executor.run("t1", "again")
+        executor.cancel("t1")
+        with pytest.raises(SkillCancelled):
+            await run
+        executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_process_mode_runs_and_cancels_handlers():
+    async def main():
+        executor = AgentExecutor(
+            {"shout": shout, "wait": wait_for_cancel}, default_skill="shout", mode="process", max_workers=1,
+        )
+        try:
+            assert await executor.run("t1", "hello") == ["HELLO"]
+
+            run = asyncio.create_task(executor.run("t2", "hello", skill_id="wait"))
+            await asyncio.sleep(0.2)
+            assert executor.cancel("t2")
+            with pytest.raises(SkillCancelled):
+                await run
+            # The handler saw the shared flag and returned; the pool is free again
+            assert await executor.run("t3", "again") == ["AGAIN"]
+        finally:
+            executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_shared_cancel_flags_are_set_once_and_expire():
+    submitted = []
+    flags = {}
+    flag = _SharedCancelFlag("key", flags, lambda fn, *args: submitted.append((fn, args)) or fn(*args))
+    assert not flag.is_set()
+
+    flag.set()
+    flag.set()
+    assert flag.is_set()
+    assert len(submitted) == 1
+    assert "key" in flags
+
+    executor = AgentExecutor(timeout=1.0)
+    flags["old"] = time.monotonic() - 60
+    executor._drop_expired_cancel_flags(flags)
+    assert set(flags) == {"key"}
@@ -0,0 +1,149 @@
+import asyncio
+
+from google_a2a.common.types import (
+    Artifact,
+    InternalError,
+    Message,
+    SendTaskRequest,
+    SendTaskResponse,
+    Task,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+from my_project.dedup import DedupCache
+
+
+def make_request(request_id: int, text: str = "hello", task_id: str = "task") -> SendTaskRequest:
+    return SendTaskRequest(
+        id=request_id,
+        params=TaskSendParams(
+            id=task_id,
+            sessionId="session",
+            message=Message(role="user", parts=[TextPart(text=text)]),
+        ),
+    )
+
+
+class Handler:
+    """Completes each request with a task holding one artifact, counting the calls."""
+
+    def __init__(self, state: TaskState = TaskState.COMPLETED, delay: float = 0):
+        self.state = state
+        self.delay = delay
+        self.calls = 0
+        self.task = None
+
+    async def __call__(self, request: SendTaskRequest) -> SendTaskResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.state is None:
+            return SendTaskResponse(id=request.id, error=InternalError())
+        self.task = Task(
+            id=request.params.id,
+            sessionId=request.params.sessionId,
+            status=TaskStatus(state=self.state),
+            history=[request.params.message],
+            artifacts=[Artifact(parts=[TextPart(text="result")])],
+        )
+        return SendTaskResponse(id=request.id, result=self.task)
+
+
+def test_replays_a_completed_response_under_the_retry_id():
+    async def main():
+        cache = DedupCache()
+        handler = Handler()
+        first = await cache.run(make_request(1), handler)
+        retry = await cache.run(make_request(2), handler)
+
+        assert handler.calls == 1
+        assert retry.id == 2
+        assert retry.result.id == first.result.id
+        assert cache.stats()["hits"] == 1
+
+    asyncio.run(main())
+
+
+def test_different_message_runs_again():
+    async def main():
+        cache = DedupCache()
+        handler = Handler()
+        await cache.run(make_request(1, "hello"), handler)
+        await cache.run(make_request(2, "goodbye"), handler)
+
+        assert handler.calls == 2
+
+    asyncio.run(main())
+
+
+def test_concurrent_duplicate_joins_the_running_request():
+    async def main():
+        cache = DedupCache()
+        handler = Handler(delay=0.01)
+        first, retry = await asyncio.gather(cache.run(make_request(1), handler), cache.run(make_request(2), handler))
+
+        assert handler.calls == 1
+        assert (first.id, retry.id) == (1, 2)
+        assert cache.stats()["joined"] == 1
+
+    asyncio.run(main())
+
+
+def test_failed_and_unfinished_requests_are_not_kept():
+    async def main():
+        for state in (None, TaskState.FAILED, TaskState.INPUT_REQUIRED):
+            cache = DedupCache()
+            handler = Handler(state)
+            await cache.run(make_request(1), handler)
+            await cache.run(make_request(2), handler)
+
+            assert handler.calls == 2
+            assert cache.stats()["entries"] == 0
+
+    asyncio.run(main())
+
+
+def test_replay_is_a_snapshot_of_the_completed_task():
+    async def main():
+        cache = DedupCache()
+        handler = Handler()
+        await cache.run(make_request(1), handler)
+        # The stored task goes on changing after the response was sent
+        handler.task.history.append(Message(role="user", parts=[TextPart(text="later")]))
+        handler.task.artifacts.append(Artifact(parts=[TextPart(text="later")]))
+
+        retry = await cache.run(make_request(2), handler)
+        assert len(retry.result.history) == 1
+        assert len(retry.result.artifacts) == 1
+
+    asyncio.run(main())
+
+
+def test_entries_expire_after_ttl(clock):
+    async def main():
+        cache = DedupCache(ttl=60)
+        handler = Handler()
+        await cache.run(make_request(1), handler)
+        clock.now += 61
+        await cache.run(make_request(2), handler)
+
+        assert handler.calls == 2
+
+    asyncio.run(main())
+
+
+def test_keeps_at_most_max_entries():
+    async def main():
+        cache = DedupCache(max_entries=2)
+        handler = Handler()
+        for i in range(3):
+            await cache.run(make_request(i, task_id=f"task-{i}"), handler)
+        assert cache.stats()["entries"] == 2
+
+        # The oldest entry was evicted, so its retry runs again
+        await cache.run(make_request(3, task_id="task-0"), handler)
+        assert handler.calls == 4
+
+    asyncio.run(main())
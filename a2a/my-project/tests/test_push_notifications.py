@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+import math
+
+import httpx
+from google_a2a.common.types import PushNotificationConfig, Task, TaskState, TaskStatus
+from google_a2a.common.utils.push_notification_auth import PushNotificationAuth
+
+from my_project.push_notifications import PushNotificationDispatcher, _signed_body
+
+
+def make_task(task_id: str = "t1", state: TaskState = TaskState.WORKING, metadata: dict | None = None) -> Task:
+    return Task(id=task_id, sessionId="session", status=TaskStatus(state=state), metadata=metadata)
+
+
+def test_signed_body_hashes_like_the_receiver():
+    task = make_task(metadata={"small": 1.5e-7, "large": 1e22, "limit": math.inf, "text": "上海"})
+    body = _signed_body(task)
+
+    received = PushNotificationAuth()._calculate_request_body_sha256(json.loads(body))
+    assert hashlib.sha256(body).hexdigest() == received
+    assert json.loads(body)["metadata"]["limit"] is None
+
+
+def start(dispatcher: PushNotificationDispatcher, handler) -> None:
+    # Receivers are answered by ``handler`` and every URL counts as verified
+    async def verify_url(url: str) -> bool:
+        return True
+
+    dispatcher.verify_url = verify_url
+    dispatcher._ensure_started()
+    dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def config(url: str = "http://receiver/notify") -> PushNotificationConfig:
+    return PushNotificationConfig(url=url)
+
+
+def test_updates_queued_during_a_delivery_are_coalesced_into_the_latest():
+    async def main():
+        received = []
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            received.append(json.loads(request.content)["status"]["state"])
+            await release.wait()
+            return httpx.Response(200)
+
+        dispatcher = PushNotificationDispatcher()
+        start(dispatcher, handler)
+        dispatcher.notify(make_task(state=TaskState.SUBMITTED), config())
+        while not received:
+            await asyncio.sleep(0.001)
+        for state in (TaskState.WORKING, TaskState.INPUT_REQUIRED, TaskState.COMPLETED):
+            dispatcher.notify(make_task(state=state), config())
+        release.set()
+        await dispatcher.aclose()
+
+        assert received == ["submitted", "completed"]
+        assert dispatcher.coalesced == 2
+        assert dispatcher.delivered == 2
+
+    asyncio.run(main())
+
+
+def test_retries_server_errors_and_gives_up_after_max_attempts():
+    async def main():
+        responses = {"flaky": [503, 429, 200], "down": [500, 500, 500], "bad": [400]}
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            name = request.url.path.strip("/")
+            requests.append(name)
+            return httpx.Response(responses[name].pop(0))
+
+        dispatcher = PushNotificationDispatcher(max_attempts=3, backoff_base=0.001)
+        start(dispatcher, handler)
+        for name in responses:
+            dispatcher.notify(make_task(name), config(f"http://receiver/{name}"))
+        await dispatcher.aclose()
+
+        assert requests.count("flaky") == 3
+        assert requests.count("down") == 3
+        # Client errors are not retried
+        assert requests.count("bad") == 1
+        assert (dispatcher.delivered, dispatcher.failed, dispatcher.retries) == (1, 2, 4)
+
+    asyncio.run(main())
+
+
+def test_limits_concurrent_requests_per_host():
+    async def main():
+        in_flight = {"a": 0, "b": 0}
+        most = {"a": 0, "b": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            host = request.url.host
+            in_flight[host] += 1
+            most[host] = max(most[host], in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+            return httpx.Response(200)
+
+        dispatcher = PushNotificationDispatcher(delivery_workers=8, per_endpoint_limit=2)
+        start(dispatcher, handler)
+        for i in range(6):
+            dispatcher.notify(make_task(f"a{i}"), config("http://a/notify"))
+            dispatcher.notify(make_task(f"b{i}"), config("http://b/notify"))
+        await dispatcher.aclose()
+
+        assert most == {"a": 2, "b": 2}
+        assert dispatcher.delivered == 12
+        # Limits of hosts with nothing in flight are not kept
+        assert not dispatcher._endpoint_limits
+
+    asyncio.run(main())
+
+
+def test_nothing_is_sent_to_an_unverified_url():
+    async def main():
+        requests = []
+        dispatcher = PushNotificationDispatcher()
+        start(dispatcher, lambda request: requests.append(request) or httpx.Response(200))
+
+        async def verify_url(url: str) -> bool:
+            return False
+
+        dispatcher.verify_url = verify_url
+        dispatcher.notify(make_task(), config())
+        await dispatcher.aclose()
+
+        assert requests == []
+        assert dispatcher.failed == 1
+
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+import gzip
+import json
+
+from starlette.testclient import TestClient
+
+from google_a2a.common.types import AgentCapabilities, AgentCard, AgentSkill
+
+from my_project.server import MyA2AServer
+from my_project.task_manager import MyAgentTaskManager
+
+CARD_PATH = "/.well-known/agent.json"
+
+
+def make_agent_card(version: str = "0.1.0") -> AgentCard:
+    # Repetitive enough that the gzip copy is smaller than the body
+    skills = [AgentSkill(id=f"skill-{i}", name=f"Skill {i}", description="Echos the input given") for i in range(20)]
+    return AgentCard(
+        name="Echo Agent",
+        url="http://testserver/",
+        version=version,
+        capabilities=AgentCapabilities(streaming=True),
+        skills=skills,
+    )
+
+
+def make_server(**kwargs) -> MyA2AServer:
+    return MyA2AServer(agent_card=make_agent_card(), task_manager=MyAgentTaskManager(), **kwargs)
+
+
+def send(request_id, task_id: str, text: str = "hello", method: str = "tasks/send") -> dict:
+    request = {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": {
+            "id": task_id,
+            "sessionId": "session",
+            "message": {"role": "user", "parts": [{"type": "text", "text": text}]},
+        },
+    }
+    if request_id is not None:
+        request["id"] = request_id
+    return request
+
+
+def test_unchanged_agent_card_is_not_sent_again():
+    client = TestClient(make_server().app)
+    first = client.get(CARD_PATH, headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert json.loads(first.content)["version"] == "0.1.0"
+    etag = first.headers["ETag"]
+
+    second = client.get(CARD_PATH, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+
+    stale = client.get(CARD_PATH, headers={"Accept-Encoding": "identity", "If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+def test_agent_card_is_gzipped_when_the_client_accepts_it():
+    client = TestClient(make_server().app)
+    plain = client.get(CARD_PATH, headers={"Accept-Encoding": "identity"})
+    # Read the raw body so that the client does not decode it
+    with client.stream("GET", CARD_PATH, headers={"Accept-Encoding": "gzip"}) as response:
+        compressed = b"".join(response.iter_raw())
+        headers = response.headers
+
+    assert "Content-Encoding" not in plain.headers
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(compressed) == plain.content
+    assert headers["ETag"] != plain.headers["ETag"]
+    # The gzip ETag does not match the identity representation
+    refused = client.get(CARD_PATH, headers={"Accept-Encoding": "gzip;q=0", "If-None-Match": headers["ETag"]})
+    assert refused.status_code == 200
+
+
+def test_reload_serves_the_new_card_under_a_new_etag():
+    server = make_server()
+    client = TestClient(server.app)
+    etag = client.get(CARD_PATH).headers["ETag"]
+
+    server.reload_agent_card(make_agent_card(version="0.2.0"))
+    response = client.get(CARD_PATH, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["version"] == "0.2.0"
+    assert response.headers["ETag"] != etag
+
+    # Changes made in place are picked up by a reload without a card
+    server.agent_card.version = "0.3.0"
+    server.reload_agent_card()
+    assert client.get(CARD_PATH).json()["version"] == "0.3.0"
+
+
+def test_batch_answers_every_request_in_order():
+    client = TestClient(make_server(batch_concurrency=2).app)
+    batch = [
+        send(1, "t1", "one"),
+        {"jsonrpc": "2.0", "id": 2, "method": "tasks/get", "params": {"id": "missing"}},
+        {"jsonrpc": "2.0", "id": 3, "method": "tasks/unknown"},
+        "not a request",
+        send(5, "t2", "two"),
+    ]
+    responses = client.post("/", json=batch).json()
+
+    assert [response.get("id") for response in responses] == [1, 2, 3, None, 5]
+    assert responses[0]["result"]["artifacts"][0]["parts"][0]["text"].endswith("one")
+    assert responses[1]["error"]["code"] == -32001
+    assert responses[2]["error"]["code"] == -32600
+    assert responses[3]["error"]["code"] == -32600
+    assert responses[4]["result"]["status"]["state"] == "completed"
+
+
+def test_streaming_requests_are_rejected_inside_a_batch():
+    client = TestClient(make_server().app)
+    responses = client.post("/", json=[send(1, "s1", method="tasks/sendSubscribe"), send(2, "t1")]).json()
+
+    assert responses[0]["error"]["code"] == -32600
+    assert "cannot be batched" in responses[0]["error"]["message"]
+    assert responses[1]["result"]["status"]["state"] == "completed"
+
+
+def test_notifications_run_without_a_response():
+    server = make_server()
+    client = TestClient(server.app)
+    responses = client.post("/", json=[send(None, "n1"), send(2, "t1")]).json()
+    assert [response["id"] for response in responses] == [2]
+
+    only_notifications = client.post("/", json=[send(None, "n2"), send(None, "n3")])
+    assert only_notifications.status_code == 204
+    assert only_notifications.content == b""
+    assert "n1" in server.task_manager.tasks and "n3" in server.task_manager.tasks
+
+
+def test_empty_and_oversized_batches_are_rejected_whole():
+    server = make_server(max_batch_size=3)
+    client = TestClient(server.app)
+
+    empty = client.post("/", json=[])
+    assert empty.status_code == 400
+    assert empty.json()["error"]["code"] == -32600
+
+    oversized = client.post("/", json=[send(i, f"t{i}") for i in range(4)])
+    assert oversized.status_code == 400
+    assert "exceeds the limit of 3" in oversized.json()["error"]["message"]
+    # None of its requests ran
+    assert len(server.task_manager.tasks) == 0
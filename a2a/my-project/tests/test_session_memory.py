@@ -0,0 +1,72 @@
+import sys
+
+from my_project.session_memory import SessionMemory
+
+
+def texts(turns):
+    return [text for _, text in turns]
+
+
+def test_keeps_the_most_recent_turns_in_order():
+    memory = SessionMemory(max_turns=3)
+    for i in range(5):
+        memory.append("s", "user" if i % 2 == 0 else "agent", f"turn {i}")
+
+    assert memory.recent("s") == [("user", "turn 2"), ("agent", "turn 3"), ("user", "turn 4")]
+    assert texts(memory.recent("s", 2)) == ["turn 3", "turn 4"]
+    assert memory.recent("unknown") == []
+
+
+def test_drops_oldest_turns_beyond_the_session_byte_limit():
+    turn_bytes = sys.getsizeof("x" * 100)
+    memory = SessionMemory(max_turns=10, max_session_bytes=3 * turn_bytes)
+    for i in range(5):
+        memory.append("s", "user", str(i) * 100)
+
+    assert texts(memory.recent("s")) == ["2" * 100, "3" * 100, "4" * 100]
+
+
+def test_clips_a_turn_larger_than_the_session_limit():
+    memory = SessionMemory(max_session_bytes=1024)
+    memory.append("s", "agent", ["a" * 800, "b" * 800])
+    memory.append("s", "agent", "中" * 1000)
+
+    (_, text), = memory.recent("s")
+    assert text.startswith("中")
+    assert sys.getsizeof(text) <= 1024
+    assert memory.total_bytes <= 1024 + 256
+
+
+def test_evicts_least_recently_used_sessions():
+    memory = SessionMemory(max_sessions=2)
+    memory.append("a", "user", "hello")
+    memory.append("b", "user", "hello")
+    # Reading a makes b the least recently used
+    memory.recent("a")
+    memory.append("c", "user", "hello")
+
+    assert memory.recent("b") == []
+    assert len(memory) == 2
+    assert memory.evictions == 1
+
+
+def test_evicts_sessions_beyond_the_total_byte_limit():
+    turn_bytes = sys.getsizeof("x" * 1000)
+    memory = SessionMemory(max_total_bytes=3 * (turn_bytes + 256))
+    for session in "abcde":
+        memory.append(session, "user", "x" * 1000)
+
+    assert len(memory) == 3
+    assert memory.total_bytes <= memory.max_total_bytes
+
+
+def test_total_bytes_returns_to_zero():
+    memory = SessionMemory(max_turns=2)
+    for i in range(5):
+        memory.append("a", "user", "text " * i)
+        memory.append("b", "agent", ["piece"] * i)
+    memory.forget("a")
+    memory.forget("b")
+
+    assert memory.total_bytes == 0
+    assert memory.stats() == {"sessions": 0, "bytes": 0, "evictions": 0}
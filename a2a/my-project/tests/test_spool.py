@@ -0,0 +1,80 @@
+import base64
+import hashlib
+import os
+import urllib.parse
+import urllib.request
+
+from starlette.testclient import TestClient
+
+from google_a2a.common.types import AgentCapabilities, AgentCard, AgentSkill, FileContent
+
+from my_project.agent import AgentExecutor, SkillContext
+from my_project.server import MyA2AServer
+from my_project.spool import FileSpool
+from my_project.task_manager import MyAgentTaskManager
+
+BASE_URL = "http://testserver/spool/"
+
+
+def digest(text: str, context: SkillContext) -> list[str]:
+    # Reads every file it is given and answers with its SHA-256
+    digests = []
+    for file in context.files:
+        with urllib.request.urlopen(file.uri) as f:
+            digests.append(f"{file.name}: {hashlib.sha256(f.read()).hexdigest()}")
+    return digests
+
+
+def make_client(spool: FileSpool) -> TestClient:
+    agent_card = AgentCard(
+        name="Digest Agent",
+        url="http://testserver/",
+        version="0.1.0",
+        capabilities=AgentCapabilities(),
+        skills=[AgentSkill(id="digest", name="Digest")],
+    )
+    executor = AgentExecutor({"digest": digest}, default_skill="digest")
+    task_manager = MyAgentTaskManager(spool=spool, executor=executor)
+    return TestClient(MyA2AServer(agent_card=agent_card, task_manager=task_manager).app)
+
+
+def test_large_file_part_is_spooled_and_handed_to_the_skill(tmp_path):
+    content = os.urandom(64 * 1024)
+    spool = FileSpool(str(tmp_path), threshold=1024, base_url=BASE_URL)
+    request = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tasks/send",
+        "params": {
+            "id": "large",
+            "sessionId": "session",
+            "message": {
+                "role": "user",
+                "parts": [{"type": "file", "file": {"name": "blob.bin", "bytes": base64.b64encode(content).decode()}}],
+            },
+        },
+    }
+    with make_client(spool) as client:
+        task = client.post("/", json=request).json()["result"]
+
+        assert task["status"]["state"] == "completed"
+        assert task["artifacts"][0]["parts"][0]["text"] == f"blob.bin: {hashlib.sha256(content).hexdigest()}"
+        # History keeps the reference, not the bytes, and the reference resolves
+        file = task["history"][0]["parts"][0]["file"]
+        assert "bytes" not in file
+        assert file["uri"].startswith(BASE_URL)
+        assert client.get(urllib.parse.urlparse(file["uri"]).path).content == content
+    assert spool.stats()["spooled_files"] == 1
+
+
+def test_local_file_only_rewrites_spool_uris(tmp_path):
+    spool = FileSpool(str(tmp_path), base_url=BASE_URL)
+    name = "0" * 64
+
+    local = spool.local_file(FileContent(name="a.bin", uri=BASE_URL + name))
+    assert local.uri == (tmp_path / name).resolve().as_uri()
+    assert local.name == "a.bin"
+    for uri in ("http://elsewhere/" + name, BASE_URL + "../secret"):
+        assert spool.local_file(FileContent(uri=uri)).uri == uri
+    inline = FileContent(bytes="aGk=")
+    assert spool.local_file(inline) is inline
@@ -0,0 +1,93 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+from google_a2a.common.types import Task, TaskState, TaskStatus
+
+from my_project.sqlite_task_store import SqliteTaskStore
+
+
+def make_task(task_id: str, state: TaskState = TaskState.WORKING) -> Task:
+    return Task(id=task_id, sessionId="session", status=TaskStatus(state=state))
+
+
+def stored_ids(path) -> set[str]:
+    with sqlite3.connect(path) as conn:
+        return {task_id for (task_id,) in conn.execute("SELECT id FROM tasks")}
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "tasks.db")
+
+
+def test_tasks_are_read_back_before_they_are_committed(db):
+    async def main():
+        # The writer waits long enough for the reads to happen first
+        store = SqliteTaskStore(db, commit_interval=0.5, shared=True)
+        store.put(make_task("a", TaskState.COMPLETED))
+
+        assert store.commits == 0
+        assert (await store.load("a")).status.state == TaskState.COMPLETED
+        assert store.get("a").status.state == TaskState.COMPLETED
+        store.close()
+
+    asyncio.run(main())
+    reopened = SqliteTaskStore(db)
+    assert reopened.get("a").status.state == TaskState.COMPLETED
+    reopened.close()
+
+
+def test_concurrent_puts_share_a_commit(db):
+    store = SqliteTaskStore(db, commit_interval=0.1)
+    for i in range(50):
+        store.put(make_task(f"task-{i}"))
+    # A later version of a task replaces the pending one
+    store.put(make_task("task-0", TaskState.COMPLETED))
+    assert store.flush(timeout=5)
+
+    assert store.written_tasks == 50
+    assert store.commits <= 2
+    assert len(stored_ids(db)) == 50
+    store.close()
+
+
+def test_task_popped_before_its_commit_is_never_read_back(db):
+    async def main():
+        store = SqliteTaskStore(db, commit_interval=0.5)
+        store.put(make_task("kept"))
+        store.put(make_task("gone"))
+        assert store.pop("gone").id == "gone"
+
+        assert await store.load("gone") is None
+        assert store.get("gone") is None
+        assert store.flush(timeout=5)
+        store.close()
+
+    asyncio.run(main())
+    assert stored_ids(db) == {"kept"}
+
+
+def test_pop_removes_a_committed_row(db):
+    store = SqliteTaskStore(db)
+    store.put(make_task("a"))
+    assert store.flush(timeout=5)
+    store.pop("a")
+    assert store.flush(timeout=5)
+
+    assert stored_ids(db) == set()
+    store.close()
+
+
+def test_finished_tasks_are_purged_after_retention(db):
+    store = SqliteTaskStore(db, retention=0.05, purge_interval=0)
+    store.put(make_task("finished", TaskState.COMPLETED))
+    store.put(make_task("running"))
+    assert store.flush(timeout=5)
+    time.sleep(0.1)
+    # The writer purges after its next commit
+    store.put(make_task("recent", TaskState.FAILED))
+    store.close()
+
+    assert stored_ids(db) == {"running", "recent"}
@@ -0,0 +1,165 @@
+import asyncio
+
+from google_a2a.common.types import (
+    DataPart,
+    InternalError,
+    FileContent,
+    FilePart,
+    GetTaskRequest,
+    Message,
+    SendTaskRequest,
+    SendTaskStreamingRequest,
+    TaskQueryParams,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+from my_project.agent import AgentExecutor
+from my_project.task_manager import MyAgentTaskManager
+
+
+def send_request(task_id: str, parts: list, request_id: int = 1) -> SendTaskRequest:
+    return SendTaskRequest(
+        id=request_id,
+        params=TaskSendParams(id=task_id, sessionId="session", message=Message(role="user", parts=parts)),
+    )
+
+
+def test_message_without_parts_is_rejected_before_the_task_is_stored():
+    async def main():
+        manager = MyAgentTaskManager()
+        response = await manager.on_send_task(send_request("e1", []))
+
+        assert response.error.code == -32602
+        assert "e1" not in manager.tasks
+        assert not manager._active_tasks
+        manager.executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_message_without_text_or_files_is_rejected_before_the_task_is_stored():
+    async def main():
+        manager = MyAgentTaskManager()
+        response = await manager.on_send_task(send_request("d1", [DataPart(data={"a": 1})]))
+
+        assert response.error.code == -32005
+        assert "d1" not in manager.tasks
+        manager.executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_file_parts_reach_the_skill():
+    async def main():
+        manager = MyAgentTaskManager()
+        file_part = FilePart(file=FileContent(name="a.txt", bytes="aGVsbG8="))
+        response = await manager.on_send_task(send_request("f1", [file_part]))
+
+        assert response.result.status.state == TaskState.COMPLETED
+        assert [part.text for part in response.result.artifacts[0].parts][-1].endswith("a.txt")
+        manager.executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_streaming_request_without_parts_is_rejected():
+    async def main():
+        manager = MyAgentTaskManager()
+        request = SendTaskStreamingRequest(
+            id=1,
+            params=TaskSendParams(id="e1", sessionId="session", message=Message(role="user", parts=[])),
+        )
+        response = await manager.on_send_task_subscribe(request)
+
+        assert response.error.code == -32602
+        assert "e1" not in manager.tasks
+        manager.executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_text_parts_after_other_parts_reach_the_skill():
+    async def main():
+        manager = MyAgentTaskManager()
+        parts = [DataPart(data={"a": 1}), TextPart(text="hello")]
+        response = await manager.on_send_task(send_request("t1", parts))
+
+        assert response.result.status.state == TaskState.COMPLETED
+        assert response.result.artifacts[0].parts[0].text.endswith("hello")
+        manager.executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_failing_skill_fails_the_task_instead_of_leaving_it_working():
+    def broken(text: str) -> str:
+        raise AttributeError("no text")
+
+    async def main():
+        manager = MyAgentTaskManager(executor=AgentExecutor({"broken": broken}, default_skill="broken"))
+        response = await manager.on_send_task(send_request("b1", [TextPart(text="hello")]))
+        assert response.result.status.state == TaskState.FAILED
+
+        stored = await manager.on_get_task(GetTaskRequest(id=2, params=TaskQueryParams(id="b1")))
+        assert stored.result.status.state == TaskState.FAILED
+        manager.executor.shutdown()
+
+    asyncio.run(main())
+
+
+def status_event(n: int, final: bool = False) -> TaskStatusUpdateEvent:
+    state = TaskState.COMPLETED if final else TaskState.WORKING
+    return TaskStatusUpdateEvent(id="s1", status=TaskStatus(state=state), final=final, metadata={"n": n})
+
+
+async def collect(stream, delay: float = 0) -> list:
+    responses = []
+    async for response in stream:
+        responses.append(response)
+        await asyncio.sleep(delay)
+    return responses
+
+
+def test_slow_sse_subscriber_is_dropped_while_fast_ones_get_every_event():
+    async def main():
+        manager = MyAgentTaskManager(sse_queue_size=2, sse_put_timeout=0.05)
+        fast_queue = await manager.setup_sse_consumer("s1")
+        slow_queue = await manager.setup_sse_consumer("s1")
+        fast = asyncio.create_task(collect(manager.dequeue_events_for_sse(1, "s1", fast_queue)))
+
+        for n in range(10):
+            await manager.enqueue_events_for_sse("s1", status_event(n))
+        await manager.enqueue_events_for_sse("s1", status_event(10, final=True))
+        responses = await asyncio.wait_for(fast, 5)
+
+        assert [response.result.metadata["n"] for response in responses] == list(range(11))
+        assert responses[-1].result.final
+        # The slow subscriber is left with a single error that ends its stream
+        assert slow_queue.qsize() == 1
+        slow = await collect(manager.dequeue_events_for_sse(2, "s1", slow_queue))
+        assert len(slow) == 1 and slow[0].error.code == InternalError().code
+        assert "s1" not in manager.task_sse_subscribers
+        manager.executor.shutdown()
+
+    asyncio.run(main())
+
+
+def test_sse_subscriber_that_catches_up_in_time_is_kept():
+    async def main():
+        manager = MyAgentTaskManager(sse_queue_size=2, sse_put_timeout=1.0)
+        queue = await manager.setup_sse_consumer("s1")
+        reader = asyncio.create_task(collect(manager.dequeue_events_for_sse(1, "s1", queue), delay=0.005))
+
+        for n in range(10):
+            await manager.enqueue_events_for_sse("s1", status_event(n))
+        await manager.enqueue_events_for_sse("s1", status_event(10, final=True))
+        responses = await asyncio.wait_for(reader, 5)
+
+        assert [response.result.metadata["n"] for response in responses] == list(range(11))
+        manager.executor.shutdown()
+
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+import asyncio
+
+from google_a2a.common.types import Message, Task, TaskState, TaskStatus, TextPart
+
+from my_project.task_store import TaskStore
+
+
+def make_task(task_id: str, state: TaskState = TaskState.WORKING, messages: int = 0) -> Task:
+    return Task(
+        id=task_id,
+        sessionId="session",
+        status=TaskStatus(state=state),
+        history=[Message(role="user", parts=[TextPart(text=f"message {i}")]) for i in range(messages)],
+    )
+
+
+def test_evicts_least_recently_used_finished_tasks(clock):
+    store = TaskStore(max_tasks=2)
+    store.put(make_task("a", TaskState.COMPLETED))
+    store.put(make_task("b", TaskState.COMPLETED))
+    # Reading a makes b the least recently used
+    assert store.get("a") is not None
+    store.put(make_task("c", TaskState.COMPLETED))
+
+    assert "b" not in store
+    assert "a" in store and "c" in store
+    assert store.evictions == 1
+
+
+def test_never_evicts_active_tasks(clock):
+    store = TaskStore(max_tasks=1)
+    store.put(make_task("a"))
+    store.put(make_task("b"))
+
+    assert len(store) == 2
+    assert store.evictions == 0
+
+
+def test_finished_tasks_expire_after_ttl(clock):
+    store = TaskStore(ttl=60)
+    store.put(make_task("done", TaskState.COMPLETED))
+    store.put(make_task("running"))
+
+    clock.now += 59
+    assert store.get("done") is not None
+    clock.now += 2
+    assert store.get("done") is None
+    assert store.get("running") is not None
+    assert store.expirations == 1
+
+
+def test_resumed_task_is_no_longer_evictable(clock):
+    store = TaskStore(ttl=60)
+    task = store.put(make_task("a", TaskState.COMPLETED))
+    task.status = TaskStatus(state=TaskState.WORKING)
+    store.put(task)
+
+    clock.now += 120
+    assert store.get("a") is task
+
+
+def test_trims_history_to_max_history(clock):
+    store = TaskStore(max_history=3)
+    task = store.put(make_task("a", messages=5))
+
+    assert [message.parts[0].text for message in task.history] == ["message 2", "message 3", "message 4"]
+
+    task.history.append(Message(role="agent", parts=[TextPart(text="reply")]))
+    store.put(task)
+    assert len(task.history) == 3
+    assert task.history[-1].parts[0].text == "reply"
+
+
+def test_tracks_resident_bytes(clock):
+    store = TaskStore()
+    store.put(make_task("a", messages=4))
+    assert store.resident_bytes > 0
+
+    store.pop("a")
+    assert store.resident_bytes == 0
+    assert store.pop("a", "missing") == "missing"
+
+
+def test_load_reads_like_get(clock):
+    store = TaskStore()
+    task = store.put(make_task("a"))
+
+    assert asyncio.run(store.load("a")) is task
+    assert asyncio.run(store.load("b")) is None
+
+
+
+def test_evicts_finished_tasks_past_many_active_ones(clock):
+    store = TaskStore(max_tasks=102)
+    for i in range(100):
+        store.put(make_task(f"active-{i}"))
+    store.put(make_task("old", TaskState.COMPLETED))
+    store.put(make_task("new", TaskState.COMPLETED))
+    # Reading old makes new the least recently used finished task
+    store.get("old")
+    store.put(make_task("active-100"))
+
+    assert "new" not in store
+    assert "old" in store
+    assert store.evictions == 1
+    # Only active tasks above the limit: nothing to evict
+    store.put(make_task("active-101"))
+    store.put(make_task("active-102"))
+    assert "old" not in store
+    assert len(store) == 103
+    assert store.stats()["finished_tasks"] == 0
@@ -0,0 +1,22 @@
+"""
+测试共用的 fixture
+"""
+import time
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 被测模块都通过 time 模块读取 time.monotonic，替换这一处即可让它们的时钟停住
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
@@ -105,7 +105,9 @@ def function_calling():
         model="qwen-plus",
         # 此处以qwen-plus为例，可按需更换模型名称。模型列表：https://help.aliyun.com/zh/model-studio/getting-started/models
         messages=messages,
-        tools=tools
+        tools=tools,
+        # 问题同时涉及天气和时间，让模型在一轮中返回全部工具调用（见步骤9）
+        parallel_tool_calls=True
     )
     print("返回对象：")
     # print(_completion)
@@ -158,38 +160,35 @@ completion = function_calling()
 
 # 步骤5:运行工具函数
 
-import json
+from parallel_tools import run_tool_calls
+from tool_cache import ToolCache
 
 print("正在执行工具函数...")
-# 从返回的结果中获取函数名称和入参
-function_name = completion.choices[0].message.tool_calls[0].function.name
-arguments_string = completion.choices[0].message.tool_calls[0].function.arguments
-
-# 使用json模块解析参数字符串
-arguments = json.loads(arguments_string)
-# 创建一个函数映射表
-function_mapper = {
-    "get_current_weather": get_current_weather,
-    "get_current_time": get_current_time
-}
-# 获取函数实体
-function = function_mapper[function_name]
-# 如果入参为空，则直接调用函数
-if arguments == {}:
-    function_output = function()
-# 否则，传入参数后调用函数
-else:
-    function_output = function(arguments)
+# 模型可能返回多个工具调用（如同时查询天气和时间），需要全部执行
+tool_calls = completion.choices[0].message.tool_calls
+# 创建一个函数映射表，同一城市10分钟内的天气查询直接使用缓存结果（当前时间不缓存）
+tool_cache = ToolCache()
+function_mapper = tool_cache.wrap_mapper(
+    {
+        "get_current_weather": get_current_weather,
+        "get_current_time": get_current_time
+    },
+    ttls={"get_current_weather": 600},
+)
+# 并发执行全部工具调用，每个工具最多执行10秒；入参为空的工具（如get_current_time）直接调用
+function_outputs = run_tool_calls(tool_calls, function_mapper, timeout=10)
 # 打印工具的输出
-print(f"工具函数输出：{function_output}\n")
+for tool_call, function_output in zip(tool_calls, function_outputs):
+    print(f"工具函数{tool_call.function.name}输出：{function_output}\n")
 
 # 步骤6:向大模型提交工具输出
 
 messages.append(completion.choices[0].message)
 print("已添加assistant message")
-messages.append(
-    {"role": "tool", "content": function_output, "tool_call_id": completion.choices[0].message.tool_calls[0].id})
-print("已添加tool message\n")
+# 每个工具调用对应一条tool message，在同一轮中一次性追加
+for tool_call, function_output in zip(tool_calls, function_outputs):
+    messages.append({"role": "tool", "content": function_output, "tool_call_id": tool_call.id})
+print(f"已添加{len(tool_calls)}条tool message\n")
 
 # 步骤7:大模型总结工具输出
 
@@ -254,6 +253,10 @@ def function_calling_parallel_tool_calls():
     )
     print("返回对象：")
     print(_completion.choices[0].message.model_dump_json())
+    # 返回的多个工具调用并发执行，耗时约等于最慢的一个工具
+    _tool_calls = _completion.choices[0].message.tool_calls or []
+    for _tool_call, _output in zip(_tool_calls, run_tool_calls(_tool_calls, function_mapper, timeout=10)):
+        print(f"工具函数{_tool_call.function.name}输出：{_output}")
     return _completion
 
 
@@ -346,4 +349,43 @@ def function_calling_without_tool():
 
 print("正在发起 function_calling_without_tool ...")
 function_calling_without_tool()
-print("\n")
\ No newline at end of file
+print("\n")
+
+
+# 步骤11:进阶用法-异步工具调用循环
+# 步骤4~7每次只能处理一个对话，且每个请求都阻塞等待。tool_loop.ToolLoop 把步骤4~7封装为异步循环：
+# 同一轮的工具调用并发执行，限制最大轮数和总时限，一个事件循环可以同时处理多个对话。
+
+import asyncio
+from openai import AsyncOpenAI
+from tool_loop import ToolLoop
+
+
+async def function_calling_many_conversations():
+    async_client = AsyncOpenAI(
+        api_key=os.getenv("ApiKeyAliyunDashscope"),
+        base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
+    )
+    tool_loop = ToolLoop(
+        async_client,
+        "qwen-plus",
+        tools,
+        function_mapper,
+        max_rounds=4,  # 最多请求模型4轮，最后一轮不再允许调用工具
+        deadline=60,  # 每个对话的总时限（秒）
+        tool_timeout=10,
+        parallel_tool_calls=True,
+    )
+    questions = ["上海天气如何，现在上海是几点钟？", "四个直辖市的天气如何？", "你好"]
+    results = await asyncio.gather(
+        *(tool_loop.run([messages[0], {"role": "user", "content": question}]) for question in questions)
+    )
+    for question, result in zip(questions, results):
+        print(f"{question} -> {result.answer}（{result.rounds}轮，{result.tool_calls}次工具调用，{result.seconds:.2f}秒）")
+    # 步骤5、9中已查询过的上海等城市直接命中缓存
+    print(f"工具缓存：{tool_cache.stats()}")
+
+
+print("正在发起 function_calling_many_conversations ...")
+asyncio.run(function_calling_many_conversations())
+print("\n")
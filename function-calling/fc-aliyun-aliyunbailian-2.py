@@ -3,13 +3,16 @@
 Function Calling - 完整代码: https://help.aliyun.com/zh/model-studio/user-guide/qwen-function-calling
 """
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from datetime import datetime
-import json
+import asyncio
 import os
 import random
 
-client = OpenAI(
+from tool_cache import ToolCache
+from tool_loop import ToolLoop
+
+client = AsyncOpenAI(
     # 若没有配置环境变量，请用百炼API Key将下行替换为：api_key="sk-xxx",
     api_key=os.getenv("ApiKeyAliyunDashscope"),
     base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",  # 填写DashScope SDK的base_url
@@ -73,17 +76,43 @@ def get_current_time():
     return f"当前时间：{formatted_time}。"
 
 
-# 封装模型响应函数
-def get_response(messages):
-    completion = client.chat.completions.create(
-        model="qwen-plus",  # 模型列表：https://help.aliyun.com/zh/model-studio/getting-started/models
-        messages=messages,
-        tools=tools
-    )
-    return completion
+# 同一城市10分钟内的天气查询直接使用缓存结果，并发的相同查询只执行一次
+tool_cache = ToolCache(max_entries=1024)
+
+# 工具名称到工具函数的映射
+function_mapper = tool_cache.wrap_mapper(
+    {
+        "get_current_weather": get_current_weather,
+        "get_current_time": get_current_time,
+    },
+    ttls={"get_current_weather": 600},
+)
+
+
+def print_round(info):
+    print(f"\n第{info.number}轮大模型输出信息：{info.message}\n")
+    for tool_output in info.tool_outputs:
+        print(f"工具输出信息：{tool_output}\n")
+    if info.tool_outputs:
+        print("-" * 60)
+
 
+# 模型与工具多轮交互，直到模型判断无需调用工具：最多5轮，总时限60秒，每个工具最多10秒
+tool_loop = ToolLoop(
+    client,
+    "qwen-plus",  # 模型列表：https://help.aliyun.com/zh/model-studio/getting-started/models
+    tools,
+    function_mapper,
+    max_rounds=5,
+    deadline=60,
+    tool_timeout=10,
+    on_round=print_round,
+    # 让模型在一轮中返回全部需要的工具调用，如“四个直辖市的天气如何”
+    parallel_tool_calls=True,
+)
 
-def call_with_messages():
+
+async def call_with_messages():
     print('\n')
     messages = [
         {
@@ -92,45 +121,23 @@ def call_with_messages():
         }
     ]
     print("-" * 60)
-
-    # 模型的第一轮调用
-    i = 1
-    first_response = get_response(messages)
-    assistant_output = first_response.choices[0].message
-    print(f"\n第{i}轮大模型输出信息：{first_response}\n")
-    if assistant_output.content is None:
-        assistant_output.content = ""
-    messages.append(assistant_output)
-
-    # 如果不需要调用工具，则直接返回最终答案
-    if assistant_output.tool_calls == None:  # 如果模型判断无需调用工具，则将assistant的回复直接打印出来，无需进行模型的第二轮调用
-        print(f"无需调用工具，我可以直接回复：{assistant_output.content}")
+    result = await tool_loop.run(messages)
+    if result.rounds == 1:
+        print(f"无需调用工具，我可以直接回复：{result.answer}")
         return
+    print(f"最终答案：{result.answer}")
 
-    # 如果需要调用工具，则进行模型的多轮调用，直到模型判断无需调用工具
-    while assistant_output.tool_calls != None:
-        # 如果判断需要调用查询天气工具，则运行查询天气工具
-        tool_info = {"content": "", "role": "tool", "tool_call_id": assistant_output.tool_calls[0].id}
-        if assistant_output.tool_calls[0].function.name == "get_current_weather":
-            # 提取位置参数信息
-            argumens = json.loads(assistant_output.tool_calls[0].function.arguments)
-            tool_info["content"] = get_current_weather(argumens)
-        # 如果判断需要调用查询时间工具，则运行查询时间工具
-        elif assistant_output.tool_calls[0].function.name == 'get_current_time':
-            tool_info["content"] = get_current_time()
-
-        tool_output = tool_info["content"]
-        print(f"工具输出信息：{tool_output}\n")
-        print("-" * 60)
-        messages.append(tool_info)
-        assistant_output = get_response(messages).choices[0].message
-        if assistant_output.content is None:
-            assistant_output.content = ""
-        messages.append(assistant_output)
-        i += 1
-        print(f"第{i}轮大模型输出信息：{assistant_output}\n")
-    print(f"最终答案：{assistant_output.content}")
+
+async def call_with_many_messages(questions):
+    """在一个事件循环中同时处理多个对话，总耗时约等于最慢的一个对话。"""
+    results = await asyncio.gather(
+        *(tool_loop.run([{"content": question, "role": "user"}]) for question in questions)
+    )
+    for question, result in zip(questions, results):
+        print(f"{question} -> {result.answer}（{result.rounds}轮，{result.tool_calls}次工具调用，{result.seconds:.2f}秒）")
+    print(f"工具缓存：{tool_cache.stats()}")
 
 
 if __name__ == '__main__':
-    call_with_messages()
+    asyncio.run(call_with_messages())
+    # asyncio.run(call_with_many_messages(["现在几点了？", "北京天气如何？", "四个直辖市的天气如何？"]))
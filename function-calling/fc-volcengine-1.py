@@ -7,16 +7,19 @@ pip install --upgrade "volcengine-python-sdk[ark]"
 参考：
 https://www.volcengine.com/docs/82379/1262342#python-2
 """
-import json
+import asyncio
 import os
-import time
 
-import requests
-from volcenginesdkarkruntime import Ark
+from volcenginesdkarkruntime import AsyncArk
+
+import gazetteer
+import open_meteo
+from tool_cache import ToolCache
+from tool_loop import ToolLoop
 
 # 请确保您已将 API Key 存储在环境变量 ApiKeyVolcengine 中
 # 初始化Ark客户端，从环境变量中读取您的API Key
-client = Ark(
+client = AsyncArk(
     # 此为默认路径，您可根据业务所在地域进行配置
     base_url="https://ark.cn-beijing.volces.com/api/v3",
     # 从环境变量中获取您的 API Key。此为默认方式，您可根据需要进行修改
@@ -24,119 +27,127 @@ client = Ark(
 )
 
 
-def test_function_call():
-    messages = [
-        {
-            "role": "system",
-            # "content": "你是调皮可爱的天气预报员",
-            "content": "你是一位语言精炼，沉稳的的天气预报员",
-        },
-        {
-            "role": "user",
-            "content": "我今天想去广州玩一下，想知道天气如何？",
-        },
-    ]
-    req = {
-        "model": "doubao-1-5-pro-32k-250115",  # 模型ID（ModelId）或接入点ID（EndpointId）
-        "messages": messages,
-        "temperature": 0.8,
-        "tools": [
-            {
-                "type": "function",
-                "function": {
-                    "name": "MusicPlayer",
-                    "description": """歌曲查询Plugin，当用户需要搜索某个歌手或者歌曲时使用此plugin，给定歌手，歌名等特征返回相关音乐。\n 例子1：query=想听孙燕姿的遇见， 输出{"artist":"孙燕姿","song_name":"遇见","description":""}""",
-                    "parameters": {
-                        "properties": {
-                            "artist": {"description": "表示歌手名字", "type": "string"},
-                            "description": {
-                                "description": "表示描述信息",
-                                "type": "string",
-                            },
-                            "song_name": {
-                                "description": "表示歌曲名字",
-                                "type": "string",
-                            },
-                        },
-                        "required": [],
-                        "type": "object",
+tools = [
+    {
+        "type": "function",
+        "function": {
+            "name": "MusicPlayer",
+            "description": """歌曲查询Plugin，当用户需要搜索某个歌手或者歌曲时使用此plugin，给定歌手，歌名等特征返回相关音乐。\n 例子1：query=想听孙燕姿的遇见， 输出{"artist":"孙燕姿","song_name":"遇见","description":""}""",
+            "parameters": {
+                "properties": {
+                    "artist": {"description": "表示歌手名字", "type": "string"},
+                    "description": {
+                        "description": "表示描述信息",
+                        "type": "string",
+                    },
+                    "song_name": {
+                        "description": "表示歌曲名字",
+                        "type": "string",
                     },
                 },
+                "required": [],
+                "type": "object",
             },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_current_weather",
-                    "description": "",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {
-                                "type": "string",
-                                "description": "地理位置，比如北京市",
-                            },
-                            "unit": {"type": "string", "description": "枚举值 [摄氏度,华氏度]"},
-                        },
-                        "required": ["location"],
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_current_weather",
+            "description": "",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "地理位置，比如北京市",
                     },
+                    "unit": {"type": "string", "description": "枚举值 [摄氏度,华氏度]"},
                 },
+                "required": ["location"],
             },
-        ],
-    }
-
-    ts = time.time()
-    completion = client.chat.completions.create(**req)
-    completion_message = completion.choices[0].message
-    if completion_message.tool_calls:
-        tool_call = completion_message.tool_calls[0]
-        print(
-            f"Bot [{time.time() - ts:.3f} s][Use FC]: ",
-            tool_call,
-        )
-        location = json.loads(tool_call.function.arguments)["location"]
-        print(f"待查询城市：", location)
-        # ========== 补充函数调用的结果 =========
-        req["messages"].extend(
-            [
-                completion_message.model_dump(),
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    # "content": "北京天气晴，24~30度",  # 根据实际调用函数结果填写，最好用自然语言。
-                    "content": get_weather(location),
-                    "name": tool_call.function.name,
-                },
-            ]
-        )
-        # 再请求一次模型，获得总结。 如不需要，也可以省略
-        ts = time.time()
-        completion = client.chat.completions.create(**req)
-        print(
-            f"Bot [{time.time() - ts:.3f} s][FC Summary]: ",
-            completion.choices[0].message.content,
-        )
+        },
+    },
+]
+
+
+def print_round(info):
+    if info.tool_outputs:
+        for tool_call, tool_output in zip(info.message["tool_calls"], info.tool_outputs):
+            print(f"Bot [{info.seconds:.3f} s][Use FC]: ", tool_call["function"])
+            print("工具输出：", tool_output)
+    else:
+        print(f"Bot [{info.seconds:.3f} s][FC Summary]: ", info.message["content"])
+
+
+def expect_weather_queries(tool_calls: list[dict]):
+    # 预告本轮的天气查询数，全部到达后立即合并为一次请求，只有一个查询时不等待
+    open_meteo.expect(sum(1 for tool_call in tool_calls if tool_call["function"]["name"] == "get_current_weather"))
+
+
+# 同一城市10分钟内的天气直接使用缓存结果，不再请求天气API；查询失败的结果不缓存
+tool_cache = ToolCache()
+
+# 工具调用后再请求一次模型获得总结，因此最多2轮；如“北京和广州的天气”会在同一轮中并发查询两个城市
+tool_loop = ToolLoop(
+    client,
+    "doubao-1-5-pro-32k-250115",  # 模型ID（ModelId）或接入点ID（EndpointId）
+    tools,
+    {
+        "get_current_weather": tool_cache.cached(
+            "get_current_weather",
+            lambda arguments: get_weather(arguments["location"]),
+            ttl=600,
+            cache_if=lambda output: not output.endswith("天气信息暂不可用"),
+        ),
+    },
+    max_rounds=2,
+    deadline=60,
+    tool_timeout=10,
+    tool_message_name=True,
+    on_round=print_round,
+    on_tool_calls=expect_weather_queries,
+    temperature=0.8,
+)
+
+
+async def test_function_call(*questions):
+    questions = questions or ("我今天想去广州玩一下，想知道天气如何？",)
+    # 多个问题在同一个事件循环中并发处理，例如 test_function_call("广州天气如何？", "上海天气如何？")
+    results = await asyncio.gather(*(
+        tool_loop.run([
+            {
+                "role": "system",
+                # "content": "你是调皮可爱的天气预报员",
+                "content": "你是一位语言精炼，沉稳的的天气预报员",
+            },
+            {
+                "role": "user",
+                "content": question,
+            },
+        ])
+        for question in questions
+    ))
+    for question, result in zip(questions, results):
+        print(f"{question} -> {result.answer} [{result.seconds:.3f} s]")
+    print(f"工具缓存：{tool_cache.stats()}")
 
 
 def get_weather(location: str) -> str:
     """
     调用公开免费的天气查询API查询天气信息（Open-Meteo is an open-source weather API and offers free access for non-commercial use. No API key required. Start using it now!）
+    同一轮中多个城市的查询会合并为一次请求（见 open_meteo.py）
     :param location:
     :return:
     """
 
-    # 地理编码（北京中心坐标）
-    params = {
-        "latitude": get_coordinates_local(location)[0],
-        "longitude": get_coordinates_local(location)[1],
-        "current": "temperature_2m,weather_code",
-        "timezone": "auto",
-        "forecast_days": 1
-    }
+    # 地理编码
+    coordinates = get_coordinates_local(location)
+    if coordinates is None:
+        return f"暂不支持查询{location}的天气"
 
     try:
-        response = requests.get("https://api.open-meteo.com/v1/forecast", params=params)
-        data = response.json()
-        # print(data)
+        data = open_meteo.current_weather(*coordinates)
 
         # 解析天气代码（示例映射，完整代码需参考open-meteo文档）
         weather_code_map = {
@@ -158,14 +169,13 @@ def get_weather(location: str) -> str:
         return f"{location}天气信息暂不可用"
 
 
-def get_coordinates_local(city: str) -> tuple:
-    city_coordinates = {
-        "北京市": (39.9042, 116.4074),
-        "上海市": (31.2304, 121.4737),
-        "广州": (23.1291, 113.2644),
-        "广州市": (23.1291, 113.2644),
-    }
-    return city_coordinates.get(city)
+def get_coordinates_local(city: str) -> tuple | None:
+    """离线查询城市、区县的经纬度（见 gazetteer.py），如“广州”“广州市”“余杭区”；查不到时返回 None"""
+    place = gazetteer.lookup(city)
+    if place is None:
+        return None
+    return place.latitude, place.longitude
+
 
 if __name__ == '__main__':
-    test_function_call()
+    asyncio.run(test_function_call())
@@ -7,15 +7,18 @@ pip install --upgrade "volcengine-python-sdk[ark]"
 参考：
 https://www.volcengine.com/docs/82379/1262342#python-3
 """
-import json
+import asyncio
 import os
-import time
 
-from volcenginesdkarkruntime import Ark
+from volcenginesdkarkruntime import AsyncArk
+
+from link_reader import normalize_urls, read_urls
+from tool_cache import ToolCache
+from tool_loop import ToolLoop
 
 # 请确保您已将 API Key 存储在环境变量 ApiKeyVolcengine 中
 # 初始化Ark客户端，从环境变量中读取您的API Key
-client = Ark(
+client = AsyncArk(
     # 此为默认路径，您可根据业务所在地域进行配置
     base_url="https://ark.cn-beijing.volces.com/api/v3",
     # 从环境变量中获取您的 API Key。此为默认方式，您可根据需要进行修改
@@ -123,107 +126,85 @@ tool_list = [
 
 
 def LinkReaderPlugin(argument: dict):
-    import requests
-
-    urls = argument["url"]
+    # 模型可能传入一个链接、用空格或中文标点分隔的多个链接，或链接列表，最多3个
+    urls = normalize_urls(argument["url"], limit=3)
+    if not urls:
+        return f"没有可以解析的网页链接：{argument['url']}"
+    # 并发读取，耗时约等于最慢的一个网页
     resp_text = []
-    # if type(urls)==list:
-    for url in urls:
-        resp = requests.get(f"https://r.jina.ai/{url}")
-        print(f"API[r.jina.ai]请求响应结果：", resp)
-        resp_text.append(resp.text.partition("Markdown Content:")[2])
-    print("===============\n".join(resp_text))
+    for url, text in zip(urls, read_urls(urls)):
+        print(f"API[r.jina.ai]请求结果：{url}，{len(text)}字符")
+        resp_text.append(text.partition("Markdown Content:")[2] or text)
     return "===============\n".join(resp_text)
 
 
-TOOL_RESPONSE = {
+# 查询类工具的结果缓存一段时间，重复的查询不再执行；SendMessage 有副作用，不缓存
+tool_cache = ToolCache()
+
+TOOL_RESPONSE = tool_cache.wrap_mapper({
     "GetCurrentWeather": lambda argument: f"{argument['location']}今天20~24度，天气：阵雨。",
     "SendMessage": lambda argument: f"成功发送微信消息至{argument['receiver']}",
     "LinkReaderPlugin": LinkReaderPlugin,
     "WebSearchPlugin": lambda
         argument: f"{argument['keywords'].split(' ')[0]} 是一个开源项目，创立于2022年12日7日，主要目的是方便大家使用Transformer并加速人工智能技术的发展",
-}
+}, ttls={"GetCurrentWeather": 600, "LinkReaderPlugin": 600, "WebSearchPlugin": 300})
 
 
-def request(req):
-    completion = client.chat.completions.create(**req)
-    if completion.choices[0].message.tool_calls:
-        #  FunctionCall response
-        req["messages"].append(completion.choices[0].message.model_dump())
-    else:
-        # Normal response (no FunctionCall)
-        req["messages"].append(
-            {
-                "role": completion.choices[0].message.role,
-                "content": completion.choices[0].message.content,
-            }
+def print_round(info):
+    print("=" * 10 + f" Round {info.number} " + "=" * 10)
+    if info.tool_outputs:
+        # FC
+        _flag = "[FC Response]"
+        _resp = "\n".join(
+            f"name={tool_call['function']['name']}, args={tool_call['function']['arguments']}"
+            for tool_call in info.message["tool_calls"]
         )
-    return req
+    else:
+        # No FunctionCall
+        _flag = "[Final Answer]" if info.number > 1 else "[Normal Response]"
+        _resp = info.message["content"]
+    print(
+        f"\033[31massistant\033[0m \033[34m{_flag}\033[0m:\n{_resp} \n[elpase={info.seconds:.3f} s]"
+    )
+    for tool_output in info.tool_outputs:
+        print(f"\033[31mtool\033[0m: {tool_output[:50] + '...'}\n")
+
+
+# 每个用户问题最多与模型交互5轮，总时限120秒；工具并发执行，每个最多30秒（LinkReaderPlugin需要请求网页）
+tool_loop = ToolLoop(
+    client,
+    "doubao-1-5-pro-32k-250115",
+    tool_list,
+    TOOL_RESPONSE,
+    max_rounds=5,
+    deadline=120,
+    tool_timeout=30,
+    tool_message_name=True,
+    on_round=print_round,
+    temperature=0.8,
+)
 
 
-def test_function_call():
-    round_num = 1
-    req = {
-        "model": "doubao-1-5-pro-32k-250115",
-        "messages": [
+async def test_function_call():
+    messages = [
+        {
+            "role": "user",
+            "content": "先查询北京的天气，如果是晴天微信发给Alan，否则发给Peter",
+        },
+    ]
+    while True:
+        result = await tool_loop.run(messages)
+        # 沿用完整的对话记录，继续下一轮提问
+        messages = result.messages
+        # input 会阻塞，放到线程中执行
+        query = (await asyncio.to_thread(input, "human:")).strip()
+        messages.append(
             {
                 "role": "user",
-                "content": "先查询北京的天气，如果是晴天微信发给Alan，否则发给Peter",
-            },
-        ],
-        "temperature": 0.8,
-        "tools": tool_list,
-    }
-    while True:
-        if req["messages"][-1]["role"] == "assistant":
-            if "tool_calls" in req["messages"][-1]:
-                tool_name = req["messages"][-1]["tool_calls"][0]["function"]["name"]
-                req["messages"].append(
-                    {
-                        "role": "tool",
-                        "tool_call_id": req["messages"][-1]["tool_calls"][0]["id"],
-                        "content": TOOL_RESPONSE[tool_name](
-                            json.loads(
-                                req["messages"][-1]["tool_calls"][0]["function"][
-                                    "arguments"
-                                ]
-                            )
-                        ),  # 根据实际调用函数结果填写，最好用自然语言。
-                        "name": tool_name,
-                    }
-                )
-                pass
-            else:
-                query = input("human:").strip()
-                req["messages"].append(
-                    {
-                        "role": "user",
-                        "content": f"""{query}""",
-                    }
-                )
-
-        ts = time.time()
-        req = request(req)
-        print("=" * 10 + f" Round {round_num} " + "=" * 10)
-        print(
-            f"\033[31m{req['messages'][-2]['role']}\033[0m: {req['messages'][-2]['content'][:50] + '...'}\n"
-        )
-        if "tool_calls" in req["messages"][-1]:
-            # FC
-            _flag = "[FC Response]"
-            _resp = f"name={req['messages'][-1]['tool_calls'][0]['function']['name']}, args={req['messages'][-1]['tool_calls'][0]['function']['arguments']}"
-        else:
-            # No FunctionCall
-            if len(req["messages"]) >= 3 and req["messages"][-2]["role"] == "tool":
-                _flag = "[Final Answer]"
-            else:
-                _flag = "[Normal Response]"
-            _resp = req["messages"][-1]["content"]
-        round_num += 1
-        print(
-            f"\033[31massistant\033[0m \033[34m{_flag}\033[0m:\n{_resp} \n[elpase={time.time() - ts:.3f} s]"
+                "content": f"""{query}""",
+            }
         )
 
 
 if __name__ == '__main__':
-    test_function_call()
+    asyncio.run(test_function_call())
@@ -0,0 +1,230 @@
+"""
+离线地名索引：把城市、区县名称解析为经纬度
+
+data/places.csv 收录省级行政区、全部地级行政区，以及直辖市、省会等主要城市的区县和常见县级市。
+构建后的 data/gazetteer.idx 只包含排好序的数组：名称按 UTF-8 字节排序，查询时在内存映射的文件上二分查找，
+不需要常驻内存的大字典，首次查询时才打开文件。
+
+每个地点都能用全称、简称和带上级的名称查到，如“广州市”“广州”“余杭区”“余杭”“杭州余杭区”；
+查询中带有省市前缀时（如“浙江省杭州市余杭区”）依次去掉前缀再查；都查不到时按前缀匹配（如“乌鲁”）。
+同名地点按省、地级、区县的顺序优先，因此“吉林”得到吉林省，“朝阳”得到朝阳市。
+
+修改 places.csv 后重新构建索引：
+python gazetteer.py
+python gazetteer.py 广州 余杭区 浙江省杭州市余杭区
+"""
+import array
+import csv
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+SOURCE_PATH = os.path.join(DATA_DIR, "places.csv")
+INDEX_PATH = os.path.join(DATA_DIR, "gazetteer.idx")
+
+# 魔数、名称数、地点数、名称区字节数、地点名区字节数
+_HEADER = struct.Struct("<4sIIII")
+_MAGIC = b"GAZ1"
+# 经纬度以 1e-5 度为单位存为整数
+_SCALE = 100000
+# 行政区划名称的后缀，去掉后缀得到简称；较长的后缀在前
+_SUFFIXES = ("特别行政区", "自治区", "自治州", "自治县", "地区", "林区", "新区", "省", "市", "区", "县", "盟", "旗")
+# 把“浙江省杭州市余杭区”切分为“浙江省”“杭州市”“余杭区”
+_PARTS = re.compile(".+?(?:" + "|".join(_SUFFIXES) + ")|.+$")
+# 同名时的优先级，数值小的优先
+_RANK_PROVINCE, _RANK_CITY, _RANK_COUNTY = 0, 1, 2
+# 前缀匹配时最多比较的候选数
+_PREFIX_SCAN = 64
+
+
+class Place(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+
+
+def _short_names(name: str, aliases: str) -> list[str]:
+    names = [name]
+    for suffix in _SUFFIXES:
+        if name.endswith(suffix):
+            if len(name) - len(suffix) >= 2:
+                names.append(name[:-len(suffix)])
+            break
+    names += [alias for alias in aliases.split("|") if alias]
+    return names
+
+
+def build(source: str = SOURCE_PATH, index: str = INDEX_PATH) -> tuple[int, int]:
+    """从 places.csv 构建索引文件，返回（名称数, 地点数）。"""
+    places = []  # (显示名称, 纬度, 经度, 优先级)
+    keys = []  # (名称, 优先级, 地点序号)
+    province_names: dict[str, list[str]] = {}
+    city_names: dict[tuple[str, str], list[str]] = {}
+    with open(source, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            province, city, county = row["province"], row["city"], row["county"]
+            if county:
+                name, rank = county, _RANK_COUNTY
+                display = (city if city == province else province + city) + county
+            elif city:
+                name, rank = city, _RANK_CITY
+                display = city if city == province else province + city
+            else:
+                name, rank, display = province, _RANK_PROVINCE, province
+            place = len(places)
+            places.append((display, float(row["latitude"]), float(row["longitude"]), rank))
+            names = _short_names(name, row["aliases"])
+            if county:
+                # 带上级城市的名称，区分不同城市的同名区县，如“南京鼓楼区”“福州鼓楼区”
+                names += [parent + short for parent in city_names[province, city] for short in names]
+            elif city:
+                city_names[province, city] = names
+                # 带省份的名称，如“浙江杭州”
+                names = names + [parent + short for parent in province_names.get(province, ()) for short in names]
+            else:
+                province_names[province] = names
+            keys += [(short, rank, place) for short in dict.fromkeys(names)]
+
+    # 同一名称的多个地点按优先级、文件中的顺序排列，查询时取第一个
+    keys.sort(key=lambda key: (key[0].encode(), key[1], key[2]))
+    key_offsets, key_places, key_blob = array.array("I", [0]), array.array("I"), bytearray()
+    for short, _, place in keys:
+        key_blob += short.encode()
+        key_offsets.append(len(key_blob))
+        key_places.append(place)
+    name_offsets, coordinates, ranks, name_blob = array.array("I", [0]), array.array("i"), bytearray(), bytearray()
+    for display, latitude, longitude, rank in places:
+        name_blob += display.encode()
+        name_offsets.append(len(name_blob))
+        coordinates += array.array("i", [round(latitude * _SCALE), round(longitude * _SCALE)])
+        ranks.append(rank)
+    ranks += bytes(-len(ranks) % 4)
+
+    tables = [key_offsets, key_places, name_offsets, coordinates]
+    if sys.byteorder == "big":
+        for table in tables:
+            table.byteswap()
+    tmp = f"{index}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(keys), len(places), len(key_blob), len(name_blob)))
+        for table in tables:
+            f.write(table.tobytes())
+        f.write(ranks)
+        f.write(key_blob)
+        f.write(name_blob)
+    os.replace(tmp, index)
+    return len(keys), len(places)
+
+
+class Gazetteer:
+    def __init__(self, path: str = INDEX_PATH):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, key_count, place_count, key_size, name_size = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} 不是地名索引文件")
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+
+        def table(typecode: str, count: int):
+            nonlocal offset
+            size = count * 4
+            data = view[offset:offset + size]
+            offset += size
+            if sys.byteorder == "big":
+                swapped = array.array(typecode, data)
+                swapped.byteswap()
+                return swapped
+            return data.cast(typecode)
+
+        self._count = key_count
+        self._key_offsets = table("I", key_count + 1)
+        self._key_places = table("I", key_count)
+        self._name_offsets = table("I", place_count + 1)
+        self._coordinates = table("i", place_count * 2)
+        self._ranks = view[offset:offset + place_count]
+        offset += place_count + (-place_count % 4)
+        self._keys = view[offset:offset + key_size]
+        self._names = view[offset + key_size:offset + key_size + name_size]
+
+    def _key(self, i: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[i]:self._key_offsets[i + 1]])
+
+    def _lower_bound(self, key: bytes) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _place(self, place: int) -> Place:
+        name = bytes(self._names[self._name_offsets[place]:self._name_offsets[place + 1]]).decode()
+        return Place(name, self._coordinates[2 * place] / _SCALE, self._coordinates[2 * place + 1] / _SCALE)
+
+    def _exact(self, key: bytes) -> Place | None:
+        i = self._lower_bound(key)
+        if i < self._count and self._key(i) == key:
+            return self._place(self._key_places[i])
+        return None
+
+    def _prefix(self, key: bytes) -> Place | None:
+        best = None
+        i = self._lower_bound(key)
+        for i in range(i, min(i + _PREFIX_SCAN, self._count)):
+            if not self._key(i).startswith(key):
+                break
+            place = self._key_places[i]
+            if best is None or self._ranks[place] < self._ranks[best]:
+                best = place
+        return None if best is None else self._place(best)
+
+    def lookup(self, query: str) -> Place | None:
+        """查询地名，找不到时返回 None。"""
+        query = "".join(query.split())
+        parts = _PARTS.findall(query)
+        # 完整名称，以及依次去掉省、市前缀后的名称
+        candidates = [
+            candidate.encode() for candidate in ("".join(parts[i:]) for i in range(len(parts)))
+            if len(candidate) >= 2
+        ]
+        for candidate in candidates:
+            place = self._exact(candidate)
+            if place is not None:
+                return place
+        for candidate in candidates:
+            place = self._prefix(candidate)
+            if place is not None:
+                return place
+        return None
+
+
+_gazetteer: Gazetteer | None = None
+_lock = threading.Lock()
+
+
+def lookup(query: str) -> Place | None:
+    """在默认索引中查询地名，首次调用时打开索引文件。"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer.lookup(query)
+
+
+if __name__ == '__main__':
+    key_count, place_count = build()
+    print(f"已构建 {INDEX_PATH}：{place_count}个地点，{key_count}个名称，{os.path.getsize(INDEX_PATH)}字节")
+    for query in sys.argv[1:]:
+        start = time.perf_counter()
+        place = lookup(query)
+        print(f"{query} -> {place}（{(time.perf_counter() - start) * 1e6:.0f}微秒）")
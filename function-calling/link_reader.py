@@ -0,0 +1,164 @@
+"""
+通过 r.jina.ai 读取网页内容
+
+- normalize_urls：模型传入的 url 可能是一个字符串、用空白或中文标点（，、；）分隔的多个链接、JSON 数组或链接列表，
+  统一整理为去重后的链接列表；英文逗号和分号是链接中的合法字符，不作为分隔符
+- read_urls：并发读取多个网页，耗时约等于最慢的一个；复用 tool_http.SESSION 的连接，带连接和读取超时
+- 每个网页流式读取，最多 MAX_BYTES 字节，超出部分丢弃，不会把整个大网页读入内存
+- 响应带 ETag 或 Last-Modified 时缓存到磁盘，下次读取同一网页时带上 If-None-Match / If-Modified-Since，
+  网页未变化（304）时直接使用缓存内容；缓存最多保留 MAX_CACHE_ENTRIES 个网页，超出时删除最久未写入的
+
+LINK_READER_URL 环境变量可以把请求指向其他阅读服务或本地的测试服务，LINK_READER_CACHE 指定缓存目录。
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+from tool_http import SESSION, TIMEOUT
+
+READER_URL = os.getenv("LINK_READER_URL", "https://r.jina.ai/")
+CACHE_DIR = os.getenv("LINK_READER_CACHE", os.path.join(tempfile.gettempdir(), "link_reader_cache"))
+# 每个网页最多读取的字节数
+MAX_BYTES = 512 * 1024
+# 磁盘缓存最多保留的网页数
+MAX_CACHE_ENTRIES = int(os.getenv("LINK_READER_CACHE_ENTRIES", "256"))
+_CHUNK_SIZE = 16 * 1024
+
+# LinkReaderPlugin 本身在 parallel_tools.TOOL_POOL 中执行，网页读取使用单独的线程池，避免占满同一个线程池而互相等待
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="link-reader")
+# 英文逗号和分号可以出现在链接的路径和查询参数中（如 ?ids=1,2;v=3），不能用来切分
+_SEPARATORS = re.compile(r"[\s，；、]+")
+
+
+def normalize_urls(value, limit: int = 3) -> list[str]:
+    """把字符串或列表形式的链接整理为最多 limit 个 http(s) 链接，补全协议，去掉锚点和重复的链接。"""
+    if isinstance(value, str) and value.lstrip().startswith("["):
+        # 以字符串形式传入的 JSON 数组，如 '["a.com", "b.com"]'
+        try:
+            value = json.loads(value)
+        except ValueError:
+            pass
+    items = [value] if isinstance(value, str) else list(value or ())
+    urls = []
+    for item in items:
+        for part in _SEPARATORS.split(str(item)):
+            part = part.strip("\"'<>()[]")
+            if not part:
+                continue
+            if "://" not in part:
+                part = "https://" + part
+            parts = urlsplit(part)
+            if parts.scheme.lower() not in ("http", "https") or not parts.netloc:
+                continue
+            url = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+            if url not in urls:
+                urls.append(url)
+    return urls[:limit]
+
+
+def _cache_paths(url: str) -> tuple[str, str]:
+    name = hashlib.sha256(url.encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{name}.json"), os.path.join(CACHE_DIR, f"{name}.txt")
+
+
+def _load_cache(url: str) -> tuple[dict, str] | None:
+    meta_path, text_path = _cache_paths(url)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(text_path, encoding="utf-8") as f:
+            return meta, f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cache(url: str, meta: dict, text: str):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    meta_path, text_path = _cache_paths(url)
+    # 先写正文再写元数据，并且都先写临时文件再替换，其他线程或进程不会读到写了一半的缓存；
+    # 临时文件名由 mkstemp 生成，同一进程的多个线程同时写同一网页也不会互相覆盖
+    for path, content in ((text_path, text), (meta_path, json.dumps(meta, ensure_ascii=False))):
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    _prune_cache()
+
+
+def _prune_cache():
+    """缓存的网页超过 MAX_CACHE_ENTRIES 个时，删除最久未写入的网页。"""
+    entries = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith(".json"):
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass
+    if len(entries) <= MAX_CACHE_ENTRIES:
+        return
+    entries.sort()
+    for _, meta_path in entries[:len(entries) - MAX_CACHE_ENTRIES]:
+        # 先删元数据，没有元数据的正文不会被读取
+        for path in (meta_path, meta_path[:-len(".json")] + ".txt"):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # 其他线程或进程已经删除
+                pass
+
+
+def read_url(url: str) -> str:
+    """读取一个网页，返回阅读服务输出的文本。"""
+    reader_url = READER_URL + url
+    cached = _load_cache(reader_url)
+    headers = {}
+    if cached is not None:
+        meta = cached[0]
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    with SESSION.get(reader_url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 304 and cached is not None:
+            return cached[1]
+        response.raise_for_status()
+        body = bytearray()
+        # 多读一个字节，才能区分正好 MAX_BYTES 字节的网页和被截断的网页
+        for chunk in response.iter_content(_CHUNK_SIZE):
+            body += chunk
+            if len(body) > MAX_BYTES:
+                break
+        truncated = len(body) > MAX_BYTES
+        # 截断处可能落在多字节字符中间
+        text = bytes(body[:MAX_BYTES]).decode(response.encoding or "utf-8", errors="replace")
+        if truncated:
+            text += f"\n（网页内容超过{MAX_BYTES // 1024}KB，已截断）"
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _store_cache(reader_url, {
+            "url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time(),
+        }, text)
+    return text
+
+
+def _read_or_error(url: str) -> str:
+    try:
+        return read_url(url)
+    except Exception as e:
+        return f"{url}读取失败：{e}"
+
+
+def read_urls(urls: list[str]) -> list[str]:
+    """并发读取多个网页，按顺序返回每个网页的文本；读取失败的网页返回说明原因的文本。"""
+    return list(_POOL.map(_read_or_error, urls))
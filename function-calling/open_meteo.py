@@ -0,0 +1,106 @@
+"""
+Open-Meteo 当前天气查询，同一时刻的多个查询合并为一次请求
+
+模型在一轮中返回多个天气工具调用时（如“四个直辖市的天气如何”），这些调用在线程中同时执行。
+调用方先用 expect(n) 预告本轮的查询数，current_weather 收集到 n 个查询后立即用一次多坐标请求
+（latitude=39.9,31.2&longitude=116.4,121.5）查询全部地点，并按顺序把结果分给各个调用；
+ToolLoop 的 on_tool_calls 回调在工具开始执行前给出这个数量。
+没有预告其他查询时不等待，直接发出请求；预告的查询没有全部到达时（如部分调用命中了缓存），
+最多等待 BATCH_WINDOW 秒。
+
+OPEN_METEO_FORECAST_URL 环境变量可以把请求指向本地的 stub_forecast_server.py。
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from tool_http import SESSION, TIMEOUT
+
+FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+# 预告的查询没有全部到达时，最多等待的时间（秒）
+BATCH_WINDOW = 0.02
+# 一次请求最多包含的地点数
+MAX_BATCH = 50
+
+
+def fetch_current(coordinates: list[tuple[float, float]]) -> list[dict]:
+    """一次请求查询多个坐标的当前气温和天气代码，按坐标顺序返回每个地点的结果。"""
+    params = {
+        "latitude": ",".join(str(latitude) for latitude, _ in coordinates),
+        "longitude": ",".join(str(longitude) for _, longitude in coordinates),
+        "current": "temperature_2m,weather_code",
+        "timezone": "auto",
+        "forecast_days": 1,
+    }
+    response = SESSION.get(FORECAST_URL, params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    # 只有一个地点时返回对象，多个地点时返回数组
+    results = data if isinstance(data, list) else [data]
+    if len(results) != len(coordinates):
+        raise ValueError(f"查询了{len(coordinates)}个地点，返回了{len(results)}个结果")
+    return results
+
+
+class _Batch:
+    def __init__(self):
+        self.coordinates: list[tuple[float, float]] = []
+        self.futures: list[Future] = []
+
+
+_lock = threading.Lock()
+# 有查询到达时通知负责发出请求的线程
+_arrived = threading.Condition(_lock)
+_collecting: _Batch | None = None
+# 已预告但尚未到达的查询数
+_expected = 0
+
+
+def expect(count: int):
+    """预告接下来将同时到达 count 个查询，收集齐之后再发出请求。"""
+    global _expected
+    with _lock:
+        _expected += count
+
+
+def current_weather(latitude: float, longitude: float) -> dict:
+    """查询一个坐标的当前天气，与同时到达的其他查询合并为一次请求。"""
+    global _collecting, _expected
+    future = Future()
+    with _lock:
+        _expected = max(0, _expected - 1)
+        batch = _collecting
+        leader = batch is None
+        if leader:
+            batch = _collecting = _Batch()
+        batch.coordinates.append((latitude, longitude))
+        batch.futures.append(future)
+        if len(batch.coordinates) >= MAX_BATCH:
+            # 已满，之后的查询开始新的一批
+            _collecting = None
+        _arrived.notify_all()
+    if not leader:
+        return future.result()
+
+    # 第一个查询负责发出请求：预告的查询全部到达或这一批已满时立即发出，最多等待 BATCH_WINDOW 秒
+    deadline = time.monotonic() + BATCH_WINDOW
+    with _lock:
+        while _expected and _collecting is batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # 其余预告的查询不会再到达（命中了缓存或在查询前出错），不再让之后的查询等待它们
+                _expected = 0
+                break
+            _arrived.wait(remaining)
+        if _collecting is batch:
+            _collecting = None
+    try:
+        results = fetch_current(batch.coordinates)
+    except Exception as e:
+        for waiting in batch.futures:
+            waiting.set_exception(e)
+    else:
+        for waiting, result in zip(batch.futures, results):
+            waiting.set_result(result)
+    return future.result()
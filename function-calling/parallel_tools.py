@@ -0,0 +1,71 @@
+"""
+并发执行模型在一轮中返回的全部工具调用
+
+开启 parallel_tool_calls 后，模型一次可能返回多个工具调用（如“四个直辖市的天气如何”会返回四次 get_current_weather），
+逐个执行既慢，又会让只处理 tool_calls[0] 的循环多跑几轮模型调用。run_tool_calls 在线程池中同时执行它们，
+并按调用顺序返回结果，调用方可以在同一轮中把全部 tool 消息追加到 messages。
+
+用法（脚本所在目录会自动加入 sys.path）：
+from parallel_tools import run_tool_calls
+outputs = run_tool_calls(completion.choices[0].message.tool_calls, function_mapper, timeout=10)
+"""
+import inspect
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# 工具大多在等待网络，线程池足够；超时的工具无法被中断，只是不再等待它的结果
+TOOL_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="tool")
+
+
+def tool_call_fields(tool_call) -> tuple[str, str, str]:
+    """取出工具调用的 id、函数名和参数字符串，兼容 SDK 对象与 model_dump() 得到的字典。"""
+    if isinstance(tool_call, dict):
+        function = tool_call["function"]
+        return tool_call["id"], function["name"], function.get("arguments") or ""
+    return tool_call.id, tool_call.function.name, tool_call.function.arguments or ""
+
+
+def call_tool(function, arguments: dict) -> str:
+    # 与步骤5相同：不接收参数的工具（如 get_current_time）直接调用
+    if not inspect.signature(function).parameters:
+        return function()
+    return function(arguments)
+
+
+def run_tool_calls(tool_calls, function_mapper: dict, timeout: float = 10.0) -> list[str]:
+    """并发执行 tool_calls，按调用顺序返回每个工具的输出文本。
+
+    每个工具最多执行 timeout 秒；未知工具、参数解析失败、执行出错或超时时，返回说明原因的文本，
+    让模型据此继续回答，而不是中断整轮对话。
+    """
+    futures = []
+    for tool_call in tool_calls:
+        _, name, arguments = tool_call_fields(tool_call)
+        function = function_mapper.get(name)
+        if function is None:
+            futures.append((name, f"未知工具：{name}"))
+            continue
+        try:
+            parsed = json.loads(arguments) if arguments else {}
+        except json.JSONDecodeError as e:
+            futures.append((name, f"工具{name}的参数不是合法的JSON：{e}"))
+            continue
+        futures.append((name, TOOL_POOL.submit(call_tool, function, parsed)))
+
+    # 所有工具同时开始执行，因此共用一个截止时间
+    deadline = time.monotonic() + timeout
+    outputs = []
+    for name, future in futures:
+        if isinstance(future, str):
+            outputs.append(future)
+            continue
+        try:
+            output = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            future.cancel()
+            output = f"工具{name}执行超时（{timeout}秒）"
+        except Exception as e:
+            output = f"工具{name}执行失败：{e}"
+        outputs.append(output if isinstance(output, str) else json.dumps(output, ensure_ascii=False))
+    return outputs
@@ -0,0 +1,74 @@
+"""
+本地的 Open-Meteo 预报接口替身，用于在没有网络时试用和压测天气工具
+
+按 Open-Meteo 的格式响应 /v1/forecast：一个坐标返回对象，多个坐标（逗号分隔）返回数组。
+天气由坐标决定，同一地点每次结果相同；每个请求打印一行，便于确认多个查询被合并成了一次请求。
+
+Usage:
+python stub_forecast_server.py --port 8090 --latency 0.2
+OPEN_METEO_FORECAST_URL=http://localhost:8090/v1/forecast python fc-volcengine-1.py
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WEATHER_CODES = (0, 1, 2, 3, 45, 51, 61)
+
+
+def current(latitude: float, longitude: float) -> dict:
+    seed = int(abs(latitude * 100 + longitude * 10))
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": "Asia/Shanghai",
+        "current_units": {"time": "iso8601", "temperature_2m": "°C", "weather_code": "wmo code"},
+        "current": {
+            "time": time.strftime("%Y-%m-%dT%H:%M"),
+            "temperature_2m": round(10 + seed % 200 / 10, 1),
+            "weather_code": WEATHER_CODES[seed % len(WEATHER_CODES)],
+        },
+    }
+
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    # 接口耗时（秒），模拟真实接口的网络延迟
+    latency = 0.0
+    # HTTP/1.1 才能保持 keep-alive 连接
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path != "/v1/forecast" or "latitude" not in query or "longitude" not in query:
+            return self._send(400, {"error": True, "reason": "latitude and longitude are required"})
+        latitudes = [float(value) for value in query["latitude"][0].split(",")]
+        longitudes = [float(value) for value in query["longitude"][0].split(",")]
+        if len(latitudes) != len(longitudes):
+            return self._send(400, {"error": True, "reason": "latitude and longitude must have the same number of elements"})
+        time.sleep(self.latency)
+        results = [current(latitude, longitude) for latitude, longitude in zip(latitudes, longitudes)]
+        self._send(200, results if len(results) > 1 else results[0])
+
+    def _send(self, status: int, body):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="本地的 Open-Meteo 预报接口替身")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的耗时（秒）")
+    args = parser.parse_args()
+    ForecastHandler.latency = args.latency
+    print(f"Open-Meteo stub: http://{args.host}:{args.port}/v1/forecast")
+    ThreadingHTTPServer((args.host, args.port), ForecastHandler).serve_forever()
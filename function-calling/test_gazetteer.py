@@ -0,0 +1,104 @@
+"""
+gazetteer 的测试：用一份小的 places.csv 在临时目录中构建索引
+
+python -m pytest test_gazetteer.py
+"""
+import pytest
+
+import gazetteer
+from gazetteer import Gazetteer, Place, build
+
+PLACES = """\
+province,city,county,latitude,longitude,aliases
+吉林省,,,43.81710,125.32350,
+吉林省,吉林市,,43.83780,126.54940,
+辽宁省,,,41.80570,123.43150,
+辽宁省,朝阳市,,41.57340,120.45080,
+北京市,北京市,,39.90420,116.40740,
+北京市,北京市,朝阳区,39.92150,116.44340,
+江苏省,,,32.06030,118.79690,
+江苏省,南京市,,32.06030,118.79690,
+江苏省,南京市,鼓楼区,32.06600,118.76970,
+福建省,,,26.07450,119.29650,
+福建省,福州市,,26.07450,119.29650,
+福建省,福州市,鼓楼区,26.08200,119.30400,
+浙江省,,,30.27410,120.15510,
+浙江省,杭州市,,30.27410,120.15510,杭城
+浙江省,杭州市,余杭区,30.41860,120.29990,
+新疆维吾尔自治区,乌鲁木齐市,,43.82560,87.61680,
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    source = tmp_path / "places.csv"
+    source.write_text(PLACES, encoding="utf-8")
+    path = str(tmp_path / "gazetteer.idx")
+    build(str(source), path)
+    return path
+
+
+@pytest.fixture
+def places(index):
+    return Gazetteer(index)
+
+
+def test_build_counts_names_and_places(tmp_path):
+    source = tmp_path / "places.csv"
+    source.write_text(PLACES, encoding="utf-8")
+    key_count, place_count = build(str(source), str(tmp_path / "gazetteer.idx"))
+
+    assert place_count == len(PLACES.splitlines()) - 1
+    assert key_count > place_count
+
+
+@pytest.mark.parametrize("query", ["杭州市", "杭州", "杭城", "浙江杭州", "浙江省杭州市"])
+def test_finds_full_short_alias_and_prefixed_names(places, query):
+    assert places.lookup(query) == Place("浙江省杭州市", 30.2741, 120.1551)
+
+
+@pytest.mark.parametrize("query", ["余杭区", "余杭", "杭州余杭区", "浙江省杭州市余杭区", " 浙江省 杭州市 余杭区 "])
+def test_finds_counties_with_and_without_parents(places, query):
+    assert places.lookup(query).name == "浙江省杭州市余杭区"
+
+
+def test_same_name_prefers_province_then_city(places):
+    assert places.lookup("吉林").name == "吉林省"
+    assert places.lookup("吉林市").name == "吉林省吉林市"
+    assert places.lookup("朝阳").name == "辽宁省朝阳市"
+    assert places.lookup("北京朝阳区").name == "北京市朝阳区"
+
+
+def test_parent_city_tells_same_named_counties_apart(places):
+    assert places.lookup("南京鼓楼区").latitude == 32.066
+    assert places.lookup("福州鼓楼区").latitude == 26.082
+
+
+def test_falls_back_to_prefix_match(places):
+    assert places.lookup("乌鲁").name == "新疆维吾尔自治区乌鲁木齐市"
+
+
+@pytest.mark.parametrize("query", ["伦敦", "", "市", "上海市浦东新区"])
+def test_misses_return_none(places, query):
+    assert places.lookup(query) is None
+
+
+def test_rebuilt_index_picks_up_changes(tmp_path, index):
+    source = tmp_path / "places.csv"
+    source.write_text(PLACES + "上海市,上海市,,31.23040,121.47370,魔都\n", encoding="utf-8")
+    build(str(source), index)
+
+    place = Gazetteer(index).lookup("魔都")
+    assert place == Place("上海市", 31.2304, 121.4737)
+
+
+def test_rejects_a_file_that_is_not_an_index(tmp_path):
+    path = tmp_path / "places.csv"
+    path.write_text(PLACES, encoding="utf-8")
+    with pytest.raises(ValueError):
+        Gazetteer(str(path))
+
+
+def test_module_lookup_uses_the_opened_index(monkeypatch, index):
+    monkeypatch.setattr(gazetteer, "_gazetteer", Gazetteer(index))
+    assert gazetteer.lookup("余杭").name == "浙江省杭州市余杭区"
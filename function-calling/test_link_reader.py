@@ -0,0 +1,93 @@
+"""
+link_reader 的测试：用本地 HTTP 服务代替阅读服务
+
+python -m pytest test_link_reader.py
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import link_reader
+
+
+class ReaderHandler(BaseHTTPRequestHandler):
+    # 路径形如 /https://example.com/<字节数>，返回这么多字节的正文，并带上 ETag
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        size = int(self.path.rsplit("/", 1)[1])
+        etag = f'"{size}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b"x" * size
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def reader(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ReaderHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    ReaderHandler.requests = []
+    monkeypatch.setattr(link_reader, "READER_URL", f"http://127.0.0.1:{server.server_address[1]}/")
+    monkeypatch.setattr(link_reader, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(link_reader, "MAX_BYTES", 1000)
+    yield ReaderHandler
+    server.shutdown()
+    server.server_close()
+
+
+def test_page_of_exactly_max_bytes_is_not_truncated(reader):
+    assert link_reader.read_url("https://example.com/1000") == "x" * 1000
+
+    text = link_reader.read_url("https://example.com/1001")
+    assert text.startswith("x" * 1000 + "\n")
+    assert "已截断" in text
+
+
+def test_unchanged_page_is_read_from_the_cache(reader):
+    first = link_reader.read_url("https://example.com/10")
+    second = link_reader.read_url("https://example.com/10")
+
+    assert first == second == "x" * 10
+    assert [etag for _, etag in reader.requests] == [None, '"10"']
+
+
+def test_concurrent_writes_of_one_page_do_not_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr(link_reader, "CACHE_DIR", str(tmp_path))
+    url = "https://r.jina.ai/https://example.com/"
+
+    def store(i):
+        link_reader._store_cache(url, {"etag": f'"{i}"'}, f"text {i}")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(store, range(64)))
+
+    meta, text = link_reader._load_cache(url)
+    assert text.startswith("text ")
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_cache_keeps_at_most_max_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(link_reader, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(link_reader, "MAX_CACHE_ENTRIES", 3)
+    for i in range(5):
+        link_reader._store_cache(f"https://example.com/{i}", {"etag": '"1"'}, "text")
+
+    names = os.listdir(tmp_path)
+    assert len([name for name in names if name.endswith(".json")]) == 3
+    assert len([name for name in names if name.endswith(".txt")]) == 3
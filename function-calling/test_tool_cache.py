@@ -0,0 +1,134 @@
+"""
+tool_cache 的测试
+
+python -m pytest test_tool_cache.py
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tool_cache import ToolCache
+
+
+def counting_tool():
+    calls = []
+
+    def get_current_weather(arguments: dict) -> str:
+        calls.append(arguments)
+        return f"{arguments['location']}晴"
+
+    return get_current_weather, calls
+
+
+def test_same_arguments_hit_the_cache(clock):
+    cache = ToolCache()
+    tool, calls = counting_tool()
+    cached = cache.cached("get_current_weather", tool, ttl=60)
+
+    assert cached({"location": "北京", "unit": "celsius"}) == "北京晴"
+    # 参数顺序不同也是同一个调用
+    assert cached({"unit": "celsius", "location": "北京"}) == "北京晴"
+    assert cached({"location": "上海", "unit": "celsius"}) == "上海晴"
+
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 2)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ToolCache()
+    tool, calls = counting_tool()
+    cached = cache.cached("get_current_weather", tool, ttl=60)
+
+    cached({"location": "北京"})
+    clock.now += 59
+    cached({"location": "北京"})
+    clock.now += 2
+    cached({"location": "北京"})
+
+    assert len(calls) == 2
+
+
+def test_evicts_least_recently_used_entry(clock):
+    cache = ToolCache(max_entries=2)
+    tool, calls = counting_tool()
+    cached = cache.cached("get_current_weather", tool, ttl=60)
+
+    cached({"location": "北京"})
+    cached({"location": "上海"})
+    # 读取北京后，上海成为最久未使用的一条
+    cached({"location": "北京"})
+    cached({"location": "广州"})
+    assert cache.stats().evictions == 1
+
+    cached({"location": "北京"})
+    assert len(calls) == 3
+    cached({"location": "上海"})
+    assert len(calls) == 4
+
+
+def test_concurrent_identical_calls_run_once():
+    cache = ToolCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_tool(arguments: dict) -> str:
+        calls.append(arguments)
+        started.set()
+        release.wait(5)
+        return "晴"
+
+    cached = cache.cached("get_current_weather", slow_tool, ttl=60)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(cached, {"location": "北京"})
+        started.wait(5)
+        others = [pool.submit(cached, {"location": "北京"}) for _ in range(3)]
+        # 等其余调用都进入等待后再让第一个调用返回
+        deadline = time.monotonic() + 5
+        while cache.stats().coalesced < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        results = [first.result(5)] + [future.result(5) for future in others]
+
+    assert results == ["晴"] * 4
+    assert len(calls) == 1
+    assert cache.stats().coalesced == 3
+
+
+def test_errors_and_rejected_outputs_are_not_cached(clock):
+    cache = ToolCache()
+    outputs = iter([RuntimeError("接口超时"), "天气信息暂不可用", "晴"])
+
+    def flaky_tool(arguments: dict) -> str:
+        output = next(outputs)
+        if isinstance(output, Exception):
+            raise output
+        return output
+
+    cached = cache.cached("get_current_weather", flaky_tool, ttl=60, cache_if=lambda output: "不可用" not in output)
+    with pytest.raises(RuntimeError):
+        cached({"location": "北京"})
+    assert cached({"location": "北京"}) == "天气信息暂不可用"
+    assert cached({"location": "北京"}) == "晴"
+    assert cached({"location": "北京"}) == "晴"
+    assert cache.stats().misses == 3
+
+
+def test_wrap_mapper_only_caches_listed_tools(clock):
+    cache = ToolCache()
+    tool, calls = counting_tool()
+    sent = []
+    mapper = cache.wrap_mapper(
+        {"get_current_weather": tool, "send_message": lambda arguments: sent.append(arguments) or "已发送"},
+        ttls={"get_current_weather": 60},
+    )
+
+    for _ in range(2):
+        mapper["get_current_weather"]({"location": "北京"})
+        mapper["send_message"]({"receiver": "Alan"})
+
+    assert len(calls) == 1
+    assert len(sent) == 2
@@ -0,0 +1,131 @@
+"""
+工具结果缓存
+
+模型经常在几秒内对同一个城市重复调用 get_current_weather，每次都重新请求天气接口。
+ToolCache 以“工具名称 + 规范化的 JSON 参数”为键缓存工具输出：
+
+- 每个工具单独设置 TTL（秒），过期后重新执行
+- 所有工具共用 max_entries 条缓存，超出时淘汰最久未使用的一条（LRU）
+- 相同的调用同时到达时只执行一次，其余调用等待并共享结果（请求合并）
+- stats() 返回命中、未命中、合并、淘汰次数
+
+只缓存结果只取决于参数的工具，发送消息之类有副作用的工具不要缓存。工具在线程中执行
+（run_tool_calls、ToolLoop 都是如此），缓存是线程安全的。
+
+用法：
+from tool_cache import ToolCache
+tool_cache = ToolCache(max_entries=1024)
+function_mapper = tool_cache.wrap_mapper(function_mapper, ttls={"get_current_weather": 600})
+print(tool_cache.stats())
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable
+
+from parallel_tools import call_tool
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    # 等待同一调用结果、没有重复执行的次数
+    coalesced: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+    def __str__(self):
+        return (
+            f"命中{self.hits}次，未命中{self.misses}次，合并{self.coalesced}次，淘汰{self.evictions}次，"
+            f"缓存{self.entries}条，命中率{self.hit_rate:.0%}"
+        )
+
+
+def cache_key(name: str, arguments: dict) -> tuple[str, str]:
+    # 参数顺序、空白不同但内容相同的调用使用同一个键
+    return name, json.dumps(arguments, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+class ToolCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        # 键 -> (过期时间, 工具输出)，按最近使用的顺序排列
+        self._entries: OrderedDict[tuple[str, str], tuple[float, object]] = OrderedDict()
+        # 正在执行的调用，供相同的调用等待结果
+        self._running: dict[tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def cached(
+        self,
+        name: str,
+        function: Callable,
+        ttl: float,
+        cache_if: Callable[[object], bool] | None = None,
+    ) -> Callable[[dict], object]:
+        """返回带缓存的工具函数；cache_if 返回 False 的输出（如“天气信息暂不可用”）不缓存。"""
+
+        def cached_function(arguments: dict):
+            key = cache_key(name, arguments)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return entry[1]
+                future = self._running.get(key)
+                if future is None:
+                    future = self._running[key] = Future()
+                    self._stats.misses += 1
+                    running = True
+                else:
+                    self._stats.coalesced += 1
+                    running = False
+            if not running:
+                return future.result()
+
+            try:
+                output = call_tool(function, arguments)
+            except BaseException as e:
+                # 出错的结果不缓存，等待中的相同调用得到同样的异常
+                with self._lock:
+                    del self._running[key]
+                future.set_exception(e)
+                raise
+            with self._lock:
+                del self._running[key]
+                if cache_if is None or cache_if(output):
+                    self._entries[key] = (time.monotonic() + ttl, output)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self._stats.evictions += 1
+            future.set_result(output)
+            return output
+
+        return cached_function
+
+    def wrap_mapper(self, function_mapper: dict, ttls: dict[str, float]) -> dict:
+        """为 ttls 中列出的工具加上缓存，其余工具原样保留。"""
+        return {
+            name: self.cached(name, function, ttls[name]) if name in ttls else function
+            for name, function in function_mapper.items()
+        }
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            self._stats.entries = len(self._entries)
+            return CacheStats(**vars(self._stats))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
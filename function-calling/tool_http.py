@@ -0,0 +1,21 @@
+"""
+工具共用的 HTTP 会话
+
+每次 requests.get 都会新建连接（TCP + TLS 握手），且默认没有超时，接口无响应时工具会一直挂起。
+SESSION 在所有工具之间复用 keep-alive 连接，请求时传入 timeout=TIMEOUT。
+
+用法：
+from tool_http import SESSION, TIMEOUT
+response = SESSION.get(url, params=params, timeout=TIMEOUT)
+"""
+import requests
+from requests.adapters import HTTPAdapter
+
+# (连接超时, 读取超时)，单位秒
+TIMEOUT = (3.05, 10)
+
+SESSION = requests.Session()
+# 每个主机最多保留16个连接，与并发执行工具的线程数（parallel_tools.TOOL_POOL）一致
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
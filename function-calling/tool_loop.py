@@ -0,0 +1,207 @@
+"""
+通用的异步工具调用循环（Function Calling 多轮对话引擎）
+
+适用于任何 OpenAI 兼容的客户端：阿里云百炼 compatible-mode 的 AsyncOpenAI、火山方舟的 AsyncArk；
+同步客户端（OpenAI、Ark）也可以使用，模型请求会放到线程中执行。
+
+- max_rounds：最多请求模型的轮数，最后一轮设置 tool_choice="none"，要求模型直接给出回答
+- deadline：整个循环的总时限（秒），超时抛出 TimeoutError
+- tool_timeout：单个工具的执行时限，超时的工具以一段说明文字作为结果返回给模型
+- 同一轮的多个工具调用并发执行；stream=True 时模型流式返回工具调用，
+  每个工具调用的参数一完整就开始执行，与模型生成后续工具调用的过程重叠
+- on_tool_calls：非流式时在一轮的工具开始执行前调用，参数为本轮全部的工具调用，
+  可以据此预告同一轮的查询数（见 open_meteo.expect）
+
+一个事件循环可以同时驱动多个对话：
+results = await asyncio.gather(*(tool_loop.run(messages) for messages in conversations))
+"""
+import asyncio
+import inspect
+import json
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from parallel_tools import TOOL_POOL, call_tool, tool_call_fields
+
+
+@dataclass
+class RoundInfo:
+    """每轮结束时传给 on_round 回调的信息。"""
+    number: int
+    # 模型本轮的回复（assistant message 字典）
+    message: dict
+    # 按调用顺序排列的工具输出，没有工具调用时为空
+    tool_outputs: list[str]
+    # 本轮模型请求与工具执行的总耗时
+    seconds: float
+
+
+@dataclass
+class ToolLoopResult:
+    answer: str
+    # 完整的对话记录，可追加下一个用户问题后再次传给 run
+    messages: list
+    rounds: int
+    tool_calls: int
+    seconds: float
+
+
+class ToolLoop:
+    def __init__(
+        self,
+        client,
+        model: str,
+        tools: list,
+        function_mapper: dict,
+        max_rounds: int = 8,
+        deadline: float = 60.0,
+        tool_timeout: float = 10.0,
+        stream: bool = False,
+        tool_message_name: bool = False,
+        on_round: Callable[[RoundInfo], None] | None = None,
+        on_tool_calls: Callable[[list[dict]], None] | None = None,
+        **request_options,
+    ):
+        self._create = client.chat.completions.create
+        # SDK 用装饰器包装了 create，需要取出原函数才能判断是否为异步客户端
+        self._async_client = inspect.iscoroutinefunction(inspect.unwrap(self._create))
+        if stream and not self._async_client:
+            raise ValueError("stream=True 需要异步客户端，如 AsyncOpenAI、AsyncArk")
+        self.model = model
+        self.tools = tools
+        self.function_mapper = function_mapper
+        self.max_rounds = max_rounds
+        self.deadline = deadline
+        self.tool_timeout = tool_timeout
+        self.stream = stream
+        # 火山方舟的示例在 tool message 中带上工具名称
+        self.tool_message_name = tool_message_name
+        self.on_round = on_round
+        self.on_tool_calls = on_tool_calls
+        # 其余参数原样传给 chat.completions.create，如 temperature、parallel_tool_calls
+        self.request_options = request_options
+
+    async def run(self, messages: list) -> ToolLoopResult:
+        """从 messages 开始与模型多轮交互，直到模型给出最终回答。"""
+        messages = list(messages)
+        start = time.monotonic()
+        tool_call_count = 0
+        pending: list[asyncio.Future] = []
+        try:
+            async with asyncio.timeout(self.deadline):
+                for number in range(1, self.max_rounds + 1):
+                    round_start = time.monotonic()
+                    request = {
+                        "model": self.model,
+                        "messages": messages,
+                        "tools": self.tools,
+                        **self.request_options,
+                    }
+                    if number == self.max_rounds:
+                        # 已到最大轮数，不再允许调用工具
+                        request["tool_choice"] = "none"
+                    if self.stream:
+                        assistant, pending = await self._stream_round(request)
+                    else:
+                        assistant, pending = await self._round(request)
+                    messages.append(assistant)
+                    tool_outputs = list(await asyncio.gather(*pending))
+                    tool_call_count += len(tool_outputs)
+                    for tool_call, tool_output in zip(assistant.get("tool_calls") or (), tool_outputs):
+                        tool_message = {"role": "tool", "tool_call_id": tool_call["id"], "content": tool_output}
+                        if self.tool_message_name:
+                            tool_message["name"] = tool_call["function"]["name"]
+                        messages.append(tool_message)
+                    if self.on_round is not None:
+                        self.on_round(RoundInfo(number, assistant, tool_outputs, time.monotonic() - round_start))
+                    if not tool_outputs:
+                        return ToolLoopResult(
+                            assistant.get("content") or "", messages, number, tool_call_count, time.monotonic() - start
+                        )
+        except TimeoutError:
+            raise TimeoutError(f"工具调用循环超过总时限{self.deadline}秒") from None
+        finally:
+            # 超时或出错时，不再等待尚未完成的工具
+            for future in pending:
+                future.cancel()
+        raise RuntimeError(f"模型在{self.max_rounds}轮内没有给出最终回答")
+
+    async def _round(self, request: dict) -> tuple[dict, list[asyncio.Future]]:
+        if self._async_client:
+            completion = await self._create(**request)
+        else:
+            completion = await asyncio.to_thread(self._create, **request)
+        assistant = completion.choices[0].message.model_dump(exclude_none=True)
+        # 部分兼容接口要求 assistant message 必须带 content
+        assistant.setdefault("content", "")
+        tool_calls = assistant.get("tool_calls") or []
+        if tool_calls and self.on_tool_calls is not None:
+            self.on_tool_calls(tool_calls)
+        pending = [asyncio.ensure_future(self._call_tool(tool_call)) for tool_call in tool_calls]
+        return assistant, pending
+
+    async def _stream_round(self, request: dict) -> tuple[dict, list[asyncio.Future]]:
+        stream = await self._create(**request, stream=True)
+        content = []
+        tool_calls: dict[int, dict] = {}
+        started: dict[int, asyncio.Future] = {}
+
+        def start_completed():
+            for index, tool_call in tool_calls.items():
+                if index not in started:
+                    started[index] = asyncio.ensure_future(self._call_tool(tool_call))
+
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+            for delta_call in delta.tool_calls or ():
+                index = delta_call.index
+                if index is None:
+                    index = len(tool_calls) if delta_call.id else max(tool_calls, default=0)
+                tool_call = tool_calls.get(index)
+                if tool_call is None:
+                    # 新的工具调用开始，说明之前的工具调用参数已经完整，立即开始执行
+                    start_completed()
+                    tool_call = tool_calls[index] = {
+                        "id": "", "type": "function", "function": {"name": "", "arguments": ""},
+                    }
+                if delta_call.id:
+                    tool_call["id"] = delta_call.id
+                if delta_call.function is not None:
+                    # 名称只在第一个分片中完整出现，参数则分片拼接
+                    if delta_call.function.name and not tool_call["function"]["name"]:
+                        tool_call["function"]["name"] = delta_call.function.name
+                    if delta_call.function.arguments:
+                        tool_call["function"]["arguments"] += delta_call.function.arguments
+        start_completed()
+
+        assistant = {"role": "assistant", "content": "".join(content)}
+        if tool_calls:
+            assistant["tool_calls"] = [tool_calls[index] for index in sorted(tool_calls)]
+        return assistant, [started[index] for index in sorted(tool_calls)]
+
+    async def _call_tool(self, tool_call: dict) -> str:
+        _, name, arguments = tool_call_fields(tool_call)
+        function = self.function_mapper.get(name)
+        if function is None:
+            return f"未知工具：{name}"
+        try:
+            parsed = json.loads(arguments) if arguments else {}
+        except json.JSONDecodeError as e:
+            return f"工具{name}的参数不是合法的JSON：{e}"
+        try:
+            if inspect.iscoroutinefunction(function):
+                output = await asyncio.wait_for(call_tool(function, parsed), self.tool_timeout)
+            else:
+                # 同步工具（如使用 requests 的工具）放到线程池中执行，不阻塞其他对话
+                future = asyncio.get_running_loop().run_in_executor(TOOL_POOL, call_tool, function, parsed)
+                output = await asyncio.wait_for(future, self.tool_timeout)
+        except asyncio.TimeoutError:
+            return f"工具{name}执行超时（{self.tool_timeout}秒）"
+        except Exception as e:
+            return f"工具{name}执行失败：{e}"
+        return output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)